@@ -0,0 +1,46 @@
+import timeit
+from base64 import b64encode
+
+from steampy import guard
+
+# Confirmation keys signed per run, one getlist, details or ajaxop request each
+signatures = 100000
+
+# Runs to time
+repeat = 5
+
+identity_secret = b64encode(b'abcdefghijklmnoprstu')
+steam_id = '76561197960287930'
+
+
+def legacy_params(tags: list) -> list:
+    # Parameters built as ConfirmationExecutor did before SteamGuardSigner
+    return [{'p': guard.generate_device_id(steam_id), 'a': steam_id,
+             'k': guard.generate_confirmation_key(identity_secret, tag, timestamp), 't': timestamp,
+             'm': 'android', 'tag': tag} for tag, timestamp in tags]
+
+
+def signer_params(tags: list) -> list:
+    signer = guard.SteamGuardSigner(identity_secret, steam_id)
+    return [signer.confirmation_params(tag, timestamp) for tag, timestamp in tags]
+
+
+def signer_keys(tags: list) -> list:
+    return guard.SteamGuardSigner(identity_secret, steam_id).confirmation_keys(tags)
+
+
+def bench(name: str, sign, tags: list) -> None:
+    seconds = min(timeit.repeat(lambda: sign(tags), number=1, repeat=repeat))
+    print(f'{name:<32} {len(tags) / seconds / 1e3:10.1f} k signatures/s')
+
+
+def main():
+    tags = [(f'details{i}', 1700000000 + i // 1000) for i in range(signatures)]
+    assert [params['k'] for params in legacy_params(tags[:100])] == signer_keys(tags[:100])
+    bench('generate_confirmation_key', legacy_params, tags)
+    bench('SteamGuardSigner params', signer_params, tags)
+    bench('SteamGuardSigner batch keys', signer_keys, tags)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import os
+import json
+import timeit
+
+from steampy import html_backend
+from steampy.confirmation import ConfirmationExecutor
+from steampy.market import get_trade_history_from_response
+from steampy.utils import get_market_listings_from_html
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test', 'fixtures')
+
+# Number of sell listings on the generated /market page, the first page of an account shows up to 100 of them
+listings = 100
+
+# Rows in the generated trade history page
+history_rows = 500
+
+# Parses to time per page and backend
+repeat = 10
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def make_market_page() -> str:
+    # Repeat the sell listing rows of the captured page with fresh listing ids
+    html = read_fixture('market_page.html')
+    start = html.index('<div class="market_listing_row')
+    end = html.index('<div class="my_listing_section', start)
+    rows = html[start:end].rsplit('\t\t</div>', 1)[0]
+    generated = ''.join(rows.replace('42135061209184', f'{i:014d}') for i in range(listings // 2))
+    return html[:start] + generated + html[start:]
+
+
+def make_trade_history_page() -> dict:
+    page = json.loads(read_fixture('trade_history_page.json'))
+    header, rows = page['results_html'].split('</div>\n', 1)
+    page['results_html'] = header + '</div>\n' + rows * (history_rows // 3)
+    return page
+
+
+def bench(name: str, parse) -> None:
+    seconds = timeit.timeit(parse, number=repeat)
+    print(f'{name:<36} {seconds / repeat * 1e3:10.2f} ms')
+
+
+def main():
+    market_page = make_market_page()
+    trade_history_page = make_trade_history_page()
+    confirmation_page = read_fixture('confirmation_trade_offer.html')
+    print(f'/market page with {len(get_market_listings_from_html(market_page)["sell_listings"])} listings, '
+          f'trade history with {history_rows} rows')
+
+    for name in html_backend.get_available_backends():
+        backend = html_backend.set_html_backend(name)
+        bench(f'{name} get_market_listings_from_html', lambda: get_market_listings_from_html(market_page, backend))
+        bench(f'{name} get_trade_history_from_response',
+              lambda: get_trade_history_from_response(trade_history_page, backend))
+        bench(f'{name} confirmation trade offer id',
+              lambda: ConfirmationExecutor._get_confirmation_trade_offer_id(confirmation_page))
+
+
+if __name__ == '__main__':
+    main()
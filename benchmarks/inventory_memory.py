@@ -0,0 +1,63 @@
+import tracemalloc
+from functools import partial
+
+from steampy.utils import merge_items, get_description_key
+
+
+# Number of assets in the inventory
+asset_count = 100000
+
+# Number of distinct classid_instanceid pairs among them
+description_count = 2000
+
+
+def make_description(i: int) -> dict:
+    # Shaped like a CS description returned by /inventory, tags and actions included
+    return {
+        'appid': 730,
+        'classid': str(1000000 + i),
+        'instanceid': '0',
+        'currency': 0,
+        'background_color': '',
+        'icon_url': 'i0CoZ81Ui0m-9KwlBY1L_18myuGuq1wfhWSaZgMttyVfPaERSR0Wqmu7LAocGIGz3UqlXOLrxM-vMGmW8VNxu5Dx60noTyL6kJ_m-B1Q7uCvZaZkNM-SA1iVzPx0s-l9Si7hkEwnj4TRX9mucHLCO1J1Dsd1FuFU4Ea6kdHmP-Ln4VaLj9tDmHr3jnxP7SxqsuoCXbIWo0s5',
+        'descriptions': [{'type': 'html', 'value': f'Exterior: Field-Tested {i}'}, {'type': 'html', 'value': ' '}],
+        'tradable': 1,
+        'actions': [{'link': 'steam://rungame/730/76561202255233023/+csgo_econ_action_preview', 'name': 'Inspect'}],
+        'name': f'AK-47 | Redline {i}',
+        'name_color': 'D2D2D2',
+        'type': 'Classified Rifle',
+        'market_name': f'AK-47 | Redline (Field-Tested) {i}',
+        'market_hash_name': f'AK-47 | Redline (Field-Tested) {i}',
+        'market_actions': [{'link': 'steam://rungame/730/76561202255233023/+csgo_econ_action_preview', 'name': 'Inspect'}],
+        'commodity': 0,
+        'market_tradable_restriction': 7,
+        'marketable': 1,
+        'tags': [{'category': 'Type', 'internal_name': 'CSGO_Type_Rifle', 'localized_category_name': 'Type',
+                  'localized_tag_name': 'Rifle'},
+                 {'category': 'Rarity', 'internal_name': 'Rarity_Legendary_Weapon', 'localized_category_name': 'Quality',
+                  'localized_tag_name': 'Classified', 'color': 'd32ce6'}],
+    }
+
+
+def measure(name: str, merge, assets: list, descriptions: dict) -> None:
+    tracemalloc.start()
+    merged = merge(assets, descriptions, context_id='2')
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{name:<20} {size / 2 ** 20:8.1f} MiB {size / len(merged):8.0f} bytes/item')
+
+
+def main():
+    descriptions = {get_description_key(description): description
+                    for description in map(make_description, range(description_count))}
+    keys = list(descriptions)
+    assets = [{'assetid': str(30000000000 + i), 'classid': keys[i % description_count].split('_')[0],
+               'instanceid': '0', 'amount': '1'} for i in range(asset_count)]
+    print(f'{asset_count} assets, {description_count} distinct descriptions')
+
+    measure('dict copies', merge_items, assets, descriptions)
+    measure('InventoryItem', partial(merge_items, item_views=True), assets, descriptions)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import re
+import sys
+import json
+import timeit
+
+from steampy.utils import get_listing_id_to_assets_address_from_html
+
+# Listings on the synthetic page, every listing has a name and an image hover as on Steam
+listings = 5000
+
+# Parses to time per page
+repeat = 20
+
+
+def make_hovers() -> str:
+    hovers = []
+    for i in range(listings):
+        for element in ('name', 'image'):
+            hovers.append(f"\tCreateItemHoverFromContainer( g_rgAssets, 'mylisting_{4213506120918410917 + i}_{element}', "
+                          f"730, '2', '{30546587652 + i}', 0 );\n")
+    return ''.join(hovers)
+
+
+def make_market_page() -> str:
+    rows = ''.join(f'<div id="mylisting_{4213506120918410917 + i}" class="market_listing_row">' + 'x' * 1500
+                   + '</div>\n' for i in range(listings))
+    return '<html><body>' + rows + '<script>\n' + make_hovers() + '</script></body></html>'
+
+
+def make_render_page() -> str:
+    # /market/mylistings/render answers with JSON, the hovers are one of its string fields
+    return json.dumps({'success': True, 'total_count': listings, 'results_html': 'x' * 1500 * listings,
+                       'hovers': make_hovers(), 'assets': {}})
+
+
+def legacy_index(html: str) -> dict:
+    # Matching as done before LISTING_HOVER_RE
+    listing_id_to_assets_address = {}
+    regex = r"CreateItemHoverFromContainer\( [\w]+, 'mylisting_([\d]+)_[\w]+', ([\d]+), '([\d]+)', '([\d]+)', [\d]+ \);"
+    for match in re.findall(regex, html):
+        listing_id_to_assets_address[match[0]] = [str(match[1]), match[2], match[3]]
+    return listing_id_to_assets_address
+
+
+def bench(name: str, parse, text: str) -> None:
+    seconds = timeit.timeit(lambda: parse(text), number=repeat)
+    mib = len(text) / 2 ** 20
+    print(f'{name:<28} {seconds / repeat * 1e3:10.2f} ms/page {mib * repeat / seconds:10.1f} MiB/s')
+
+
+def main():
+    pages = [open(path, encoding='utf-8').read() for path in sys.argv[1:]] or [make_market_page()]
+    for html in pages:
+        print(f'/market page, {len(html) // 1024} KiB, {len(get_listing_id_to_assets_address_from_html(html))} listings')
+        bench('re.findall', legacy_index, html)
+        bench('LISTING_HOVER_RE', get_listing_id_to_assets_address_from_html, html)
+
+    render_page = make_render_page()
+    print(f'mylistings/render page, {len(render_page) // 1024} KiB')
+    bench('json.loads', json.loads, render_page)
+    bench('json.loads + re.findall', lambda text: legacy_index(json.loads(text)['hovers']), render_page)
+    bench('json.loads + LISTING_HOVER_RE',
+          lambda text: get_listing_id_to_assets_address_from_html(json.loads(text)['hovers']), render_page)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import ast
+import sys
+import timeit
+import datetime
+
+from steampy.price_history import parse_listing_page
+from steampy.utils import text_between
+
+
+# Years of history in the synthetic listing page, daily points first and hourly ones for the last month as on Steam
+years = 10
+
+# Parses to time per page
+repeat = 20
+
+
+def make_listing_page() -> str:
+    points = []
+    day = datetime.datetime(2024, 1, 1) - datetime.timedelta(days=365 * years)
+    while day < datetime.datetime(2024, 1, 1):
+        step = datetime.timedelta(hours=1) if day > datetime.datetime(2023, 12, 1) else datetime.timedelta(days=1)
+        points.append(f'["{day:%b %d %Y %H}: +0",{1 + len(points) % 700 / 100:.3f},"{len(points) % 97 + 1}"]')
+        day += step
+    padding = '<div class="market_listing_row">' + 'x' * 400 + '</div>\n'
+    return (
+        '<html><head>' + padding * 300
+        + '<script>\n\tvar line1=[' + ','.join(points) + '];\n\tg_timePriceHistoryEarliest = new Date();\n</script>'
+        + padding * 200 + '<div>( Not Usable in Crafting )</div>'
+        + '<script>Market_LoadOrderSpread( 176096390 );</script>' + padding * 100 + '</html>'
+    )
+
+
+def legacy_parse(html: str) -> tuple:
+    # Parsing as done before the price_history module
+    data_string = text_between(html, 'var line1=', 'g_timePriceHistoryEarliest = new Date();')
+    prices = ast.literal_eval(data_string[:data_string.find(';')])
+    item_nameid = int(text_between(html, 'Market_LoadOrderSpread( ', ' );'))
+    return prices, "( Not Usable in Crafting )" in html, item_nameid
+
+
+def bench(name: str, parse, html: str) -> None:
+    seconds = timeit.timeit(lambda: parse(html), number=repeat)
+    print(f'{name:<24} {seconds / repeat * 1e3:10.2f} ms/page')
+
+
+def main():
+    pages = [open(path, encoding='utf-8').read() for path in sys.argv[1:]] or [make_listing_page()]
+    for html in pages:
+        print(f'{len(html) // 1024} KiB page, {len(parse_listing_page(html).prices)} points')
+        bench('ast.literal_eval', legacy_parse, html)
+        bench('parse_listing_page', parse_listing_page, html)
+
+
+if __name__ == '__main__':
+    main()
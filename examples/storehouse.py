@@ -1,6 +1,5 @@
-import time
-
 from steampy.client import SteamClient, TradeOfferState
+from steampy.trade_offer_watcher import TradeOfferWatcher
 
 
 # Set API key
@@ -23,17 +22,16 @@ def main():
 
     client = SteamClient(api_key)
     client.login(username, password, steamguard_path)
-    print('Bot logged in successfully, fetching offers every 60 seconds')
-
-    while True:
-        offers = client.get_trade_offers()['response']['trade_offers_received']
-        for offer in offers:
-            if is_donation(offer):
-                offer_id = offer['tradeofferid']
-                num_accepted_items = len(offer['items_to_receive'])
-                client.accept_trade_offer(offer_id)
-                print(f'Accepted trade offer {offer_id}. Got {num_accepted_items} items')
-        time.sleep(60)
+    print('Bot logged in successfully, watching offers every 10 seconds')
+
+    def accept_donation(offer: dict) -> None:
+        if is_donation(offer):
+            offer_id = offer['tradeofferid']
+            num_accepted_items = len(offer['items_to_receive'])
+            client.accept_trade_offer(offer_id)
+            print(f'Accepted trade offer {offer_id}. Got {num_accepted_items} items')
+
+    TradeOfferWatcher(client, poll_interval=10, on_new=accept_donation).run()
 
 
 def are_credentials_filled() -> bool:
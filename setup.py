@@ -24,4 +24,9 @@ setup(
         "rsa",
         "tenacity"
     ],
+    extras_require={
+        "numpy": ["numpy"],
+        "lxml": ["lxml", "cssselect"],
+        "selectolax": ["selectolax"],
+    },
 )
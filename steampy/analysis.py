@@ -0,0 +1,85 @@
+from collections import namedtuple
+from typing import List, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency, see `pip install steampy[numpy]`
+    np = None
+
+from steampy.price_history import PriceHistory
+
+PriceHistoryArrays = namedtuple('PriceHistoryArrays', ['timestamps', 'prices', 'volumes'])
+
+# Prices are ascending for sell orders and descending for buy orders, quantities are cumulative as on Steam's graphs
+OrderBook = namedtuple('OrderBook', ['buy_prices', 'buy_quantities', 'sell_prices', 'sell_quantities'])
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError('steampy.analysis requires numpy, install it with `pip install steampy[numpy]`')
+
+
+def price_history_to_arrays(history: PriceHistory) -> PriceHistoryArrays:
+    """View the columns of a parsed price history as NumPy arrays without copying them"""
+    _require_numpy()
+    return PriceHistoryArrays(
+        np.frombuffer(history.timestamps, dtype=np.int64) if history.timestamps else np.empty(0, np.int64),
+        np.frombuffer(history.prices, dtype=np.float64) if history.prices else np.empty(0, np.float64),
+        np.frombuffer(history.volumes, dtype=np.int64) if history.volumes else np.empty(0, np.int64),
+    )
+
+
+def parse_order_book(histogram: dict) -> OrderBook:
+    """Turn the `buy_order_graph` and `sell_order_graph` of `fetch_item_orders_histogram` into arrays"""
+    _require_numpy()
+
+    def graph_to_arrays(graph: list) -> tuple:
+        if not graph:
+            return np.empty(0, np.float64), np.empty(0, np.int64)
+        prices, quantities, _ = zip(*graph)
+        return np.array(prices, dtype=np.float64), np.array(quantities, dtype=np.int64)
+
+    return OrderBook(*graph_to_arrays(histogram.get('buy_order_graph')),
+                     *graph_to_arrays(histogram.get('sell_order_graph')))
+
+
+def _concatenate(histories: Sequence[PriceHistory]) -> tuple:
+    arrays = [price_history_to_arrays(history) for history in histories]
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    np.cumsum([len(array.prices) for array in arrays], out=offsets[1:])
+    if not arrays:
+        return np.empty(0, np.int64), np.empty(0, np.float64), np.empty(0, np.int64), offsets
+    return (np.concatenate([array.timestamps for array in arrays]), np.concatenate([array.prices for array in arrays]),
+            np.concatenate([array.volumes for array in arrays]), offsets)
+
+
+def vwap(histories: Sequence[PriceHistory], since: int = None) -> 'np.ndarray':
+    """Volume weighted average price of every history, from epoch second `since` on. NaN when nothing was sold"""
+    _require_numpy()
+    timestamps, prices, volumes, offsets = _concatenate(histories)
+    if since is not None:
+        volumes = np.where(timestamps >= since, volumes, 0)
+    turnover = np.concatenate(([0.0], np.cumsum(prices * volumes)))
+    sold = np.concatenate(([0], np.cumsum(volumes)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (turnover[offsets[1:]] - turnover[offsets[:-1]]) / (sold[offsets[1:]] - sold[offsets[:-1]])
+
+
+def rolling_median(prices: 'np.ndarray', window: int) -> 'np.ndarray':
+    """Median of each `window` consecutive prices, the result is `window - 1` points shorter than `prices`"""
+    _require_numpy()
+    if len(prices) < window:
+        return np.empty(0, np.float64)
+    return np.median(np.lib.stride_tricks.sliding_window_view(prices, window), axis=1)
+
+
+def rolling_medians(histories: Sequence[PriceHistory], window: int) -> List['np.ndarray']:
+    return [rolling_median(price_history_to_arrays(history).prices, window) for history in histories]
+
+
+def spreads(order_books: Sequence[OrderBook]) -> 'np.ndarray':
+    """Lowest sell price minus highest buy price of every order book, NaN when either side is empty"""
+    _require_numpy()
+    highest_buy = np.array([book.buy_prices[0] if len(book.buy_prices) else np.nan for book in order_books])
+    lowest_sell = np.array([book.sell_prices[0] if len(book.sell_prices) else np.nan for book in order_books])
+    return lowest_sell - highest_buy
@@ -0,0 +1,630 @@
+import re
+import json
+import asyncio
+import urllib.parse as urlparse
+from typing import AsyncIterator, Iterable, List, Tuple, Union
+from decimal import Decimal
+
+import aiohttp
+
+from steampy import guard
+from steampy.client import (SteamClient, check_offers_to_accept, get_accept_trade_offer_params,
+                            post_trade_offer_accepts, post_trade_offers, get_offer_outcome,
+                            get_confirmed_offer_outcomes)
+from steampy.exceptions import SevenDaysHoldException, ApiException, TooManyRequests, InventoryFetchError
+from steampy.confirmation import CONFIRMATION_ERRORS, add_confirmation_results
+from steampy.login import LoginExecutor, InvalidCredentials
+from steampy.async_market import AsyncSteamMarket
+from steampy.models import (Asset, TradeOfferState, SteamUrl, GameOptions, InventoryStatus, InventoryResult,
+                            OfferRequest, OfferStatus, OfferOutcome)
+from steampy.item_index import ItemNameIdIndex
+from steampy.ratelimit import RateLimiter
+from steampy.utils import (
+    text_between,
+    texts_between,
+    merge_items_with_descriptions_from_inventory,
+    steam_id_to_account_id,
+    merge_items_with_descriptions_from_offers,
+    merge_items_with_descriptions_from_offer,
+    get_offers_items,
+    description_cache,
+    account_id_to_steam_id,
+    get_key_value_from_url,
+    login_required,
+    SafeSession,
+    AsyncSession,
+    ProxyCarousel,
+)
+
+
+class AsyncSteamClient:
+    """Coroutine counterpart of `SteamClient`.
+
+    All requests go through `AsyncSession`, which shares its cookie jar with the `SafeSession` used for the login
+    handshake, so one logged-in client can run many market and trade operations concurrently on a single event loop.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        username: str = None,
+        password: str = None,
+        steam_guard: str = None,
+        login_cookies: dict = None,
+        ua_header: dict = None,
+        proxy_setting_file: str = None,
+        max_concurrency: int = 100,
+        rate_limiter: RateLimiter = None,
+        item_nameid_index: ItemNameIdIndex = None,
+        session: SafeSession = None,
+        async_session: AsyncSession = None,
+    ) -> None:
+        self._api_key = api_key
+        if session is not None:
+            # Sessions of another client, they already hold its proxies, headers and cookies
+            self._proxy_carousel = session.proxy_carousel
+            self._rate_limiter = session.rate_limiter
+            self._session = session
+        else:
+            self._proxy_carousel = ProxyCarousel(proxy_setting_file)
+            self._rate_limiter = rate_limiter
+            self._session = SafeSession(self._proxy_carousel, rate_limiter=self._rate_limiter)
+            if ua_header:
+                self._session.headers.update(ua_header)
+        if async_session is not None:
+            self._async_session = async_session
+        else:
+            self._async_session = AsyncSession(default_headers=ua_header, proxy_carousel=self._proxy_carousel,
+                                               max_concurrency=max_concurrency, cookies=self._session.cookies,
+                                               rate_limiter=self._rate_limiter)
+
+        self.steam_guard_string = steam_guard
+        if self.steam_guard_string is not None:
+            self.steam_guard = guard.load_steam_guard(self.steam_guard_string)
+        else:
+            self.steam_guard = None
+
+        self.was_login_executed = False
+        self.username = username
+        self._password = password
+        self.market = AsyncSteamMarket(self._async_session, item_nameid_index)
+        self._login_cookies = login_cookies
+
+    @classmethod
+    def from_client(cls, client: SteamClient) -> 'AsyncSteamClient':
+        """Create an async client sharing sessions and login state with an existing `SteamClient`"""
+        async_client = cls(client._api_key, username=client.username, password=client._password,
+                           item_nameid_index=client.market.item_nameid_index, session=client._session,
+                           async_session=client._async_session)
+        # The guard is copied rather than loaded again from its string, it may have been completed by the login
+        async_client.steam_guard_string = client.steam_guard_string
+        async_client.steam_guard = client.steam_guard
+        async_client.was_login_executed = client.was_login_executed
+        if client.was_login_executed:
+            async_client.market._set_login_executed(client.steam_guard, client._get_session_id())
+        return async_client
+
+    async def set_login_cookies(self, cookies: dict) -> None:
+        self._session.cookies.update(cookies)
+        self.was_login_executed = True
+
+        if self.steam_guard is None:
+            self.steam_guard = {'steamid': str(await self.get_steam_id())}
+
+        self.market._set_login_executed(self.steam_guard, self._get_session_id())
+
+    @login_required
+    async def get_steam_id(self) -> int:
+        response = await self._async_session.async_get(SteamUrl.COMMUNITY_URL, expect_json=False, use_proxy=False)
+        if isinstance(response, str) and (steam_id := re.search(r'g_steamID = "(\d+)";', response)):
+            return int(steam_id.group(1))
+        else:
+            raise ValueError(f'Invalid steam_id: {response}')
+
+    async def login(self, username: str = None, password: str = None, steam_guard: str = None) -> None:
+        if self._login_cookies:
+            login_cookies, self._login_cookies = self._login_cookies, None
+            await self.set_login_cookies(login_cookies)
+            return
+
+        invalid_client_credentials_is_present = None in (self.username, self._password, self.steam_guard_string)
+        invalid_login_credentials_is_present = None in (username, password, steam_guard)
+
+        if invalid_client_credentials_is_present and invalid_login_credentials_is_present:
+            raise InvalidCredentials(
+                'You have to pass username, password and steam_guard parameters when using "login" method'
+            )
+
+        if invalid_client_credentials_is_present:
+            self.steam_guard_string = steam_guard
+            self.steam_guard = guard.load_steam_guard(self.steam_guard_string)
+            self.username = username
+            self._password = password
+
+        if self.was_login_executed and await self.is_session_alive():
+            return  # Session is alive, no need to login again
+
+        # Login is a short sequential handshake on SafeSession, run it off the event loop
+        self._session.cookies.set('steamRememberLogin', 'true')
+        login_executor = LoginExecutor(self.username, self._password, self.steam_guard['shared_secret'], self._session)
+        await asyncio.get_running_loop().run_in_executor(None, login_executor.login)
+        self.was_login_executed = True
+        self.market._set_login_executed(self.steam_guard, self._get_session_id())
+
+    @login_required
+    async def logout(self) -> None:
+        url = f'{SteamUrl.STORE_URL}/login/logout/'
+        data = {'sessionid': self._get_session_id()}
+        await self._async_session.async_post(url, expect_json=False, use_proxy=False, data=data)
+
+        if await self.is_session_alive():
+            raise Exception('Logout unsuccessful')
+
+        self.was_login_executed = False
+
+    async def __aenter__(self):
+        await self.login(self.username, self._password, self.steam_guard_string)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            await self.logout()
+        finally:
+            await self._async_session.close_aiohttp_session()
+
+    @login_required
+    async def is_session_alive(self) -> bool:
+        steam_login = self.username
+        main_page_response = await self._async_session.async_get(SteamUrl.COMMUNITY_URL, expect_json=False,
+                                                                 use_proxy=False)
+        return isinstance(main_page_response, str) and steam_login.lower() in main_page_response.lower()
+
+    async def api_call(self, method: str, interface: str, api_method: str, version: str, params: dict = None) -> dict:
+        url = '/'.join((SteamUrl.API_URL, interface, api_method, version))
+        if method == 'GET':
+            response = await self._async_session.async_get(url, use_proxy=False, params=params)
+        else:
+            response = await self._async_session.async_post(url, use_proxy=False, data=params)
+        if self.is_invalid_api_key(response):
+            raise InvalidCredentials('Invalid API key')
+
+        return response
+
+    @staticmethod
+    def is_invalid_api_key(response) -> bool:
+        msg = 'Access is denied. Retrying will not help. Please verify your <pre>key=</pre> parameter'
+        return AsyncSession.get_failure_status(response) == 403 or (isinstance(response, str) and msg in response)
+
+    @login_required
+    async def get_my_inventory(self, game: GameOptions, merge: bool = True, count: int = 5000,
+                               start_assetid: int = 0, use_proxy=False, item_views: bool = False) -> dict:
+        steam_id = self.steam_guard['steamid']
+        return await self.get_partner_inventory(steam_id, game, merge, count, start_assetid, use_proxy, item_views)
+
+    @login_required
+    async def get_partner_inventory(
+        self, partner_steam_id: str, game: GameOptions, merge: bool = True, count: int = 5000, start_assetid: int = 0,
+            use_proxy=False, item_views: bool = False
+    ) -> dict:
+        url = '/'.join((SteamUrl.COMMUNITY_URL, 'inventory', partner_steam_id, game.app_id, game.context_id))
+        params = {'l': 'english', 'count': count, 'start_assetid': start_assetid}
+
+        response_dict = await self._async_session.async_get(url, use_proxy=use_proxy, params=params)
+        status = self._async_session.get_failure_status(response_dict)
+        if status == 429:
+            return {}
+        elif status or response_dict.get('success') != 1:
+            return {0: {"tradable": 0}}
+
+        return merge_items_with_descriptions_from_inventory(response_dict, game, item_views) if merge else response_dict
+
+    @login_required
+    async def iter_inventory(
+        self, partner_steam_id: str, game: GameOptions, merge: bool = True, count: int = 5000, use_proxy=False,
+            item_views: bool = False
+    ) -> AsyncIterator[dict]:
+        """Yield the inventory page by page, following `last_assetid` while Steam reports `more_items`.
+
+        Unlike `get_partner_inventory`, a page that cannot be fetched raises instead of ending the inventory early.
+        """
+        url = '/'.join((SteamUrl.COMMUNITY_URL, 'inventory', partner_steam_id, game.app_id, game.context_id))
+        start_assetid = None
+        while True:
+            params = {'l': 'english', 'count': count}
+            if start_assetid is not None:
+                params['start_assetid'] = start_assetid
+            response_dict = await self._async_session.async_get(url, use_proxy=use_proxy, params=params)
+            status = self._async_session.get_failure_status(response_dict)
+            if status == 429:
+                raise TooManyRequests(f'Too many requests while fetching inventory of {partner_steam_id}')
+            elif status:
+                raise InventoryFetchError(f'Unable to fetch inventory page of {partner_steam_id}, HTTP code: {status}',
+                                          status)
+
+            if merge:
+                yield merge_items_with_descriptions_from_inventory(response_dict, game, item_views)
+            else:
+                yield response_dict
+            if not response_dict.get('more_items'):
+                return
+            start_assetid = response_dict['last_assetid']
+
+    @login_required
+    async def fetch_inventories(
+        self, inventories: List[Tuple[str, GameOptions]], merge: bool = True, count: int = 5000,
+        max_concurrency: int = 20, timeout: float = 30, use_proxy=True, item_views: bool = False
+    ) -> AsyncIterator[InventoryResult]:
+        """Fetch many inventories concurrently and yield an `InventoryResult` for each as soon as it completes.
+
+        At most `max_concurrency` inventories are fetched at once, through the async proxy pool by default. `timeout`
+        applies to every page request separately.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(steam_id: str, game: GameOptions) -> InventoryResult:
+            async with semaphore:
+                return await self._fetch_whole_inventory(steam_id, game, merge, count, timeout, use_proxy, item_views)
+
+        tasks = [asyncio.ensure_future(fetch(steam_id, game)) for steam_id, game in inventories]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_whole_inventory(
+        self, steam_id: str, game: GameOptions, merge: bool, count: int, timeout: float, use_proxy, item_views: bool
+    ) -> InventoryResult:
+        # Without merge, items maps the page number to the raw page
+        items = {}
+        pages = self.iter_inventory(steam_id, game, merge, count, use_proxy, item_views)
+        try:
+            while True:
+                try:
+                    page = await asyncio.wait_for(pages.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return InventoryResult(steam_id, game, InventoryStatus.OK, items)
+                except asyncio.TimeoutError:
+                    return InventoryResult(steam_id, game, InventoryStatus.TIMEOUT, items)
+                except TooManyRequests:
+                    return InventoryResult(steam_id, game, InventoryStatus.RATE_LIMITED, items)
+                except InventoryFetchError as error:
+                    return InventoryResult(steam_id, game, self._get_inventory_status(error.status), items)
+                except (ApiException, aiohttp.ClientError):
+                    return InventoryResult(steam_id, game, InventoryStatus.ERROR, items)
+                if merge:
+                    items.update(page)
+                else:
+                    items[len(items)] = page
+        finally:
+            await pages.aclose()
+
+    @staticmethod
+    def _get_inventory_status(http_status: int) -> InventoryStatus:
+        if http_status == 403:
+            return InventoryStatus.PRIVATE
+        elif http_status == 429:
+            return InventoryStatus.RATE_LIMITED
+        elif http_status in (400, 404, 500):
+            return InventoryStatus.UNAVAILABLE
+        return InventoryStatus.ERROR
+
+    def _get_session_id(self) -> str:
+        return self._session.cookies.get_dict()['sessionid']
+
+    async def get_trade_offers_summary(self, time_last_visit: int = None) -> dict:
+        """New and updated counts are relative to `time_last_visit`, an epoch second, when given"""
+        params = {'key': self._api_key}
+        if time_last_visit is not None:
+            params['time_last_visit'] = time_last_visit
+        return await self.api_call('GET', 'IEconService', 'GetTradeOffersSummary', 'v1', params)
+
+    async def get_trade_offers(self, merge: bool = True, use_description_cache: bool = False,
+                               historical_cutoff: int = None) -> dict:
+        """With `use_description_cache` descriptions are only requested when some offered item is not cached yet.
+
+        With `historical_cutoff`, an epoch second, offers updated since then are returned too whatever their state.
+        """
+        params = {
+            'key': self._api_key,
+            'get_sent_offers': 1,
+            'get_received_offers': 1,
+            'get_descriptions': 0 if merge and use_description_cache else 1,
+            'language': 'english',
+            'active_only': 1,
+            'historical_only': 0,
+            'time_historical_cutoff': historical_cutoff if historical_cutoff is not None else '',
+        }
+        response = await self.api_call('GET', 'IEconService', 'GetTradeOffers', 'v1', params)
+        if historical_cutoff is None:
+            response = SteamClient._filter_non_active_offers(response)
+        if merge and use_description_cache:
+            # One lookup, the descriptions it returns stay valid even if the cache evicts them meanwhile
+            descriptions = description_cache.descriptions_for(get_offers_items(response))
+            if descriptions is None:
+                return await self.get_trade_offers(merge, historical_cutoff=historical_cutoff)
+            return merge_items_with_descriptions_from_offers(response, descriptions)
+
+        return merge_items_with_descriptions_from_offers(response) if merge else response
+
+    async def get_trade_offer(self, trade_offer_id: str, merge: bool = True) -> dict:
+        params = {'key': self._api_key, 'tradeofferid': trade_offer_id, 'language': 'english'}
+        response = await self.api_call('GET', 'IEconService', 'GetTradeOffer', 'v1', params)
+
+        if merge and 'descriptions' in response['response']:
+            descriptions = description_cache.update(response['response']['descriptions'])
+            offer = response['response']['offer']
+            response['response']['offer'] = merge_items_with_descriptions_from_offer(offer, descriptions)
+
+        return response
+
+    async def get_trade_history(
+        self,
+        max_trades: int = 100,
+        start_after_time=None,
+        start_after_tradeid=None,
+        get_descriptions: bool = True,
+        navigating_back: bool = True,
+        include_failed: bool = True,
+        include_total: bool = True,
+    ) -> dict:
+        params = {
+            'key': self._api_key,
+            'max_trades': max_trades,
+            'start_after_time': start_after_time,
+            'start_after_tradeid': start_after_tradeid,
+            'get_descriptions': get_descriptions,
+            'navigating_back': navigating_back,
+            'include_failed': include_failed,
+            'include_total': include_total,
+        }
+        return await self.api_call('GET', 'IEconService', 'GetTradeHistory', 'v1', params)
+
+    @login_required
+    async def get_trade_receipt(self, trade_id: str):
+        html = await self._async_session.async_get(f'{SteamUrl.COMMUNITY_URL}/trade/{trade_id}/receipt',
+                                                   expect_json=False, use_proxy=False)
+        return [json.loads(item) for item in texts_between(html, 'oItem = ', ';\n\toItem')]
+
+    @login_required
+    async def accept_trade_offer(self, trade_offer_id: str) -> dict:
+        trade = await self.get_trade_offer(trade_offer_id)
+        offer = trade['response']['offer']
+        trade_offer_state = TradeOfferState(offer['trade_offer_state'])
+        if trade_offer_state is not TradeOfferState.Active:
+            raise ApiException(f'Invalid trade offer state: {trade_offer_state.name} ({trade_offer_state.value})')
+
+        if 'accountid_other' in offer:
+            partner = account_id_to_steam_id(offer['accountid_other'])
+        else:
+            partner = await self._fetch_trade_partner_id(trade_offer_id)
+        accept_url = f'{SteamUrl.COMMUNITY_URL}/tradeoffer/{trade_offer_id}/accept'
+        params = get_accept_trade_offer_params(self._get_session_id(), trade_offer_id, partner)
+        headers = {'Referer': SteamClient._get_trade_offer_url(trade_offer_id)}
+
+        response = await self._async_session.async_post(accept_url, use_proxy=False, validate_success=False,
+                                                        data=params, headers=headers)
+        if isinstance(response, dict) and response.get('needs_mobile_confirmation', False):
+            return await self._confirm_transaction(trade_offer_id)
+
+        return response
+
+    @login_required
+    async def accept_trade_offers(self, trade_offer_ids: List[str], max_concurrency: int = 4) -> dict:
+        """See `SteamClient.accept_trade_offers`"""
+        trade_offer_ids = list(dict.fromkeys(map(str, trade_offer_ids)))
+        offers = await self._get_received_offers(trade_offer_ids)
+        results, partners = check_offers_to_accept(trade_offer_ids, offers)
+        unknown_partners = [trade_offer_id for trade_offer_id, partner in partners.items() if partner is None]
+        partners.update(zip(unknown_partners, await asyncio.gather(
+            *map(self._fetch_trade_partner_id, unknown_partners))))
+        results.update(await post_trade_offer_accepts(self._async_session, self._get_session_id(), partners,
+                                                      max_concurrency))
+        needs_confirmation = [trade_offer_id for trade_offer_id, response in results.items()
+                              if response.get('needs_mobile_confirmation')]
+        if needs_confirmation:
+            try:
+                confirmed = await self.market.confirmation_executor.confirm_trade_offers(needs_confirmation)
+            except CONFIRMATION_ERRORS as error:
+                add_confirmation_results(results, needs_confirmation, error=error)
+            else:
+                add_confirmation_results(results, needs_confirmation, confirmed)
+        return {trade_offer_id: results[trade_offer_id] for trade_offer_id in trade_offer_ids}
+
+    async def _get_received_offers(self, trade_offer_ids: List[str]) -> dict:
+        params = {
+            'key': self._api_key,
+            'get_sent_offers': 0,
+            'get_received_offers': 1,
+            'get_descriptions': 0,
+            'language': 'english',
+            'active_only': 1,
+            'historical_only': 0,
+            'time_historical_cutoff': '',
+        }
+        response = await self.api_call('GET', 'IEconService', 'GetTradeOffers', 'v1', params)
+        offers = {offer['tradeofferid']: offer for offer in response['response'].get('trade_offers_received', [])}
+        missing = [trade_offer_id for trade_offer_id in trade_offer_ids if trade_offer_id not in offers]
+        for trade_offer_id, trade in zip(missing, await asyncio.gather(
+                *(self.get_trade_offer(trade_offer_id, merge=False) for trade_offer_id in missing))):
+            offers[trade_offer_id] = trade['response'].get('offer')
+        return offers
+
+    async def _fetch_trade_partner_id(self, trade_offer_id: str) -> str:
+        url = SteamClient._get_trade_offer_url(trade_offer_id)
+        offer_response_text = await self._async_session.async_get(url, expect_json=False, use_proxy=False)
+        if 'You have logged in from a new device. In order to protect the items' in offer_response_text:
+            raise SevenDaysHoldException("Account has logged in a new device and can't trade for 7 days")
+
+        return text_between(offer_response_text, "var g_ulTradePartnerSteamID = '", "';")
+
+    async def _confirm_transaction(self, trade_offer_id: str) -> dict:
+        return await self.market.confirmation_executor.send_trade_allow_request(trade_offer_id)
+
+    async def decline_trade_offer(self, trade_offer_id: str) -> dict:
+        url = f'{SteamUrl.COMMUNITY_URL}/tradeoffer/{trade_offer_id}/decline'
+        return await self._async_session.async_post(url, use_proxy=False, validate_success=False,
+                                                    data={'sessionid': self._get_session_id()})
+
+    async def cancel_trade_offer(self, trade_offer_id: str) -> dict:
+        url = f'{SteamUrl.COMMUNITY_URL}/tradeoffer/{trade_offer_id}/cancel'
+        return await self._async_session.async_post(url, use_proxy=False, validate_success=False,
+                                                    data={'sessionid': self._get_session_id()})
+
+    async def _send_offer(self, params: dict, headers: dict) -> dict:
+        url = f'{SteamUrl.COMMUNITY_URL}/tradeoffer/new/send'
+        response = await self._async_session.async_post(url, use_proxy=False, validate_success=False, retries=1,
+                                                        data=params, headers=headers)
+        if status := self._async_session.get_failure_status(response):
+            raise ApiException(f'There was a problem sending the trade offer. HTTP code: {status}')
+        if not isinstance(response, dict):
+            raise ApiException(f'There was a problem sending the trade offer. Response: {response}')
+        if response.get('needs_mobile_confirmation'):
+            response.update(await self._confirm_transaction(response['tradeofferid']))
+        return response
+
+    @login_required
+    async def make_offer(
+        self, items_from_me: List[Asset], items_from_them: List[Asset], partner_steam_id: str, message: str = ''
+    ) -> dict:
+        offer = SteamClient._create_offer_dict(items_from_me, items_from_them)
+        params = {
+            'sessionid': self._get_session_id(),
+            'serverid': 1,
+            'partner': partner_steam_id,
+            'tradeoffermessage': message,
+            'json_tradeoffer': json.dumps(offer),
+            'captcha': '',
+            'trade_offer_create_params': '{}',
+        }
+        partner_account_id = steam_id_to_account_id(partner_steam_id)
+        headers = {
+            'Referer': f'{SteamUrl.COMMUNITY_URL}/tradeoffer/new/?partner={partner_account_id}',
+            'Origin': SteamUrl.COMMUNITY_URL,
+        }
+        return await self._send_offer(params, headers)
+
+    @login_required
+    async def make_counter_offer(
+        self, items_from_me: List[Asset], items_from_them: List[Asset], partner_steam_id: str, order_id: str,
+            message: str = '') -> dict:
+        offer = SteamClient._create_offer_dict(items_from_me, items_from_them)
+        params = {
+            'sessionid': self._get_session_id(),
+            'serverid': 1,
+            'partner': partner_steam_id,
+            'tradeoffermessage': message,
+            'json_tradeoffer': json.dumps(offer),
+            'captcha': '',
+            'trade_offer_create_params': '{}',
+            'tradeofferid_countered': order_id,
+        }
+        headers = {
+            'Referer': f'{SteamUrl.COMMUNITY_URL}/tradeoffer/{order_id}',
+            'Origin': SteamUrl.COMMUNITY_URL,
+        }
+        return await self._send_offer(params, headers)
+
+    @login_required
+    async def make_offer_with_url(
+        self,
+        items_from_me: List[Asset],
+        items_from_them: List[Asset],
+        trade_offer_url: str,
+        message: str = '',
+        case_sensitive: bool = True,
+    ) -> dict:
+        token = get_key_value_from_url(trade_offer_url, 'token', case_sensitive)
+        partner_account_id = get_key_value_from_url(trade_offer_url, 'partner', case_sensitive)
+        partner_steam_id = account_id_to_steam_id(partner_account_id)
+        offer = SteamClient._create_offer_dict(items_from_me, items_from_them)
+        trade_offer_create_params = {'trade_offer_access_token': token}
+        params = {
+            'sessionid': self._get_session_id(),
+            'serverid': 1,
+            'partner': partner_steam_id,
+            'tradeoffermessage': message,
+            'json_tradeoffer': json.dumps(offer),
+            'captcha': '',
+            'trade_offer_create_params': json.dumps(trade_offer_create_params),
+        }
+        headers = {
+            'Referer': f'{SteamUrl.COMMUNITY_URL}{urlparse.urlparse(trade_offer_url).path}',
+            'Origin': SteamUrl.COMMUNITY_URL,
+        }
+        return await self._send_offer(params, headers)
+
+    @login_required
+    async def send_offers(self, offers: Iterable[OfferRequest], max_concurrency: int = 4,
+                          confirmation_batch_size: int = 50) -> AsyncIterator[OfferOutcome]:
+        """See `SteamClient.send_offers`.
+
+        Outcomes are yielded as offers complete. Offers waiting for a mobile confirmation are confirmed together once
+        `confirmation_batch_size` of them are collected, and the rest after the last offer was sent.
+        """
+        pending = []
+        sent_offers = post_trade_offers(self._async_session, self._get_session_id(), list(offers), max_concurrency)
+        try:
+            async for offer, response in sent_offers:
+                outcome = get_offer_outcome(offer, response)
+                if outcome.status is not OfferStatus.UNCONFIRMED:
+                    yield outcome
+                    continue
+                pending.append(outcome)
+                if len(pending) >= confirmation_batch_size:
+                    for outcome in await self._confirm_offer_outcomes(pending):
+                        yield outcome
+                    pending = []
+        finally:
+            await sent_offers.aclose()
+        if pending:
+            for outcome in await self._confirm_offer_outcomes(pending):
+                yield outcome
+
+    async def _confirm_offer_outcomes(self, pending: List[OfferOutcome]) -> List[OfferOutcome]:
+        confirmed = await self.market.confirmation_executor.confirm_trade_offers(
+            [outcome.trade_offer_id for outcome in pending])
+        return get_confirmed_offer_outcomes(pending, confirmed)
+
+    async def get_profile(self, steam_id: str) -> dict:
+        params = {'steamids': steam_id, 'key': self._api_key}
+        data = await self.api_call('GET', 'ISteamUser', 'GetPlayerSummaries', 'v0002', params)
+        return data['response']['players'][0]
+
+    async def get_friend_list(self, steam_id: str, relationship_filter: str = 'all') -> dict:
+        params = {'key': self._api_key, 'steamid': steam_id, 'relationship': relationship_filter}
+        data = await self.api_call('GET', 'ISteamUser', 'GetFriendList', 'v1', params)
+        return data['friendslist']['friends']
+
+    @login_required
+    async def get_escrow_duration(self, trade_offer_url: str) -> int:
+        headers = {
+            'Referer': f'{SteamUrl.COMMUNITY_URL}{urlparse.urlparse(trade_offer_url).path}',
+            'Origin': SteamUrl.COMMUNITY_URL,
+        }
+        response = await self._async_session.async_get(trade_offer_url, expect_json=False, use_proxy=False,
+                                                       headers=headers)
+
+        my_escrow_duration = int(text_between(response, 'var g_daysMyEscrow = ', ';'))
+        their_escrow_duration = int(text_between(response, 'var g_daysTheirEscrow = ', ';'))
+
+        return max(my_escrow_duration, their_escrow_duration)
+
+    @login_required
+    # If convert_to_decimal = False, the price will be returned WITHOUT a decimal point.
+    async def get_wallet_balance(self, convert_to_decimal: bool = True, on_hold: bool = False) -> Union[str, Decimal]:
+        attempts = 5
+        while attempts > 0:
+            response = await self._async_session.async_get(f'{SteamUrl.COMMUNITY_URL}/market', expect_json=False,
+                                                           use_proxy=False)
+            if isinstance(response, str) and (wallet_info_match := re.search(r'var g_rgWalletInfo = (.*?);', response)):
+                balance_dict = json.loads(wallet_info_match.group(1))
+                balance_dict_key = 'wallet_delayed_balance' if on_hold else 'wallet_balance'
+                if convert_to_decimal:
+                    return Decimal(balance_dict[balance_dict_key]) / 100
+                else:
+                    return balance_dict[balance_dict_key]
+            attempts -= 1
+            await asyncio.sleep(20)
+        raise Exception('Unable to get wallet balance string match')
@@ -0,0 +1,333 @@
+import asyncio
+import urllib.parse
+from typing import Iterable, Optional, Tuple
+from decimal import Decimal
+
+from steampy.confirmation import CONFIRMATION_ERRORS, AsyncConfirmationExecutor, add_confirmation_results
+from steampy.exceptions import ApiException, TooManyRequests
+from steampy.market import (
+    fetch_listing_pages,
+    get_listings_from_market_page,
+    get_listings_count_from_market_page,
+    get_listing_page_urls,
+    get_listing_url,
+    get_price_history_from_html,
+    get_sell_order_data,
+    get_trade_history_from_response,
+    merge_listings_page,
+    parse_listing_url,
+    post_sell_orders,
+    remember_item_nameid,
+)
+from steampy.item_index import ItemNameIdIndex
+from steampy.models import Currency, SteamUrl, GameOptions
+from steampy.utils import login_required, AsyncSession
+
+
+class AsyncSteamMarket:
+    def __init__(self, async_session: AsyncSession, item_nameid_index: ItemNameIdIndex = None) -> None:
+        self._async_session = async_session
+        self.item_nameid_index = item_nameid_index if item_nameid_index is not None else ItemNameIdIndex()
+        self._steam_guard = None
+        self._session_id = None
+        self._confirmation_executor = None
+        self.was_login_executed = False
+
+    def _set_login_executed(self, steamguard: dict, session_id: str) -> None:
+        self._steam_guard = steamguard
+        self._session_id = session_id
+        self._confirmation_executor = None
+        self.was_login_executed = True
+
+    @property
+    def confirmation_executor(self) -> AsyncConfirmationExecutor:
+        """One executor per account, so all confirmations share its cached confirmation list"""
+        if self._confirmation_executor is None:
+            self._confirmation_executor = AsyncConfirmationExecutor(
+                self._steam_guard['identity_secret'], self._steam_guard['steamid'], self._async_session
+            )
+        return self._confirmation_executor
+
+    async def fetch_price(self, item_hash_name: str, game: GameOptions, currency: str = Currency.USD) -> dict:
+        url = SteamUrl.COMMUNITY_URL + '/market/priceoverview/'
+        params = {'country': 'PL',
+                  'currency': currency.value,
+                  'appid': game.app_id,
+                  'market_hash_name': item_hash_name}
+        response = await self._async_session.async_get(url, params=params)
+        if self._async_session.get_failure_status(response) == 429:
+            raise TooManyRequests("You can fetch maximum 20 prices in 60s period")
+        return response
+
+    async def fetch_price_offer(self, item_hash_name: str, game: GameOptions, currency: str = Currency.USD) -> dict:
+        item_market_url = SteamUrl.COMMUNITY_URL + '/market/listings/' + game.app_id + '/' + item_hash_name
+        url = item_market_url + "/render/?query=&start=0&count=20&country=UA&language=english&currency=18"
+        headers = {'Referer': item_market_url}
+        response = await self._async_session.async_get(url, headers=headers)
+        if self._async_session.get_failure_status(response) == 429:
+            raise TooManyRequests("You can fetch maximum 20 prices in 60s period")
+        return response
+
+    @login_required
+    async def fetch_price_history(self, item_market_url: str, game: GameOptions, get_id=False,
+                                  columns=False) -> tuple:
+        url = SteamUrl.COMMUNITY_URL + '/market/listings/' + game.app_id + '/' + item_market_url
+        response = await self._async_session.async_get(url, expect_json=False)
+        status = self._async_session.get_failure_status(response)
+        if status == 429:
+            raise TooManyRequests("You can fetch maximum 20 prices in 60s period")
+        page = get_price_history_from_html(response if not status else '', get_id=True, columns=columns)
+        remember_item_nameid(self.item_nameid_index, game, item_market_url, page.item_nameid)
+        return page if get_id else page[:2]
+
+    @login_required
+    async def fetch_item_orders_histogram(self, item_nameid: Optional[str], item_market_url: str,
+                                          currency: str = Currency.USD) -> dict:
+        """Without `item_nameid` it is resolved from `item_market_url` through `item_nameid_index`"""
+        if item_nameid is None:
+            game, item_hash_name = parse_listing_url(item_market_url)
+            item_nameid = await self.get_item_nameid(item_hash_name, game)
+        url = SteamUrl.COMMUNITY_URL + '/market/itemordershistogram'
+        params = {'country': 'UA',
+                  'language': 'english',
+                  'currency': currency.value,
+                  'item_nameid': item_nameid,
+                  'two_factor': '0'}
+        headers = {'Referer': item_market_url}
+        response = await self._async_session.async_get(url, params=params, headers=headers)
+        if self._async_session.get_failure_status(response) == 429:
+            raise TooManyRequests("You can fetch maximum 20 prices in 60s period")
+        return response
+
+    @login_required
+    async def get_item_nameid(self, item_hash_name: str, game: GameOptions) -> int:
+        """Look the item_nameid up in `item_nameid_index`, scraping and indexing its listing page on a miss"""
+        item_nameid = self.item_nameid_index.get(game.app_id, item_hash_name)
+        if item_nameid is None:
+            item_nameid = (await self.fetch_price_history(item_hash_name, game, get_id=True, columns=True)).item_nameid
+            if not item_nameid:
+                raise ApiException(f'There is no item_nameid on the listing page of {item_hash_name}')
+        return item_nameid
+
+    @login_required
+    async def fetch_item_orders_histogram_by_name(self, item_hash_name: str, game: GameOptions,
+                                                  currency: str = Currency.USD) -> dict:
+        item_nameid = await self.get_item_nameid(item_hash_name, game)
+        return await self.fetch_item_orders_histogram(item_nameid, get_listing_url(item_hash_name, game), currency)
+
+    @login_required
+    async def get_my_market_listings(self, max_concurrency: int = 1) -> dict:
+        response = await self._async_session.async_get(f'{SteamUrl.COMMUNITY_URL}/market', expect_json=False,
+                                                       use_proxy=False)
+        if status := self._async_session.get_failure_status(response):
+            raise ApiException(f'There was a problem getting the listings. HTTP code: {status}')
+        listings = get_listings_from_market_page(response)
+
+        if '<span id="tabContentsMyActiveMarketListings_end">' in response:
+            n_showing, n_total = get_listings_count_from_market_page(response)
+
+            if n_showing < n_total < 1000:
+                urls = [f'{SteamUrl.COMMUNITY_URL}/market/mylistings/render/?query=&start={n_showing}&count={-1}']
+            else:
+                urls = get_listing_page_urls(n_showing, n_total)
+            for page in await fetch_listing_pages(self._async_session, urls, max_concurrency):
+                listings = merge_listings_page(listings, page)
+
+        return listings
+
+    @login_required
+    async def create_sell_order(self, assetid: str, game: GameOptions, money_to_receive: str) -> dict:
+        data = get_sell_order_data(self._session_id, assetid, game, money_to_receive)
+        headers = {'Referer': f'{SteamUrl.COMMUNITY_URL}/profiles/{self._steam_guard["steamid"]}/inventory'}
+        response = await self._async_session.async_post(f'{SteamUrl.COMMUNITY_URL}/market/sellitem/',
+                                                        use_proxy=False, validate_success=False, retries=1, data=data,
+                                                        headers=headers)
+        if status := self._async_session.get_failure_status(response):
+            message = response.get('message') if isinstance(response, dict) else None
+            raise ApiException(f'There was a problem creating the sell order. HTTP code: {status}'
+                               + (f', message: {message}' if message else ''))
+        if response.get("needs_mobile_confirmation"):
+            r = await self._confirm_sell_listing(assetid)
+            while not r.get('success'):
+                await asyncio.sleep(5)
+                r = await self._confirm_sell_listing(assetid)
+            return r
+        return response
+
+    @login_required
+    async def create_sell_orders(self, orders: Iterable[Tuple[str, str]], game: GameOptions,
+                                 max_concurrency: int = 4) -> dict:
+        """See `SteamMarket.create_sell_orders`"""
+        orders = {str(assetid): money_to_receive for assetid, money_to_receive in orders}
+        results = await post_sell_orders(self._async_session, self._session_id, self._steam_guard['steamid'], orders,
+                                         game, max_concurrency)
+        needs_confirmation = [assetid for assetid, response in results.items()
+                              if response.get('needs_mobile_confirmation')]
+        if needs_confirmation:
+            try:
+                confirmed = await self.confirmation_executor.confirm_sell_listings(needs_confirmation)
+            except CONFIRMATION_ERRORS as error:
+                add_confirmation_results(results, needs_confirmation, error=error)
+            else:
+                add_confirmation_results(results, needs_confirmation, confirmed)
+        return results
+
+    @login_required
+    async def create_buy_order(
+        self,
+        market_name: str,
+        price_single_item: str,
+        quantity: int,
+        game: GameOptions,
+        currency: Currency = Currency.USD,
+    ) -> dict:
+        data = {
+            'sessionid': self._session_id,
+            'currency': currency.value,
+            'appid': game.app_id,
+            'market_hash_name': market_name,
+            'price_total': str(Decimal(price_single_item) * Decimal(quantity)),
+            'quantity': quantity,
+        }
+        headers = {
+            'Referer': f'{SteamUrl.COMMUNITY_URL}/market/listings/{game.app_id}/{urllib.parse.quote(market_name)}'
+        }
+        response = None
+        attempts = 5
+        while attempts > 0:
+            response = await self._async_session.async_post(f'{SteamUrl.COMMUNITY_URL}/market/createbuyorder/',
+                                                            use_proxy=False, validate_success=False, data=data,
+                                                            headers=headers)
+            if self._async_session.get_failure_status(response):
+                break
+            if response.get("success") in (16, 40, 107):
+                attempts -= 1
+                await asyncio.sleep(5)
+            else:
+                break
+
+        if self._async_session.get_failure_status(response):
+            raise ApiException("There was a problem creating the order. Are you using the right currency? success: %s"
+                               % response)
+        return response
+
+    @login_required
+    async def buy_item(
+        self,
+        market_name: str,
+        market_id: str,
+        price: int,
+        fee: int,
+        game: GameOptions,
+        currency: Currency = Currency.USD,
+    ) -> dict:
+        data = {
+            'sessionid': self._session_id,
+            'currency': currency.value,
+            'subtotal': price - fee,
+            'fee': fee,
+            'total': price,
+            'quantity': '1',
+        }
+        headers = {
+            'Referer': f'{SteamUrl.COMMUNITY_URL}/market/listings/{game.app_id}/{urllib.parse.quote(market_name)}'
+        }
+        response = await self._async_session.async_post(f'{SteamUrl.COMMUNITY_URL}/market/buylisting/{market_id}',
+                                                        use_proxy=False, validate_success=False, data=data,
+                                                        headers=headers)
+        if status := self._async_session.get_failure_status(response):
+            raise ApiException(f'There was a problem buying this item. HTTP code: {status}')
+        try:
+            if (success := response['wallet_info']['success']) != 1:
+                raise ApiException(
+                    f'There was a problem buying this item. Are you using the right currency? success: {success}'
+                )
+        except Exception:
+            raise ApiException(f'There was a problem buying this item. Message: {response.get("message")}')
+
+        return response
+
+    @login_required
+    async def cancel_sell_order(self, sell_listing_id: str) -> None:
+        data = {'sessionid': self._session_id}
+        headers = {'Referer': f'{SteamUrl.COMMUNITY_URL}/market/'}
+        url = f'{SteamUrl.COMMUNITY_URL}/market/removelisting/{sell_listing_id}'
+        response = await self._async_session.async_post(url, use_proxy=False, validate_success=False, data=data,
+                                                        headers=headers)
+        if status := self._async_session.get_failure_status(response):
+            raise ApiException("There was a problem removing the listing. http code: %s" % status)
+
+    @login_required
+    async def get_sell_order(self, sell_listing_id: str) -> dict:
+        data = {'sessionid': self._session_id}
+        headers = {'Referer': f'{SteamUrl.COMMUNITY_URL}/market'}
+        url = "%s/market/getbuyorderstatus/?sessionid=%s&buy_orderid=%s" % (SteamUrl.COMMUNITY_URL, self._session_id,
+                                                                            sell_listing_id)
+        response = await self._async_session.async_post(url, use_proxy=False, validate_success=False, data=data,
+                                                        headers=headers)
+        if status := self._async_session.get_failure_status(response):
+            raise ApiException("There was a problem removing the listing. http code: %s" % status)
+        return response
+
+    @login_required
+    async def cancel_buy_order(self, buy_order_id) -> dict:
+        data = {'sessionid': self._session_id, 'buy_orderid': buy_order_id}
+        headers = {'Referer': f'{SteamUrl.COMMUNITY_URL}/market'}
+        response = None
+        attempts = 5
+        while attempts > 0:
+            response = await self._async_session.async_post(f'{SteamUrl.COMMUNITY_URL}/market/cancelbuyorder/',
+                                                            use_proxy=False, validate_success=False, data=data,
+                                                            headers=headers)
+            if self._async_session.get_failure_status(response):
+                break
+            if response.get("success") != 1:
+                attempts -= 1
+                await asyncio.sleep(5 * (5 - attempts))
+            else:
+                break
+        return response
+
+    @login_required
+    async def get_latest_trade_hist(self, request_size=10, request_start=0):
+        headers = {"Referer": SteamUrl.COMMUNITY_URL + "/market"}
+        url = "%s/market/myhistory/render/?query=&start=%s&count=%s" % \
+              (SteamUrl.COMMUNITY_URL, str(request_start), str(request_size))
+        response = None
+        attempts = 10
+        while attempts > 0:
+            response = await self._async_session.async_get(url, use_proxy=False, headers=headers)
+            if status := self._async_session.get_failure_status(response):
+                raise ApiException(f'Problem while obtaining latest trade hist. HTTP code: {status}')
+            if response.get("total_count", 0) == 0:
+                await asyncio.sleep(5)
+                attempts -= 1
+            else:
+                break
+        if response.get("total_count", 0) == 0:
+            raise ApiException("Problem while obtaining latest trade hist: zero size ", response)
+
+        return get_trade_history_from_response(response)
+
+    @login_required
+    async def search(self, request_start, game: GameOptions, request_size=100):
+        """Parse search"""
+        headers = {"Referer": SteamUrl.COMMUNITY_URL + "/market/search?appid=" + str(game.app_id)}
+        url = "%s/market/search/render/?query=&start=%s&count=%s&search_descriptions=0&sort_column=name&sort_dir=asc&appid=%s&norender=1" % \
+              (SteamUrl.COMMUNITY_URL, str(request_start), str(request_size), str(game.app_id))
+        response = None
+        attempts = 5
+        while attempts > 0:
+            response = await self._async_session.async_get(url, validate_success=False, headers=headers)
+            if self._async_session.get_failure_status(response) or not response.get("success"):
+                await asyncio.sleep(5)
+                attempts -= 1
+            else:
+                break
+        if self._async_session.get_failure_status(response) or not response.get("success"):
+            raise ApiException("Problem while obtaining latest trade hist: zero size ", response)
+
+        return response["results"]
+
+    async def _confirm_sell_listing(self, asset_id: str) -> dict:
+        return await self.confirmation_executor.confirm_sell_listing(asset_id)
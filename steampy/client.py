@@ -2,25 +2,29 @@ import re
 import bs4
 import json
 import time
+import asyncio
 import urllib.parse as urlparse
-from typing import List, Union
+from typing import AsyncIterator, Iterable, Iterator, List, Union
 from decimal import Decimal
 import requests
 
 from steampy import guard
-from steampy.confirmation import ConfirmationExecutor
-from steampy.exceptions import SevenDaysHoldException, ApiException
+from steampy.exceptions import SevenDaysHoldException, ApiException, TooManyRequests, InventoryFetchError
+from steampy.confirmation import CONFIRMATION_ERRORS, add_confirmation_results
 from steampy.login import LoginExecutor, InvalidCredentials
 from steampy.market import SteamMarket
-from steampy.models import Asset, TradeOfferState, SteamUrl, GameOptions
+from steampy.models import Asset, TradeOfferState, SteamUrl, GameOptions, OfferRequest, OfferStatus, OfferOutcome
+from steampy.item_index import ItemNameIdIndex
+from steampy.ratelimit import RateLimiter
 from steampy.utils import (
     text_between,
     texts_between,
     merge_items_with_descriptions_from_inventory,
     steam_id_to_account_id,
     merge_items_with_descriptions_from_offers,
-    get_description_key,
     merge_items_with_descriptions_from_offer,
+    get_offers_items,
+    description_cache,
     account_id_to_steam_id,
     get_key_value_from_url,
     ping_proxy,
@@ -40,12 +44,16 @@ class SteamClient:
         login_cookies: dict = None,
         proxies: dict = None,
         ua_header: dict = None,
-        proxy_setting_file: str = None
+        proxy_setting_file: str = None,
+        rate_limiter: RateLimiter = None,
+        item_nameid_index: ItemNameIdIndex = None,
     ) -> None:
         self._api_key = api_key
         self._proxy_carousel = ProxyCarousel(proxy_setting_file)
-        self._session = SafeSession(self._proxy_carousel)
-        self._async_session = AsyncSession(default_headers=ua_header,proxy_carousel=self._proxy_carousel)
+        self._rate_limiter = rate_limiter
+        self._session = SafeSession(self._proxy_carousel, rate_limiter=self._rate_limiter)
+        self._async_session = AsyncSession(default_headers=ua_header, proxy_carousel=self._proxy_carousel,
+                                           cookies=self._session.cookies, rate_limiter=self._rate_limiter)
         self._session.headers.update(ua_header)
 
         if proxies:
@@ -60,7 +68,7 @@ class SteamClient:
         self.was_login_executed = False
         self.username = username
         self._password = password
-        self.market = SteamMarket(self._session, self._async_session)
+        self.market = SteamMarket(self._session, self._async_session, item_nameid_index)
 
         if login_cookies:
             self.set_login_cookies(login_cookies)
@@ -160,14 +168,14 @@ class SteamClient:
 
     @login_required
     def get_my_inventory(self, game: GameOptions, merge: bool = True, count: int = 5000, start_assetid: int = 0,
-                         use_proxy=False) -> dict:
+                         use_proxy=False, item_views: bool = False) -> dict:
         steam_id = self.steam_guard['steamid']
-        return self.get_partner_inventory(steam_id, game, merge, count, start_assetid, use_proxy)
+        return self.get_partner_inventory(steam_id, game, merge, count, start_assetid, use_proxy, item_views)
 
     @login_required
     def get_partner_inventory(
         self, partner_steam_id: str, game: GameOptions, merge: bool = True, count: int = 5000, start_assetid: int = 0,
-            use_proxy=False
+            use_proxy=False, item_views: bool = False
     ) -> dict:
         url = '/'.join((SteamUrl.COMMUNITY_URL, 'inventory', partner_steam_id, game.app_id, game.context_id))
         params = {'l': 'english', 'count': count, 'start_assetid': start_assetid}
@@ -184,28 +192,74 @@ class SteamClient:
             print("Was unable to get inv after multiple attempts")
             return {0: {"tradable": 0}}
 
-        return merge_items_with_descriptions_from_inventory(response_dict, game) if merge else response_dict
+        return merge_items_with_descriptions_from_inventory(response_dict, game, item_views) if merge else response_dict
+
+    @login_required
+    def iter_inventory(
+        self, partner_steam_id: str, game: GameOptions, merge: bool = True, count: int = 5000, use_proxy=False,
+            item_views: bool = False
+    ) -> Iterator[dict]:
+        """Yield the inventory page by page, following `last_assetid` while Steam reports `more_items`.
+
+        Unlike `get_partner_inventory`, a page that cannot be fetched raises instead of ending the inventory early.
+        """
+        url = '/'.join((SteamUrl.COMMUNITY_URL, 'inventory', partner_steam_id, game.app_id, game.context_id))
+        start_assetid = None
+        while True:
+            params = {'l': 'english', 'count': count}
+            if start_assetid is not None:
+                params['start_assetid'] = start_assetid
+            response = self._session.safe_get(url, expect_json=True, use_proxy=use_proxy, params=params)
+            if response.status_code == requests.codes.TOO_MANY_REQUESTS:
+                raise TooManyRequests(f'Too many requests while fetching inventory of {partner_steam_id}')
+            response_dict = response.json()
+            if response.status_code != requests.codes.OK or not response_dict or response_dict.get('success') != 1:
+                raise InventoryFetchError(f'Unable to fetch inventory page of {partner_steam_id}, '
+                                          f'HTTP code: {response.status_code}', response.status_code)
+
+            if merge:
+                yield merge_items_with_descriptions_from_inventory(response_dict, game, item_views)
+            else:
+                yield response_dict
+            if not response_dict.get('more_items'):
+                return
+            start_assetid = response_dict['last_assetid']
 
     def _get_session_id(self) -> str:
         return self._session.cookies.get_dict()['sessionid']
 
-    def get_trade_offers_summary(self) -> dict:
+    def get_trade_offers_summary(self, time_last_visit: int = None) -> dict:
+        """New and updated counts are relative to `time_last_visit`, an epoch second, when given"""
         params = {'key': self._api_key}
+        if time_last_visit is not None:
+            params['time_last_visit'] = time_last_visit
         return self.api_call('GET', 'IEconService', 'GetTradeOffersSummary', 'v1', params).json()
 
-    def get_trade_offers(self, merge: bool = True) -> dict:
+    def get_trade_offers(self, merge: bool = True, use_description_cache: bool = False,
+                         historical_cutoff: int = None) -> dict:
+        """With `use_description_cache` descriptions are only requested when some offered item is not cached yet.
+
+        With `historical_cutoff`, an epoch second, offers updated since then are returned too whatever their state.
+        """
         params = {
             'key': self._api_key,
             'get_sent_offers': 1,
             'get_received_offers': 1,
-            'get_descriptions': 1,
+            'get_descriptions': 0 if merge and use_description_cache else 1,
             'language': 'english',
             'active_only': 1,
             'historical_only': 0,
-            'time_historical_cutoff': '',
+            'time_historical_cutoff': historical_cutoff if historical_cutoff is not None else '',
         }
         response = self.api_call('GET', 'IEconService', 'GetTradeOffers', 'v1', params).json()
-        response = self._filter_non_active_offers(response)
+        if historical_cutoff is None:
+            response = self._filter_non_active_offers(response)
+        if merge and use_description_cache:
+            # One lookup, the descriptions it returns stay valid even if the cache evicts them meanwhile
+            descriptions = description_cache.descriptions_for(get_offers_items(response))
+            if descriptions is None:
+                return self.get_trade_offers(merge, historical_cutoff=historical_cutoff)
+            return merge_items_with_descriptions_from_offers(response, descriptions)
 
         return merge_items_with_descriptions_from_offers(response) if merge else response
 
@@ -228,7 +282,7 @@ class SteamClient:
         response = self.api_call('GET', 'IEconService', 'GetTradeOffer', 'v1', params).json()
 
         if merge and 'descriptions' in response['response']:
-            descriptions = {get_description_key(offer): offer for offer in response['response']['descriptions']}
+            descriptions = description_cache.update(response['response']['descriptions'])
             offer = response['response']['offer']
             response['response']['offer'] = merge_items_with_descriptions_from_offer(offer, descriptions)
 
@@ -266,20 +320,17 @@ class SteamClient:
     @login_required
     def accept_trade_offer(self, trade_offer_id: str) -> dict:
         trade = self.get_trade_offer(trade_offer_id)
-        trade_offer_state = TradeOfferState(trade['response']['offer']['trade_offer_state'])
+        offer = trade['response']['offer']
+        trade_offer_state = TradeOfferState(offer['trade_offer_state'])
         if trade_offer_state is not TradeOfferState.Active:
             raise ApiException(f'Invalid trade offer state: {trade_offer_state.name} ({trade_offer_state.value})')
 
-        partner = self._fetch_trade_partner_id(trade_offer_id)
-        session_id = self._get_session_id()
+        if 'accountid_other' in offer:
+            partner = account_id_to_steam_id(offer['accountid_other'])
+        else:
+            partner = self._fetch_trade_partner_id(trade_offer_id)
         accept_url = f'{SteamUrl.COMMUNITY_URL}/tradeoffer/{trade_offer_id}/accept'
-        params = {
-            'sessionid': session_id,
-            'tradeofferid': trade_offer_id,
-            'serverid': '1',
-            'partner': partner,
-            'captcha': '',
-        }
+        params = get_accept_trade_offer_params(self._get_session_id(), trade_offer_id, partner)
         headers = {'Referer': self._get_trade_offer_url(trade_offer_id)}
 
         response = self._session.post(accept_url, data=params, headers=headers).json()
@@ -288,6 +339,53 @@ class SteamClient:
 
         return response
 
+    @login_required
+    def accept_trade_offers(self, trade_offer_ids: List[str], max_concurrency: int = 4) -> dict:
+        """Accept many received offers, returns the accept response of each trade offer id.
+
+        Offers are read with one GetTradeOffers request and accepted with at most `max_concurrency` requests in
+        flight. Mobile confirmations are then confirmed together, their result is the `confirmed` field of the
+        response. Offers that could not be accepted get `success` False and an `error`.
+        """
+        trade_offer_ids = list(dict.fromkeys(map(str, trade_offer_ids)))
+        offers = self._get_received_offers(trade_offer_ids)
+        results, partners = check_offers_to_accept(trade_offer_ids, offers)
+        for trade_offer_id, partner in partners.items():
+            if partner is None:
+                partners[trade_offer_id] = self._fetch_trade_partner_id(trade_offer_id)
+        results.update(self._async_session.run(
+            post_trade_offer_accepts(self._async_session, self._get_session_id(), partners, max_concurrency)
+        ))
+        needs_confirmation = [trade_offer_id for trade_offer_id, response in results.items()
+                              if response.get('needs_mobile_confirmation')]
+        if needs_confirmation:
+            try:
+                confirmed = self.market.confirmation_executor.confirm_trade_offers(needs_confirmation)
+            except CONFIRMATION_ERRORS as error:
+                add_confirmation_results(results, needs_confirmation, error=error)
+            else:
+                add_confirmation_results(results, needs_confirmation, confirmed)
+        return {trade_offer_id: results[trade_offer_id] for trade_offer_id in trade_offer_ids}
+
+    def _get_received_offers(self, trade_offer_ids: List[str]) -> dict:
+        params = {
+            'key': self._api_key,
+            'get_sent_offers': 0,
+            'get_received_offers': 1,
+            'get_descriptions': 0,
+            'language': 'english',
+            'active_only': 1,
+            'historical_only': 0,
+            'time_historical_cutoff': '',
+        }
+        response = self.api_call('GET', 'IEconService', 'GetTradeOffers', 'v1', params).json()
+        offers = {offer['tradeofferid']: offer for offer in response['response'].get('trade_offers_received', [])}
+        # Only inactive offers are missing, read them one by one to report their state
+        for trade_offer_id in trade_offer_ids:
+            if trade_offer_id not in offers:
+                offers[trade_offer_id] = self.get_trade_offer(trade_offer_id, merge=False)['response'].get('offer')
+        return offers
+
     def _fetch_trade_partner_id(self, trade_offer_id: str) -> str:
         url = self._get_trade_offer_url(trade_offer_id)
         offer_response_text = self._session.safe_get(url, expect_json=False).text
@@ -297,10 +395,7 @@ class SteamClient:
         return text_between(offer_response_text, "var g_ulTradePartnerSteamID = '", "';")
 
     def _confirm_transaction(self, trade_offer_id: str) -> dict:
-        confirmation_executor = ConfirmationExecutor(
-            self.steam_guard['identity_secret'], self.steam_guard['steamid'], self._session
-        )
-        return confirmation_executor.send_trade_allow_request(trade_offer_id)
+        return self.market.confirmation_executor.send_trade_allow_request(trade_offer_id)
 
     def decline_trade_offer(self, trade_offer_id: str) -> dict:
         url = f'https://steamcommunity.com/tradeoffer/{trade_offer_id}/decline'
@@ -445,6 +540,34 @@ class SteamClient:
 
         return response
 
+    @login_required
+    def send_offers(self, offers: Iterable[OfferRequest], max_concurrency: int = 4,
+                    confirmation_batch_size: int = 50) -> Iterator[OfferOutcome]:
+        """Send many offers, yields an `OfferOutcome` for each of them.
+
+        Offers are sent `confirmation_batch_size` at a time with at most `max_concurrency` requests in flight, then
+        the mobile confirmations of the batch are confirmed together with one confirmation list fetch. Outcomes of a
+        batch are yielded before the next batch is sent, so stopping the iteration stops sending offers.
+        Like every sync method built on `AsyncSession.run`, it cannot be used inside a running event loop, use
+        `AsyncSteamClient.send_offers` there.
+        """
+        session_id = self._get_session_id()
+
+        async def send_batch(batch: List[OfferRequest]) -> list:
+            return [sent async for sent in post_trade_offers(self._async_session, session_id, batch, max_concurrency)]
+
+        offers = list(offers)
+        for start in range(0, len(offers), confirmation_batch_size):
+            outcomes = [get_offer_outcome(offer, response) for offer, response
+                        in self._async_session.run(send_batch(offers[start:start + confirmation_batch_size]))]
+            pending = [outcome for outcome in outcomes if outcome.status is OfferStatus.UNCONFIRMED]
+            if pending:
+                confirmed = self.market.confirmation_executor.confirm_trade_offers(
+                    [outcome.trade_offer_id for outcome in pending])
+                outcomes = [outcome for outcome in outcomes if outcome.status is not OfferStatus.UNCONFIRMED]
+                outcomes.extend(get_confirmed_offer_outcomes(pending, confirmed))
+            yield from outcomes
+
     @staticmethod
     def _get_trade_offer_url(trade_offer_id: str) -> str:
         return f'{SteamUrl.COMMUNITY_URL}/tradeoffer/{trade_offer_id}'
@@ -471,3 +594,129 @@ class SteamClient:
                 response = self._session.safe_get(f'{SteamUrl.COMMUNITY_URL}/market', expect_json=False)
                 wallet_info_match = re.search(r'var g_rgWalletInfo = (.*?);', response.text)
         raise Exception('Unable to get wallet balance string match')
+
+
+def get_accept_trade_offer_params(session_id: str, trade_offer_id: str, partner: str) -> dict:
+    return {
+        'sessionid': session_id,
+        'tradeofferid': trade_offer_id,
+        'serverid': '1',
+        'partner': partner,
+        'captcha': '',
+    }
+
+
+def check_offers_to_accept(trade_offer_ids: List[str], offers: dict) -> tuple:
+    """Split offers into failed results and the partner steam id of each active offer.
+
+    The partner is None for offers without `accountid_other`, it has to be read from the trade offer page.
+    """
+    results, partners = {}, {}
+    for trade_offer_id in trade_offer_ids:
+        offer = offers.get(trade_offer_id)
+        if not offer:
+            results[trade_offer_id] = {'success': False, 'error': 'Trade offer not found'}
+            continue
+        trade_offer_state = TradeOfferState(offer['trade_offer_state'])
+        if trade_offer_state is not TradeOfferState.Active:
+            results[trade_offer_id] = {
+                'success': False,
+                'error': f'Invalid trade offer state: {trade_offer_state.name} ({trade_offer_state.value})',
+            }
+        else:
+            account_id = offer.get('accountid_other')
+            partners[trade_offer_id] = account_id_to_steam_id(account_id) if account_id is not None else None
+    return results, partners
+
+
+async def post_trade_offer_accepts(async_session: AsyncSession, session_id: str, partners: dict,
+                                   max_concurrency: int) -> dict:
+    """Accept the offers of `partners`, trade offer id -> partner steam id, with at most `max_concurrency` in flight"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def accept(trade_offer_id: str, partner: str) -> dict:
+        headers = {'Referer': SteamClient._get_trade_offer_url(trade_offer_id)}
+        async with semaphore:
+            response = await async_session.async_post(
+                f'{SteamUrl.COMMUNITY_URL}/tradeoffer/{trade_offer_id}/accept', use_proxy=False,
+                validate_success=False, data=get_accept_trade_offer_params(session_id, trade_offer_id, partner),
+                headers=headers,
+            )
+        status = async_session.get_failure_status(response)
+        if status or not isinstance(response, dict):
+            return {'success': False, 'error': f'Accepting failed, HTTP status {status}'}
+        return response
+
+    responses = await asyncio.gather(*(accept(trade_offer_id, partner) for trade_offer_id, partner in partners.items()))
+    return dict(zip(partners, responses))
+
+
+def get_send_offer_params(session_id: str, offer: OfferRequest) -> tuple:
+    """Form data and headers of a `/tradeoffer/new/send` request sending `offer`"""
+    trade_offer_create_params = {}
+    if offer.trade_offer_url:
+        partner_steam_id = account_id_to_steam_id(get_key_value_from_url(offer.trade_offer_url, 'partner'))
+        trade_offer_create_params['trade_offer_access_token'] = get_key_value_from_url(offer.trade_offer_url, 'token')
+        referer = f'{SteamUrl.COMMUNITY_URL}{urlparse.urlparse(offer.trade_offer_url).path}'
+    elif offer.partner_steam_id:
+        partner_steam_id = offer.partner_steam_id
+        referer = f'{SteamUrl.COMMUNITY_URL}/tradeoffer/new/?partner={steam_id_to_account_id(partner_steam_id)}'
+    else:
+        raise ValueError('An offer needs either partner_steam_id or trade_offer_url')
+    params = {
+        'sessionid': session_id,
+        'serverid': 1,
+        'partner': partner_steam_id,
+        'tradeoffermessage': offer.message,
+        'json_tradeoffer': json.dumps(SteamClient._create_offer_dict(offer.items_from_me, offer.items_from_them)),
+        'captcha': '',
+        'trade_offer_create_params': json.dumps(trade_offer_create_params),
+    }
+    headers = {'Referer': referer, 'Origin': SteamUrl.COMMUNITY_URL}
+    return params, headers
+
+
+async def post_trade_offers(async_session: AsyncSession, session_id: str, offers: List[OfferRequest],
+                            max_concurrency: int) -> AsyncIterator[tuple]:
+    """Send `offers` with at most `max_concurrency` in flight, yields (offer, response) pairs as they complete.
+
+    Offers that cannot be sent, like ones without a partner, come first with a failed response.
+    """
+    url = f'{SteamUrl.COMMUNITY_URL}/tradeoffer/new/send'
+    prepared, invalid = [], []
+    for offer in offers:
+        try:
+            prepared.append((offer, *get_send_offer_params(session_id, offer)))
+        except (ValueError, KeyError) as error:
+            invalid.append((offer, {'success': False, 'error': f'Invalid offer: {error!r}'}))
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def send(offer: OfferRequest, params: dict, headers: dict) -> tuple:
+        async with semaphore:
+            # Not retried, a request that timed out may still have created the offer
+            return offer, await async_session.async_post(url, use_proxy=False, validate_success=False, retries=1,
+                                                         data=params, headers=headers)
+
+    tasks = [asyncio.ensure_future(send(*request)) for request in prepared]
+    try:
+        for failed in invalid:
+            yield failed
+        for sent in asyncio.as_completed(tasks):
+            yield await sent
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def get_offer_outcome(offer: OfferRequest, response) -> OfferOutcome:
+    """Outcome of a sent offer, offers waiting for their mobile confirmation are UNCONFIRMED"""
+    if AsyncSession.get_failure_status(response) or not isinstance(response, dict) or 'tradeofferid' not in response:
+        return OfferOutcome(offer, None, OfferStatus.FAILED, response)
+    status = OfferStatus.UNCONFIRMED if response.get('needs_mobile_confirmation') else OfferStatus.SENT
+    return OfferOutcome(offer, response['tradeofferid'], status, response)
+
+
+def get_confirmed_offer_outcomes(pending: List[OfferOutcome], confirmed: dict) -> List[OfferOutcome]:
+    """Apply the result of `ConfirmationExecutor.confirm_trade_offers` to outcomes waiting for a confirmation"""
+    return [outcome._replace(status=OfferStatus.CONFIRMED) if confirmed.get(outcome.trade_offer_id) else outcome
+            for outcome in pending]
@@ -1,22 +1,112 @@
 import enum
 import json
 import time
-from typing import List
+import asyncio
+import threading
+from typing import Dict, Iterable, Iterator, List
 from http import HTTPStatus
 
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
 
 from steampy import guard
 from steampy.exceptions import ConfirmationExpected
+from steampy.html_backend import get_html_backend
 from steampy.login import InvalidCredentials
-from steampy.utils import SafeSession
+from steampy.utils import SafeSession, AsyncSession
+
+
+class ConfirmationType(enum.IntEnum):
+    GENERIC = 1
+    TRADE = 2
+    MARKET_LISTING = 3
+    FEATURE_OPT_OUT = 4
+    PHONE_NUMBER_CHANGE = 5
+    ACCOUNT_RECOVERY = 6
 
 
 class Confirmation:
-    def __init__(self, data_confid, nonce):
+    """A pending mobile confirmation. `creator_id` is the trade offer id of trade confirmations and the listing id of
+    market listing ones, both are None for confirmations built from old getlist responses."""
+
+    def __init__(self, data_confid, nonce, conf_type: int = None, creator_id: str = None):
         self.data_confid = data_confid
         self.nonce = nonce
+        self.type = conf_type
+        self.creator_id = creator_id
+
+    @classmethod
+    def from_json(cls, conf: dict) -> 'Confirmation':
+        creator_id = conf.get('creator_id')
+        return cls(conf['id'], conf['nonce'], conf.get('type'), str(creator_id) if creator_id is not None else None)
+
+    def __repr__(self) -> str:
+        return f'Confirmation(id={self.data_confid!r}, type={self.type!r}, creator_id={self.creator_id!r})'
+
+
+class ConfirmationList:
+    """A fetched confirmation list, its confirmations are also indexed by creator id"""
+
+    def __init__(self, confirmations: List[Confirmation], fetched_at: float) -> None:
+        self.confirmations = confirmations
+        self.fetched_at = fetched_at
+        self.by_creator_id = {confirmation.creator_id: confirmation for confirmation in confirmations
+                              if confirmation.creator_id is not None}
+
+    def __iter__(self) -> Iterator[Confirmation]:
+        return iter(self.confirmations)
+
+    def __len__(self) -> int:
+        return len(self.confirmations)
+
+    def remove(self, confirmations: Iterable[Confirmation]) -> None:
+        removed = {confirmation.data_confid for confirmation in confirmations}
+        self.confirmations = [confirmation for confirmation in self.confirmations
+                              if confirmation.data_confid not in removed]
+        self.by_creator_id = {creator_id: confirmation for creator_id, confirmation in self.by_creator_id.items()
+                              if confirmation.data_confid not in removed}
+
+
+def select_confirmations(confirmations: List[Confirmation], conf_type: ConfirmationType,
+                         creator_ids: Iterable[str] = None) -> Dict[str, Confirmation]:
+    """Confirmations of `conf_type` by creator id, only those of `creator_ids` when given"""
+    wanted = set(map(str, creator_ids)) if creator_ids is not None else None
+    return {confirmation.creator_id: confirmation for confirmation in confirmations
+            if confirmation.type == conf_type and (wanted is None or confirmation.creator_id in wanted)}
+
+
+def _match_by_creator_id(confirmation_list: ConfirmationList, conf_type: ConfirmationType,
+                         creator_ids: List[str]) -> Dict[str, Confirmation]:
+    matched = {}
+    for creator_id in creator_ids:
+        confirmation = confirmation_list.by_creator_id.get(creator_id)
+        if confirmation is not None and confirmation.type == conf_type:
+            matched[creator_id] = confirmation
+    return matched
+
+
+def _sell_listing_candidates(confirmation_list: ConfirmationList) -> List[Confirmation]:
+    return [confirmation for confirmation in confirmation_list
+            if confirmation.type in (ConfirmationType.MARKET_LISTING, None)]
+
+
+def _confirmation_report(ids: Iterable[str], matched: Dict[str, Confirmation], response: dict) -> Dict[str, bool]:
+    success = bool(isinstance(response, dict) and response.get('success'))
+    return {id_: success and id_ in matched for id_ in ids}
+
+
+# What confirming can raise once the requests it confirms were already sent
+CONFIRMATION_ERRORS = (ConfirmationExpected, InvalidCredentials, requests.exceptions.RequestException,
+                       aiohttp.ClientError, asyncio.TimeoutError)
+
+
+def add_confirmation_results(results: dict, ids: List[str], confirmed: Dict[str, bool] = None,
+                             error: Exception = None) -> None:
+    """Set the `confirmed` field of the responses of `ids` in `results`, with the `error` that stopped confirming"""
+    for id_ in ids:
+        results[id_]['confirmed'] = bool(confirmed and confirmed.get(id_))
+        if error is not None:
+            results[id_]['error'] = f'Confirmation failed: {error!r}'
 
 
 class Tag(enum.Enum):
@@ -27,22 +117,77 @@ class Tag(enum.Enum):
 
 
 class ConfirmationExecutor:
+    """Confirms trade offers and sell listings of one account.
+
+    Keep one executor per account: the confirmation list is cached for `cache_ttl` seconds, so bursts of offers or
+    listings share one list fetch. A confirmation missing from a cached list makes it fetched again, accepted
+    confirmations are removed from it.
+    """
+
     CONF_URL = 'https://steamcommunity.com/mobileconf'
 
-    def __init__(self, identity_secret: str, my_steam_id: str, session: SafeSession) -> None:
+    def __init__(self, identity_secret: str, my_steam_id: str, session: SafeSession, cache_ttl: float = 10,
+                 clock=time.monotonic) -> None:
         self._my_steam_id = my_steam_id
-        self._identity_secret = identity_secret
+        self._signer = guard.SteamGuardSigner(identity_secret, my_steam_id)
         self._session = session
+        self.cache_ttl = cache_ttl
+        self._clock = clock
+        self._confirmation_list = None
+        # Details pages are the only place naming the asset of a market listing confirmation
+        self._sell_listing_asset_ids = {}
+        self._lock = threading.Lock()
 
     def send_trade_allow_request(self, trade_offer_id: str) -> dict:
-        confirmations = self._get_confirmations()
-        confirmation = self._select_trade_offer_confirmation(confirmations, trade_offer_id)
-        return self._send_confirmation(confirmation)
+        trade_offer_id = str(trade_offer_id)
+        matched = self._find_confirmations(self._match_trade_offer_confirmations, [trade_offer_id])
+        if trade_offer_id not in matched:
+            raise ConfirmationExpected
+        return self._accepted(matched.values(), self._send_confirmation(matched[trade_offer_id]))
 
     def confirm_sell_listing(self, asset_id: str) -> dict:
-        confirmations = self._get_confirmations()
-        confirmation = self._select_sell_listing_confirmation(confirmations, asset_id)
-        return self._send_confirmation(confirmation)
+        asset_id = str(asset_id)
+        matched = self._find_confirmations(self._match_sell_listing_confirmations, [asset_id])
+        if asset_id not in matched:
+            raise ConfirmationExpected
+        return self._accepted(matched.values(), self._send_confirmation(matched[asset_id]))
+
+    def get_confirmations(self) -> List[Confirmation]:
+        """Pending confirmations, from the cached list when it is younger than `cache_ttl`"""
+        return list(self._get_confirmation_list())
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._confirmation_list = None
+
+    def confirm_trade_offers(self, trade_offer_ids: Iterable[str]) -> Dict[str, bool]:
+        """Confirm many trade offers with one confirmation list fetch and one request, returns id -> confirmed"""
+        trade_offer_ids = list(dict.fromkeys(map(str, trade_offer_ids)))
+        matched = self._find_confirmations(self._match_trade_offer_confirmations, trade_offer_ids)
+        response = self._accepted(matched.values(), self.send_confirmations(list(matched.values()))) if matched else {}
+        return _confirmation_report(trade_offer_ids, matched, response)
+
+    def confirm_sell_listings(self, asset_ids: Iterable[str] = None) -> Dict[str, bool]:
+        """Confirm many sell listings in one request, returns asset id -> confirmed.
+
+        The confirmation list does not name assets, so matching `asset_ids` reads the details of market listing
+        confirmations until all are found. Without `asset_ids` every pending listing is confirmed without any
+        details request and the report is keyed by listing id.
+        """
+        if asset_ids is None:
+            confirmation_list = self._get_confirmation_list(fetched_after=self._clock())
+            matched = select_confirmations(confirmation_list.confirmations, ConfirmationType.MARKET_LISTING)
+        else:
+            asset_ids = list(dict.fromkeys(map(str, asset_ids)))
+            matched = self._find_confirmations(self._match_sell_listing_confirmations, asset_ids)
+        response = self._accepted(matched.values(), self.send_confirmations(list(matched.values()))) if matched else {}
+        return _confirmation_report(asset_ids if asset_ids is not None else matched, matched, response)
+
+    def send_confirmations(self, confirmations: List[Confirmation], tag: Tag = Tag.ALLOW) -> dict:
+        """Accept, or with `Tag.CANCEL` decline, all `confirmations` in one multiajaxop request"""
+        headers = {'X-Requested-With': 'XMLHttpRequest'}
+        return self._session.safe_post(f'{self.CONF_URL}/multiajaxop', expect_json=True, headers=headers,
+                                       data=self._create_multi_confirmation_data(confirmations, tag)).json()
 
     def _send_confirmation(self, confirmation: Confirmation) -> dict:
         tag = Tag.ALLOW
@@ -53,16 +198,50 @@ class ConfirmationExecutor:
         headers = {'X-Requested-With': 'XMLHttpRequest'}
         return self._session.safe_get(f'{self.CONF_URL}/ajaxop', expect_json=True, params=params, headers=headers).json()
 
+    def _get_confirmation_list(self, fetched_after: float = None) -> ConfirmationList:
+        # The lock makes concurrent callers wait for one fetch instead of each starting their own
+        with self._lock:
+            if self._is_cached(fetched_after):
+                return self._confirmation_list
+            fetched_at = self._clock()
+            return self._cache(ConfirmationList(self._get_confirmations(), fetched_at))
+
+    def _is_cached(self, fetched_after: float = None) -> bool:
+        if self._confirmation_list is None:
+            return False
+        if fetched_after is not None:
+            return self._confirmation_list.fetched_at >= fetched_after
+        return self._clock() - self._confirmation_list.fetched_at < self.cache_ttl
+
+    def _cache(self, confirmation_list: ConfirmationList) -> ConfirmationList:
+        self._confirmation_list = confirmation_list
+        pending = {confirmation.data_confid for confirmation in confirmation_list}
+        self._sell_listing_asset_ids = {data_confid: asset_id for data_confid, asset_id
+                                        in self._sell_listing_asset_ids.items() if data_confid in pending}
+        return confirmation_list
+
+    def _find_confirmations(self, match, ids: List[str]) -> Dict[str, Confirmation]:
+        started = self._clock()
+        confirmation_list = self._get_confirmation_list()
+        matched = match(confirmation_list, ids)
+        if len(matched) < len(ids) and confirmation_list.fetched_at < started:
+            # The cached list predates confirmations created since, look again in a new one
+            matched = match(self._get_confirmation_list(fetched_after=started), ids)
+        return matched
+
+    def _accepted(self, confirmations: Iterable[Confirmation], response: dict) -> dict:
+        with self._lock:
+            if not (isinstance(response, dict) and response.get('success')):
+                self._confirmation_list = None
+            elif self._confirmation_list is not None:
+                self._confirmation_list.remove(confirmations)
+        return response
+
     def _get_confirmations(self) -> List[Confirmation]:
-        confirmations = []
         confirmations_page = self._fetch_confirmations_page()
         if confirmations_page.status_code == HTTPStatus.OK:
             confirmations_json = json.loads(confirmations_page.text)
-            for conf in confirmations_json['conf']:
-                data_confid = conf['id']
-                nonce = conf['nonce']
-                confirmations.append(Confirmation(data_confid, nonce))
-            return confirmations
+            return [Confirmation.from_json(conf) for conf in confirmations_json['conf']]
         else:
             raise ConfirmationExpected
 
@@ -75,92 +254,236 @@ class ConfirmationExecutor:
             raise InvalidCredentials('Invalid Steam Guard file')
         return response
 
-    # def _fetch_confirmation_details_page(self, confirmation: Confirmation) -> dict:
-    #     tag = 'details' + confirmation.id
-    #     params = self._create_confirmation_params(tag)
-    #     response = self._session.get(self.CONF_URL + '/details/' + confirmation.id, params=params)
-    #     return response.json()
     def _fetch_confirmation_details_page(self, confirmation: Confirmation) -> str:
         tag = f'details{confirmation.data_confid}'
         params = self._create_confirmation_params(tag)
         response = self._session.safe_get(f'{self.CONF_URL}/details/{confirmation.data_confid}', expect_json=True, params=params, headers={})
         return response.json()
 
+    def _fetch_confirmation_details_html(self, confirmation: Confirmation) -> str:
+        attempts = 5
+        while attempts:
+            confirmation_details_page_json = self._fetch_confirmation_details_page(confirmation)
+            if confirmation_details_page_json['success']:
+                return confirmation_details_page_json['html']
+            attempts -= 1
+            time.sleep(5)
+        raise ConfirmationExpected
+
     def _create_confirmation_params(self, tag_string: str) -> dict:
-        timestamp = int(time.time())
-        confirmation_key = guard.generate_confirmation_key(self._identity_secret, tag_string, timestamp)
-        android_id = guard.generate_device_id(self._my_steam_id)
-        return {
-            'p': android_id,
-            'a': self._my_steam_id,
-            'k': confirmation_key,
-            't': timestamp,
-            'm': 'android',
-            'tag': tag_string,
-        }
-
-    def _select_trade_offer_confirmation(self, confirmations: List[Confirmation], trade_offer_id: str) -> Confirmation:
-        for confirmation in confirmations:
-            attempts = 5
-            while attempts:
-                confirmation_details_page_json = self._fetch_confirmation_details_page(confirmation)
-                if confirmation_details_page_json['success']:
+        return self._signer.confirmation_params(tag_string)
+
+    def _create_multi_confirmation_data(self, confirmations: List[Confirmation], tag: Tag) -> list:
+        params = self._create_confirmation_params(tag.value)
+        params['op'] = tag.value
+        params['k'] = params['k'].decode('ascii')
+        data = [(key, str(value)) for key, value in params.items()]
+        data.extend(('cid[]', str(confirmation.data_confid)) for confirmation in confirmations)
+        data.extend(('ck[]', str(confirmation.nonce)) for confirmation in confirmations)
+        return data
+
+    def _match_trade_offer_confirmations(self, confirmation_list: ConfirmationList,
+                                         trade_offer_ids: List[str]) -> Dict[str, Confirmation]:
+        matched = _match_by_creator_id(confirmation_list, ConfirmationType.TRADE, trade_offer_ids)
+        if len(matched) == len(trade_offer_ids):
+            return matched
+        # Old getlist responses have no creator ids, only the details pages tell the trade offer
+        wanted = set(trade_offer_ids)
+        for confirmation in confirmation_list:
+            if confirmation.creator_id is not None:
+                continue
+            trade_offer_id = self._get_confirmation_trade_offer_id(self._fetch_confirmation_details_html(confirmation))
+            if trade_offer_id in wanted:
+                matched[trade_offer_id] = confirmation
+                if len(matched) == len(wanted):
                     break
-                attempts -= 1
-                time.sleep(5)
-            if not confirmation_details_page_json['success']:
-                raise ConfirmationExpected
-            confirmation_details_page = confirmation_details_page_json['html']
-            confirmation_id = self._get_confirmation_trade_offer_id(confirmation_details_page)
-            if confirmation_id == trade_offer_id:
-                return confirmation
-            # else:
-            #     time.sleep(5)
-            #     confirmation_details_page = self._fetch_confirmation_details_page(confirmation)
-            #     confirmation_id = self._get_confirmation_trade_offer_id(confirmation_details_page)
-            #     if confirmation_id == trade_offer_id:
-            #         return confirmation
-        raise ConfirmationExpected
+        return matched
 
-    def _select_sell_listing_confirmation(self, confirmations: List[Confirmation], asset_id: str) -> Confirmation:
-        for confirmation in confirmations:
-            attempts = 5
-            while attempts:
-                confirmation_details_page_json = self._fetch_confirmation_details_page(confirmation)
-                if confirmation_details_page_json['success']:
+    def _match_sell_listing_confirmations(self, confirmation_list: ConfirmationList,
+                                          asset_ids: List[str]) -> Dict[str, Confirmation]:
+        wanted, matched = set(asset_ids), {}
+        for confirmation in _sell_listing_candidates(confirmation_list):
+            asset_id = self._sell_listing_asset_ids.get(confirmation.data_confid)
+            if asset_id is None:
+                confirmation_details_page = self._fetch_confirmation_details_html(confirmation)
+                asset_id = self._get_confirmation_sell_listing_id(confirmation_details_page)
+                if asset_id:  # A page that could not be parsed is requested again next time
+                    self._sell_listing_asset_ids[confirmation.data_confid] = asset_id
+            if asset_id in wanted:
+                matched[asset_id] = confirmation
+                if len(matched) == len(wanted):
                     break
-                attempts -= 1
-                time.sleep(5)
-            if not confirmation_details_page_json['success']:
-                raise ConfirmationExpected
-            confirmation_details_page = confirmation_details_page_json['html']
-            confirmation_id = self._get_confirmation_sell_listing_id(confirmation_details_page)
-            if confirmation_id == asset_id:
-                return confirmation
-            # else:
-            #     time.sleep(5)
-            #     confirmation_details_page = self._fetch_confirmation_details_page(confirmation)
-            #     confirmation_id = self._get_confirmation_sell_listing_id(confirmation_details_page)
-            #     if confirmation_id == asset_id:
-            #         return confirmation
-        raise ConfirmationExpected
+        return matched
 
     @staticmethod
     def _get_confirmation_sell_listing_id(confirmation_details_page: str) -> str:
-        soup = BeautifulSoup(confirmation_details_page, 'html.parser')
-        if len(soup.select("script")) < 3:
+        backend = get_html_backend()
+        scripts = backend.select(backend.parse(confirmation_details_page), 'script')
+        if len(scripts) < 3:
             print(confirmation_details_page)
             return ""
-        scr_raw = soup.select("script")[2].string.strip()
+        scr_raw = backend.text(scripts[2]).strip()
         scr_raw = scr_raw[scr_raw.index("'confiteminfo', ") + 16:]
         scr_raw = scr_raw[: scr_raw.index(', UserYou')].replace('\n', '')
         return json.loads(scr_raw)['id']
 
     @staticmethod
     def _get_confirmation_trade_offer_id(confirmation_details_page: str) -> str:
-        soup = BeautifulSoup(confirmation_details_page, 'html.parser')
-        if len(soup.select('.tradeoffer')) == 0:
+        backend = get_html_backend()
+        trade_offers = backend.select(backend.parse(confirmation_details_page), '.tradeoffer')
+        if len(trade_offers) == 0:
             print(confirmation_details_page)
             return ""
-        full_offer_id = soup.select('.tradeoffer')[0]['id']
+        full_offer_id = backend.attr(trade_offers[0], 'id')
         return full_offer_id.split('_')[1]
+
+
+class AsyncConfirmationExecutor(ConfirmationExecutor):
+    def __init__(self, identity_secret: str, my_steam_id: str, session: AsyncSession, cache_ttl: float = 10,
+                 clock=time.monotonic) -> None:
+        super().__init__(identity_secret, my_steam_id, session, cache_ttl, clock)
+        self._loop_locks = {}
+
+    async def send_trade_allow_request(self, trade_offer_id: str) -> dict:
+        trade_offer_id = str(trade_offer_id)
+        matched = await self._find_confirmations(self._match_trade_offer_confirmations, [trade_offer_id])
+        if trade_offer_id not in matched:
+            raise ConfirmationExpected
+        return self._accepted(matched.values(), await self._send_confirmation(matched[trade_offer_id]))
+
+    async def confirm_sell_listing(self, asset_id: str) -> dict:
+        asset_id = str(asset_id)
+        matched = await self._find_confirmations(self._match_sell_listing_confirmations, [asset_id])
+        if asset_id not in matched:
+            raise ConfirmationExpected
+        return self._accepted(matched.values(), await self._send_confirmation(matched[asset_id]))
+
+    async def get_confirmations(self) -> List[Confirmation]:
+        return list(await self._get_confirmation_list())
+
+    async def confirm_trade_offers(self, trade_offer_ids: Iterable[str]) -> Dict[str, bool]:
+        trade_offer_ids = list(dict.fromkeys(map(str, trade_offer_ids)))
+        matched = await self._find_confirmations(self._match_trade_offer_confirmations, trade_offer_ids)
+        response = self._accepted(matched.values(), await self.send_confirmations(list(matched.values()))) \
+            if matched else {}
+        return _confirmation_report(trade_offer_ids, matched, response)
+
+    async def confirm_sell_listings(self, asset_ids: Iterable[str] = None) -> Dict[str, bool]:
+        if asset_ids is None:
+            confirmation_list = await self._get_confirmation_list(fetched_after=self._clock())
+            matched = select_confirmations(confirmation_list.confirmations, ConfirmationType.MARKET_LISTING)
+        else:
+            asset_ids = list(dict.fromkeys(map(str, asset_ids)))
+            matched = await self._find_confirmations(self._match_sell_listing_confirmations, asset_ids)
+        response = self._accepted(matched.values(), await self.send_confirmations(list(matched.values()))) \
+            if matched else {}
+        return _confirmation_report(asset_ids if asset_ids is not None else matched, matched, response)
+
+    async def send_confirmations(self, confirmations: List[Confirmation], tag: Tag = Tag.ALLOW) -> dict:
+        headers = {'X-Requested-With': 'XMLHttpRequest'}
+        return await self._session.async_post(f'{self.CONF_URL}/multiajaxop', use_proxy=False, validate_success=False,
+                                              data=self._create_multi_confirmation_data(confirmations, tag),
+                                              headers=headers)
+
+    async def _send_confirmation(self, confirmation: Confirmation) -> dict:
+        tag = Tag.ALLOW
+        params = self._create_confirmation_params(tag.value)
+        params['op'] = tag.value
+        params['cid'] = confirmation.data_confid
+        params['ck'] = confirmation.nonce
+        headers = {'X-Requested-With': 'XMLHttpRequest'}
+        return await self._session.async_get(f'{self.CONF_URL}/ajaxop', use_proxy=False, validate_success=False,
+                                             params=params, headers=headers)
+
+    async def _get_confirmation_list(self, fetched_after: float = None) -> ConfirmationList:
+        # asyncio locks belong to one event loop, the session may be used from several
+        lock = self._loop_locks.setdefault(asyncio.get_running_loop(), asyncio.Lock())
+        async with lock:
+            if self._is_cached(fetched_after):
+                return self._confirmation_list
+            fetched_at = self._clock()
+            confirmations = await self._get_confirmations()
+            with self._lock:
+                return self._cache(ConfirmationList(confirmations, fetched_at))
+
+    async def _find_confirmations(self, match, ids: List[str]) -> Dict[str, Confirmation]:
+        started = self._clock()
+        confirmation_list = await self._get_confirmation_list()
+        matched = await match(confirmation_list, ids)
+        if len(matched) < len(ids) and confirmation_list.fetched_at < started:
+            matched = await match(await self._get_confirmation_list(fetched_after=started), ids)
+        return matched
+
+    async def _get_confirmations(self) -> List[Confirmation]:
+        confirmations_json = await self._fetch_confirmations_page()
+        if 'conf' not in confirmations_json:
+            raise ConfirmationExpected
+        return [Confirmation.from_json(conf) for conf in confirmations_json['conf']]
+
+    async def _fetch_confirmations_page(self) -> dict:
+        tag = Tag.CONF.value
+        params = self._create_confirmation_params(tag)
+        headers = {'X-Requested-With': 'com.valvesoftware.android.steam.community'}
+        response = await self._session.async_get(f'{self.CONF_URL}/getlist', expect_json=False, use_proxy=False,
+                                                 validate_success=False, params=params, headers=headers)
+        if isinstance(response, Exception):
+            raise ConfirmationExpected
+        if isinstance(response, str):
+            if 'Steam Guard Mobile Authenticator is providing incorrect Steam Guard codes.' in response:
+                raise InvalidCredentials('Invalid Steam Guard file')
+            try:
+                return json.loads(response)
+            except json.JSONDecodeError:
+                raise ConfirmationExpected
+        return response
+
+    async def _fetch_confirmation_details_page(self, confirmation: Confirmation) -> dict:
+        tag = f'details{confirmation.data_confid}'
+        params = self._create_confirmation_params(tag)
+        response = await self._session.async_get(f'{self.CONF_URL}/details/{confirmation.data_confid}',
+                                                 use_proxy=False, validate_success=False, params=params)
+        if not isinstance(response, dict):
+            return {'success': False}
+        return response
+
+    async def _fetch_confirmation_details_html(self, confirmation: Confirmation) -> str:
+        attempts = 5
+        while attempts:
+            confirmation_details_page_json = await self._fetch_confirmation_details_page(confirmation)
+            if confirmation_details_page_json.get('success'):
+                return confirmation_details_page_json['html']
+            attempts -= 1
+            await asyncio.sleep(5)
+        raise ConfirmationExpected
+
+    async def _match_trade_offer_confirmations(self, confirmation_list: ConfirmationList,
+                                               trade_offer_ids: List[str]) -> Dict[str, Confirmation]:
+        matched = _match_by_creator_id(confirmation_list, ConfirmationType.TRADE, trade_offer_ids)
+        if len(matched) == len(trade_offer_ids):
+            return matched
+        wanted = set(trade_offer_ids)
+        for confirmation in confirmation_list:
+            if confirmation.creator_id is not None:
+                continue
+            confirmation_details_page = await self._fetch_confirmation_details_html(confirmation)
+            trade_offer_id = self._get_confirmation_trade_offer_id(confirmation_details_page)
+            if trade_offer_id in wanted:
+                matched[trade_offer_id] = confirmation
+                if len(matched) == len(wanted):
+                    break
+        return matched
+
+    async def _match_sell_listing_confirmations(self, confirmation_list: ConfirmationList,
+                                                asset_ids: List[str]) -> Dict[str, Confirmation]:
+        # Unknown details pages are requested concurrently, the session semaphore bounds how many are in flight
+        unknown = [confirmation for confirmation in _sell_listing_candidates(confirmation_list)
+                   if confirmation.data_confid not in self._sell_listing_asset_ids]
+        pages = await asyncio.gather(*(self._fetch_confirmation_details_html(confirmation) for confirmation in unknown))
+        for confirmation, confirmation_details_page in zip(unknown, pages):
+            asset_id = self._get_confirmation_sell_listing_id(confirmation_details_page)
+            if asset_id:  # A page that could not be parsed is requested again next time
+                self._sell_listing_asset_ids[confirmation.data_confid] = asset_id
+        wanted = set(asset_ids)
+        return {self._sell_listing_asset_ids[confirmation.data_confid]: confirmation
+                for confirmation in _sell_listing_candidates(confirmation_list)
+                if self._sell_listing_asset_ids.get(confirmation.data_confid) in wanted}
@@ -10,6 +10,14 @@ class ApiException(Exception):
     pass
 
 
+class InventoryFetchError(ApiException):
+    """An inventory page could not be fetched, `status` is the HTTP status of the failed request"""
+
+    def __init__(self, message: str, status: int) -> None:
+        super().__init__(message)
+        self.status = status
+
+
 class LoginRequired(Exception):
     pass
 
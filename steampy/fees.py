@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency, see `pip install steampy[numpy]`
+    np = None
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError('steampy.fees requires numpy, install it with `pip install steampy[numpy]`')
+
+
+def _fee_amounts(prices_net: 'np.ndarray', fee: Decimal) -> 'np.ndarray':
+    numerator, denominator = fee.as_integer_ratio()
+    return np.maximum(prices_net * numerator // denominator, 1)
+
+
+def calculate_gross_prices(prices_net: 'np.ndarray', publisher_fee: Decimal,
+                           steam_fee: Decimal = Decimal('0.05')) -> 'np.ndarray':
+    """Array version of `utils.calculate_gross_price` working on integer cents, results are identical"""
+    _require_numpy()
+    prices_net = np.asarray(prices_net, dtype=np.int64)
+    return prices_net + _fee_amounts(prices_net, steam_fee) + _fee_amounts(prices_net, publisher_fee)
+
+
+def calculate_net_prices(prices_gross: 'np.ndarray', publisher_fee: Decimal,
+                         steam_fee: Decimal = Decimal('0.05')) -> 'np.ndarray':
+    """Array version of `utils.calculate_net_price` working on integer cents, results are identical.
+
+    Runs the same search as the scalar function, one step for all prices at a time.
+    """
+    _require_numpy()
+    prices_gross = np.asarray(prices_gross, dtype=np.int64)
+    numerator, denominator = (steam_fee + publisher_fee + 1).as_integer_ratio()
+    # int() of the Decimal quotient truncates towards zero
+    quotient = np.abs(prices_gross) * denominator // numerator
+    estimated_net = np.where(prices_gross < 0, -quotient, quotient)
+    estimated_gross = calculate_gross_prices(estimated_net, publisher_fee, steam_fee)
+
+    searching = estimated_gross != prices_gross
+    ever_undershot = np.zeros(prices_gross.shape, dtype=bool)
+    for _ in range(10):
+        if not searching.any():
+            break
+        overshot = estimated_gross > prices_gross
+        searching &= ~(overshot & ever_undershot)
+        estimated_net += np.where(searching, np.where(overshot, -1, 1), 0)
+        ever_undershot |= searching & ~overshot
+        estimated_gross = calculate_gross_prices(estimated_net, publisher_fee, steam_fee)
+        searching &= estimated_gross != prices_gross
+    return estimated_net
+
+
+class FeeTable:
+    """Precomputed net and gross prices in cents for prices up to `max_price`.
+
+    Lookups of prices outside the table fall back to `calculate_net_prices` and `calculate_gross_prices`.
+    """
+
+    def __init__(self, publisher_fee: Decimal, steam_fee: Decimal = Decimal('0.05'), max_price: int = 100000) -> None:
+        _require_numpy()
+        self.publisher_fee = publisher_fee
+        self.steam_fee = steam_fee
+        self.max_price = max_price
+        prices = np.arange(max_price + 1, dtype=np.int64)
+        self._net_prices = calculate_net_prices(prices, publisher_fee, steam_fee)
+        self._gross_prices = calculate_gross_prices(prices, publisher_fee, steam_fee)
+
+    def _lookup(self, table: 'np.ndarray', prices: 'np.ndarray', calculate) -> 'np.ndarray':
+        prices = np.asarray(prices, dtype=np.int64)
+        in_table = (prices >= 0) & (prices <= self.max_price)
+        if in_table.all():
+            return table[prices]
+        result = table[np.where(in_table, prices, 0)]
+        result[~in_table] = calculate(prices[~in_table], self.publisher_fee, self.steam_fee)
+        return result
+
+    def net_prices(self, prices_gross: 'np.ndarray') -> 'np.ndarray':
+        return self._lookup(self._net_prices, prices_gross, calculate_net_prices)
+
+    def gross_prices(self, prices_net: 'np.ndarray') -> 'np.ndarray':
+        return self._lookup(self._gross_prices, prices_net, calculate_gross_prices)
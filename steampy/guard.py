@@ -3,7 +3,7 @@ import hmac
 import json
 import struct
 from time import time
-from typing import Dict
+from typing import Dict, Iterable, List, Tuple
 from hashlib import sha1
 from base64 import b64encode, b64decode
 
@@ -24,11 +24,18 @@ def load_steam_guard(steam_guard: str) -> Dict[str, str]:
         return json.loads(steam_guard, parse_int=str)
 
 
+_pack_timestamp = struct.Struct('>Q').pack  # Big endian uint64
+
+
 def generate_one_time_code(shared_secret: str, timestamp: int = None) -> str:
     if timestamp is None:
         timestamp = int(time())
     time_buffer = struct.pack('>Q', timestamp // 30)  # pack as Big endian, uint64
     time_hmac = hmac.new(b64decode(shared_secret), time_buffer, digestmod=sha1).digest()
+    return _one_time_code_from_hmac(time_hmac)
+
+
+def _one_time_code_from_hmac(time_hmac: bytes) -> str:
     begin = ord(time_hmac[19:20]) & 0xF
     full_code = struct.unpack('>I', time_hmac[begin:begin + 4])[0] & 0x7FFFFFFF  # unpack as Big endian uint32
     chars = '23456789BCDFGHJKMNPQRTVWXY'
@@ -41,7 +48,9 @@ def generate_one_time_code(shared_secret: str, timestamp: int = None) -> str:
     return code
 
 
-def generate_confirmation_key(identity_secret: str, tag: str, timestamp: int = int(time())) -> bytes:
+def generate_confirmation_key(identity_secret: str, tag: str, timestamp: int = None) -> bytes:
+    if timestamp is None:
+        timestamp = int(time())
     buffer = struct.pack('>Q', timestamp) + tag.encode('ascii')
     return b64encode(hmac.new(b64decode(identity_secret), buffer, digestmod=sha1).digest())
 
@@ -56,3 +65,60 @@ def generate_device_id(steam_id: str) -> str:
         hexed_steam_id[16:20],
         hexed_steam_id[20:32],
     ))
+
+
+class SteamGuardSigner:
+    """Signs confirmation requests and one time codes of one account.
+
+    Secrets are decoded and the device id is derived once, keys are signed from copies of HMAC objects already
+    keyed with the secret. Prefer it over the functions above when signing repeatedly.
+    """
+
+    def __init__(self, identity_secret: str, steam_id: str, shared_secret: str = None) -> None:
+        self.steam_id = str(steam_id)
+        self.device_id = generate_device_id(self.steam_id)
+        self._identity_hmac = hmac.new(b64decode(identity_secret), digestmod=sha1)
+        self._shared_hmac = hmac.new(b64decode(shared_secret), digestmod=sha1) if shared_secret else None
+
+    @classmethod
+    def from_steam_guard(cls, steam_guard: Dict[str, str]) -> 'SteamGuardSigner':
+        return cls(steam_guard['identity_secret'], steam_guard['steamid'], steam_guard.get('shared_secret'))
+
+    def confirmation_key(self, tag: str, timestamp: int = None) -> bytes:
+        if timestamp is None:
+            timestamp = int(time())
+        signer = self._identity_hmac.copy()
+        signer.update(_pack_timestamp(timestamp) + tag.encode('ascii'))
+        return b64encode(signer.digest())
+
+    def confirmation_keys(self, requests: Iterable[Tuple[str, int]]) -> List[bytes]:
+        """Keys of many (tag, timestamp) pairs, same as calling `confirmation_key` for each"""
+        copy, pack = self._identity_hmac.copy, _pack_timestamp
+        keys = []
+        for tag, timestamp in requests:
+            signer = copy()
+            signer.update(pack(timestamp) + tag.encode('ascii'))
+            keys.append(b64encode(signer.digest()))
+        return keys
+
+    def confirmation_params(self, tag: str, timestamp: int = None) -> dict:
+        """Query parameters authenticating a mobileconf request"""
+        if timestamp is None:
+            timestamp = int(time())
+        return {
+            'p': self.device_id,
+            'a': self.steam_id,
+            'k': self.confirmation_key(tag, timestamp),
+            't': timestamp,
+            'm': 'android',
+            'tag': tag,
+        }
+
+    def one_time_code(self, timestamp: int = None) -> str:
+        if self._shared_hmac is None:
+            raise ValueError('One time codes need the shared_secret')
+        if timestamp is None:
+            timestamp = int(time())
+        signer = self._shared_hmac.copy()
+        signer.update(_pack_timestamp(timestamp // 30))
+        return _one_time_code_from_hmac(signer.digest())
@@ -0,0 +1,120 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    import cssselect  # noqa: F401, needed by lxml for css selectors
+except ImportError:  # lxml is an optional dependency, see `pip install steampy[lxml]`
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:  # selectolax is an optional dependency, see `pip install steampy[selectolax]`
+    HTMLParser = None
+
+
+class HtmlBackend(ABC):
+    """The small document API Steam page parsers are written against.
+
+    `parse` returns a document node, `select` takes a css selector and returns matching descendants of a node in
+    document order, `text` gives all text inside a node and `attr` an attribute value or None.
+    """
+
+    name = None
+
+    @abstractmethod
+    def parse(self, html: str):
+        pass
+
+    @abstractmethod
+    def select(self, node, selector: str) -> list:
+        pass
+
+    @abstractmethod
+    def text(self, node) -> str:
+        pass
+
+    @abstractmethod
+    def attr(self, node, name: str) -> Optional[str]:
+        pass
+
+
+class BeautifulSoupBackend(HtmlBackend):
+    name = 'bs4'
+
+    def parse(self, html: str):
+        return BeautifulSoup(html, 'html.parser')
+
+    def select(self, node, selector: str) -> list:
+        return node.select(selector)
+
+    def text(self, node) -> str:
+        return node.get_text()
+
+    def attr(self, node, name: str) -> Optional[str]:
+        value = node.get(name)
+        return ' '.join(value) if isinstance(value, list) else value
+
+
+class LxmlBackend(HtmlBackend):
+    name = 'lxml'
+
+    def parse(self, html: str):
+        return lxml.html.document_fromstring(html or '<html></html>')
+
+    def select(self, node, selector: str) -> list:
+        return node.cssselect(selector)
+
+    def text(self, node) -> str:
+        return str(node.text_content())
+
+    def attr(self, node, name: str) -> Optional[str]:
+        return node.get(name)
+
+
+class SelectolaxBackend(HtmlBackend):
+    name = 'selectolax'
+
+    def parse(self, html: str):
+        return HTMLParser(html)
+
+    def select(self, node, selector: str) -> list:
+        return node.css(selector)
+
+    def text(self, node) -> str:
+        return node.text(deep=True)
+
+    def attr(self, node, name: str) -> Optional[str]:
+        return node.attributes.get(name)
+
+
+BACKENDS = {backend.name: backend for backend in (SelectolaxBackend, LxmlBackend, BeautifulSoupBackend)}
+AVAILABLE_BACKENDS = {
+    'selectolax': HTMLParser is not None,
+    'lxml': lxml is not None,
+    'bs4': True,
+}
+
+_backend = None
+
+
+def get_available_backends() -> List[str]:
+    return [name for name, available in AVAILABLE_BACKENDS.items() if available]
+
+
+def get_html_backend() -> HtmlBackend:
+    """The backend used by the page parsers, by default the fastest one installed"""
+    global _backend
+    if _backend is None:
+        _backend = BACKENDS[get_available_backends()[0]]()
+    return _backend
+
+
+def set_html_backend(name: str) -> HtmlBackend:
+    global _backend
+    if not AVAILABLE_BACKENDS.get(name):
+        raise ValueError(f'HTML backend {name!r} is not available, choose one of {get_available_backends()}')
+    _backend = BACKENDS[name]()
+    return _backend
@@ -0,0 +1,64 @@
+import sqlite3
+import threading
+import urllib.parse
+from typing import Iterable, Iterator, Optional, Tuple
+
+
+class ItemNameIdIndex:
+    """Maps appid and market_hash_name to the item_nameid used by `fetch_item_orders_histogram`.
+
+    item_nameids never change, so once scraped from a listing page they are kept in a sqlite database at `path`.
+    Names are stored unquoted, so a name taken from a listing url and the plain market_hash_name share one entry.
+    """
+
+    def __init__(self, path: str = ':memory:') -> None:
+        """Nothing is persisted by default, the `:memory:` index lives as long as the process.
+        Pass a file path to keep the index across runs."""
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS item_nameids ('
+                'appid TEXT NOT NULL, market_hash_name TEXT NOT NULL, item_nameid INTEGER NOT NULL, '
+                'PRIMARY KEY (appid, market_hash_name))'
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM item_nameids').fetchone()[0]
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return self.get(*key) is not None
+
+    @staticmethod
+    def _key(app_id: str, market_hash_name: str) -> Tuple[str, str]:
+        return str(app_id), urllib.parse.unquote(market_hash_name)
+
+    def get(self, app_id: str, market_hash_name: str) -> Optional[int]:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT item_nameid FROM item_nameids WHERE appid = ? AND market_hash_name = ?',
+                self._key(app_id, market_hash_name),
+            ).fetchone()
+        return row[0] if row else None
+
+    def add(self, app_id: str, market_hash_name: str, item_nameid: int) -> None:
+        self.update([(app_id, market_hash_name, item_nameid)])
+
+    def update(self, entries: Iterable[Tuple[str, str, int]]) -> None:
+        """Bulk import `(appid, market_hash_name, item_nameid)` entries in one transaction"""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO item_nameids (appid, market_hash_name, item_nameid) VALUES (?, ?, ?)',
+                (self._key(app_id, name) + (int(item_nameid),) for app_id, name, item_nameid in entries),
+            )
+
+    def items(self) -> Iterator[Tuple[str, str, int]]:
+        with self._lock:
+            rows = self._connection.execute('SELECT appid, market_hash_name, item_nameid FROM item_nameids').fetchall()
+        return iter(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
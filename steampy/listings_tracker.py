@@ -0,0 +1,124 @@
+import time
+from typing import List, Optional
+
+from steampy.market import SteamMarket
+from steampy.models import ListingEvent, ListingEventType
+
+
+class MarketListingsTracker:
+    """Keeps a local copy of the account's sell listings and reports what changed on every `poll`.
+
+    The first poll, and one every `full_sync_interval` seconds, loads everything with `get_my_market_listings`.
+    Polls in between rely on Steam listing active listings newest first: the first page reveals new listings, and
+    `total_count` tells whether any were removed. Only in that case the position of the first removed listing is
+    binary searched with single listing requests, and just the pages from there on are downloaded again.
+    Listings awaiting confirmation and buy orders are only refreshed by full syncs. A listing confirmed since the last
+    poll takes the place of its creation time, which may be below the top where it can hide a removed listing from
+    `total_count`, so polls fall back to a full sync while a pending listing is not found among the new ones.
+    """
+
+    def __init__(self, market: SteamMarket, page_size: int = 100, full_sync_interval: float = 3600,
+                 clock=time.monotonic) -> None:
+        self.market = market
+        self.page_size = page_size
+        self.full_sync_interval = full_sync_interval
+        self.sell_listings = {}
+        self.buy_orders = {}
+        self.requests = 0
+        self._clock = clock
+        self._last_full_sync = None
+
+    def poll(self) -> List[ListingEvent]:
+        if self._last_full_sync is None or self._clock() - self._last_full_sync >= self.full_sync_interval:
+            return self.full_sync()
+        events = self._incremental_sync()
+        return events if events is not None else self.full_sync()
+
+    def full_sync(self) -> List[ListingEvent]:
+        self.requests += 1
+        listings = self.market.get_my_market_listings()
+        self._last_full_sync = self._clock()
+        self.buy_orders = listings['buy_orders']
+        return self._update(listings['sell_listings'])
+
+    def _fetch_page(self, start: int, count: int) -> dict:
+        self.requests += 1
+        return self.market.get_my_market_listings_page(start, count)
+
+    def _incremental_sync(self) -> Optional[List[ListingEvent]]:
+        pending = {listing_id: listing for listing_id, listing in self.sell_listings.items()
+                   if listing['need_confirmation']}
+        active = [listing_id for listing_id in self.sell_listings if listing_id not in pending]
+        known = set(active)
+
+        # New listings are on top, read pages until one shows a listing we already know
+        fresh, start = {}, 0
+        while True:
+            page = self._fetch_page(start, self.page_size)
+            total, page_listings = page['total_count'], page['sell_listings']
+            first_known = next((i for i, listing_id in enumerate(page_listings) if listing_id in known), None)
+            if first_known is None:
+                fresh.update(page_listings)
+                if start + self.page_size >= total or not page_listings:
+                    break
+                start += self.page_size
+            else:
+                fresh.update(list(page_listings.items())[:first_known])
+                break
+
+        if any(listing_id not in fresh for listing_id in pending):
+            return None  # It may have been confirmed below the top, only a full sync can tell
+        order = list(fresh) + active
+        listings = {**fresh, **{listing_id: self.sell_listings[listing_id] for listing_id in active}}
+        if total > len(order):
+            return None  # Listings were added below the top, only a full sync can place them
+
+        page_ids = list(page_listings)
+        first_difference = next((start + i for i, listing_id in enumerate(page_ids)
+                                 if start + i >= len(order) or order[start + i] != listing_id), None)
+        if first_difference is None and total == len(order):
+            return self._update(self._with_pending(listings, pending))
+        if first_difference is None:
+            first_difference = self._find_first_difference(order, start + len(page_ids), total)
+
+        tail = {}
+        while first_difference + len(tail) < total:
+            page = self._fetch_page(first_difference + len(tail), self.page_size)
+            if not page['sell_listings']:
+                break
+            tail.update(page['sell_listings'])
+        listings = {listing_id: listings[listing_id] for listing_id in order[:first_difference]}
+        listings.update(tail)
+        return self._update(self._with_pending(listings, pending))
+
+    @staticmethod
+    def _with_pending(listings: dict, pending: dict) -> dict:
+        # Listings confirmed since the last full sync show up as active ones
+        still_pending = {listing_id: listing for listing_id, listing in pending.items() if listing_id not in listings}
+        return {**listings, **still_pending}
+
+    def _find_first_difference(self, order: list, low: int, high: int) -> int:
+        # Listings are only removed below the top, so a listing still at its expected position proves that every
+        # listing above it is still there as well
+        while low < high:
+            middle = (low + high) // 2
+            if list(self._fetch_page(middle, 1)['sell_listings']) == [order[middle]]:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _update(self, sell_listings: dict) -> List[ListingEvent]:
+        events = []
+        for listing_id, listing in sell_listings.items():
+            previous = self.sell_listings.get(listing_id)
+            if listing['need_confirmation']:
+                if previous is None:
+                    events.append(ListingEvent(ListingEventType.NEEDS_CONFIRMATION, listing_id, listing))
+            elif previous is None or previous['need_confirmation']:
+                events.append(ListingEvent(ListingEventType.ADDED, listing_id, listing))
+        for listing_id, listing in self.sell_listings.items():
+            if listing_id not in sell_listings:
+                events.append(ListingEvent(ListingEventType.REMOVED, listing_id, listing))
+        self.sell_listings = sell_listings
+        return events
@@ -1,18 +1,20 @@
 import json
-import ast
 import time
 import asyncio
 import aiohttp
 
-import bs4
 
 import urllib.parse
+from typing import Iterable, Optional, Tuple
 from decimal import Decimal
 from http import HTTPStatus
 
-from steampy.confirmation import ConfirmationExecutor
+from steampy.confirmation import CONFIRMATION_ERRORS, ConfirmationExecutor, add_confirmation_results
 from steampy.exceptions import ApiException, TooManyRequests
 from steampy.models import Currency, SteamUrl, GameOptions
+from steampy.html_backend import HtmlBackend, get_html_backend
+from steampy.item_index import ItemNameIdIndex
+from steampy.price_history import parse_listing_page
 from steampy.utils import (
     text_between,
     get_listing_id_to_assets_address_from_html,
@@ -26,18 +28,31 @@ from steampy.utils import (
 
 
 class SteamMarket:
-    def __init__(self, session: SafeSession, asyncSession: AsyncSession) -> None:
+    def __init__(self, session: SafeSession, asyncSession: AsyncSession,
+                 item_nameid_index: ItemNameIdIndex = None) -> None:
         self._session = session
         self._async_session = asyncSession
+        self.item_nameid_index = item_nameid_index if item_nameid_index is not None else ItemNameIdIndex()
         self._steam_guard = None
         self._session_id = None
+        self._confirmation_executor = None
         self.was_login_executed = False
 
     def _set_login_executed(self, steamguard: dict, session_id: str) -> None:
         self._steam_guard = steamguard
         self._session_id = session_id
+        self._confirmation_executor = None
         self.was_login_executed = True
 
+    @property
+    def confirmation_executor(self) -> ConfirmationExecutor:
+        """One executor per account, so all confirmations share its cached confirmation list"""
+        if self._confirmation_executor is None:
+            self._confirmation_executor = ConfirmationExecutor(
+                self._steam_guard['identity_secret'], self._steam_guard['steamid'], self._session
+            )
+        return self._confirmation_executor
+
     def fetch_price(self, item_hash_name: str, game: GameOptions, currency: str = Currency.USD) -> dict:
         url = SteamUrl.COMMUNITY_URL + '/market/priceoverview/'
         params = {'country': 'PL',
@@ -60,78 +75,17 @@ class SteamMarket:
         return response.json()
 
     @login_required
-    def fetch_price_history(self, item_market_url: str, game: GameOptions, get_id=False) -> tuple:
+    def fetch_price_history(self, item_market_url: str, game: GameOptions, get_id=False, columns=False) -> tuple:
         url = SteamUrl.COMMUNITY_URL + '/market/listings/' + game.app_id + '/' + item_market_url
         response = self._session.safe_get(url, expect_json=False)
         if response.status_code == 429:
             raise TooManyRequests("You can fetch maximum 20 prices in 60s period")
-        data_string = ""
-        if 'var line1=' in response.text:
-            data_string = text_between(response.text, 'var line1=', 'g_timePriceHistoryEarliest = new Date();')
-        else:
-            if get_id:
-                if 'Market_LoadOrderSpread' in response.text:
-                    id_string = text_between(response.text, 'Market_LoadOrderSpread( ', ' );')
-                    return [], False, int(id_string)
-                else:
-                    return [], False, 0
-            else:
-                return [], False
-        data_string = data_string[:data_string.find(';')]
-        data_string = ast.literal_eval(data_string)
-        if get_id:
-            if 'Market_LoadOrderSpread' in response.text:
-                id_string = text_between(response.text, 'Market_LoadOrderSpread( ', ' );')
-                return data_string, "( Not Usable in Crafting )" in response.text, int(id_string)
-            else:
-                return data_string, "( Not Usable in Crafting )" in response.text, 0
-        else:
-            return data_string, "( Not Usable in Crafting )" in response.text
+        page = get_price_history_from_html(response.text, get_id=True, columns=columns)
+        remember_item_nameid(self.item_nameid_index, game, item_market_url, page.item_nameid)
+        return page if get_id else page[:2]
 
-    """
-    async def fetch_price_history_async(self, item_market_url_list: list, game: GameOptions, get_id=False):
-        tasks = []
-        for item_market_url in item_market_url_list:
-            url = SteamUrl.COMMUNITY_URL + '/market/listings/' + game.app_id + '/' + item_market_url
-            tasks.append(self._async_session.async_get(url, expect_json=False))
-
-        return await asyncio.gather(*tasks, return_exceptions=True)
-
-    def fetch_price_history_async_run(self, item_market_url_list: list, game: GameOptions, get_id=False) -> list:
-        results_data = []
-        results = asyncio.run(self.fetch_price_history_async(item_market_url_list, game, get_id=False))
-        for response in results:
-            if isinstance(response, str):
-                data_string = ""
-                if 'var line1=' in response:
-                    data_string = text_between(response, 'var line1=', 'g_timePriceHistoryEarliest = new Date();')
-                else:
-                    if get_id:
-                        if 'Market_LoadOrderSpread' in response:
-                            id_string = text_between(response, 'Market_LoadOrderSpread( ', ' );')
-                            results_data.append(([], False, int(id_string)))
-                        else:
-                            results_data.append(([], False, 0))
-                    else:
-                        results_data.append(([], False))
-                    continue
-                data_string = data_string[:data_string.find(';')]
-                data_string = ast.literal_eval(data_string)
-                if get_id:
-                    if 'Market_LoadOrderSpread' in response:
-                        id_string = text_between(response, 'Market_LoadOrderSpread( ', ' );')
-                        results_data.append(( data_string, "( Not Usable in Crafting )" in response, int(id_string)))
-                    else:
-                        results_data.append(( data_string, "( Not Usable in Crafting )" in response, 0))
-                else:
-                    results_data.append(( data_string, "( Not Usable in Crafting )" in response))
-            else:
-                print(response)
-                results_data.append([])
-        return results_data
-    """
-
-    async def fetch_price_history_async(self, item_market_url_list: list, game: GameOptions, get_id=False):
+    async def fetch_price_history_async(self, item_market_url_list: list, game: GameOptions, get_id=False,
+                                        columns=False):
         tasks = []
         for item_market_url in item_market_url_list:
             url = SteamUrl.COMMUNITY_URL + '/market/listings/' + game.app_id + '/' + item_market_url
@@ -139,71 +93,27 @@ class SteamMarket:
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
         results_data = []
-        for response in results:
+        for item_market_url, response in zip(item_market_url_list, results):
             if isinstance(response, str):
-                data_string = ""
-                if 'var line1=' in response:
-                    data_string = text_between(response, 'var line1=', 'g_timePriceHistoryEarliest = new Date();')
-                else:
-                    if get_id:
-                        if 'Market_LoadOrderSpread' in response:
-                            id_string = text_between(response, 'Market_LoadOrderSpread( ', ' );')
-                            results_data.append(([], False, int(id_string)))
-                        else:
-                            results_data.append(([], False, 0))
-                    else:
-                        results_data.append(([], False))
-                    continue
-                data_string = data_string[:data_string.find(';')]
-                data_string = ast.literal_eval(data_string)
-                if get_id:
-                    if 'Market_LoadOrderSpread' in response:
-                        id_string = text_between(response, 'Market_LoadOrderSpread( ', ' );')
-                        results_data.append(( data_string, "( Not Usable in Crafting )" in response, int(id_string)))
-                    else:
-                        results_data.append(( data_string, "( Not Usable in Crafting )" in response, 0))
-                else:
-                    results_data.append(( data_string, "( Not Usable in Crafting )" in response))
+                page = get_price_history_from_html(response, get_id=True, columns=columns)
+                remember_item_nameid(self.item_nameid_index, game, item_market_url, page.item_nameid)
+                results_data.append(page if get_id else page[:2])
             else:
                 print(response)
                 results_data.append([])
         return results_data
 
-    def fetch_price_history_async_run(self, item_market_url_list: list, game: GameOptions, get_id=False) -> list:
-        results_data = []
-        results = asyncio.run(self.fetch_price_history_async(item_market_url_list, game, get_id=False))
-        for response in results:
-            if isinstance(response, str):
-                data_string = ""
-                if 'var line1=' in response:
-                    data_string = text_between(response, 'var line1=', 'g_timePriceHistoryEarliest = new Date();')
-                else:
-                    if get_id:
-                        if 'Market_LoadOrderSpread' in response:
-                            id_string = text_between(response, 'Market_LoadOrderSpread( ', ' );')
-                            results_data.append(([], False, int(id_string)))
-                        else:
-                            results_data.append(([], False, 0))
-                    else:
-                        results_data.append(([], False))
-                    continue
-                data_string = data_string[:data_string.find(';')]
-                data_string = ast.literal_eval(data_string)
-                if get_id:
-                    if 'Market_LoadOrderSpread' in response:
-                        id_string = text_between(response, 'Market_LoadOrderSpread( ', ' );')
-                        results_data.append(( data_string, "( Not Usable in Crafting )" in response, int(id_string)))
-                    else:
-                        results_data.append(( data_string, "( Not Usable in Crafting )" in response, 0))
-                else:
-                    results_data.append(( data_string, "( Not Usable in Crafting )" in response))
-            else:
-                print(response)
-                results_data.append([])
-        return results_data
+    def fetch_price_history_async_run(self, item_market_url_list: list, game: GameOptions, get_id=False,
+                                      columns=False) -> list:
+        return self._async_session.run(self.fetch_price_history_async(item_market_url_list, game, get_id, columns))
 
     @login_required
-    def fetch_item_orders_histogram(self, item_nameid: str, item_market_url: str, currency: str = Currency.USD) -> dict:
+    def fetch_item_orders_histogram(self, item_nameid: Optional[str], item_market_url: str,
+                                    currency: str = Currency.USD) -> dict:
+        """Without `item_nameid` it is resolved from `item_market_url` through `item_nameid_index`"""
+        if item_nameid is None:
+            game, item_hash_name = parse_listing_url(item_market_url)
+            item_nameid = self.get_item_nameid(item_hash_name, game)
         url = SteamUrl.COMMUNITY_URL + '/market/itemordershistogram'
         params = {'country': 'UA',
                   'language': 'english',
@@ -217,6 +127,22 @@ class SteamMarket:
             raise TooManyRequests("You can fetch maximum 20 prices in 60s period")
         return response.json()
 
+    @login_required
+    def get_item_nameid(self, item_hash_name: str, game: GameOptions) -> int:
+        """Look the item_nameid up in `item_nameid_index`, scraping and indexing its listing page on a miss"""
+        item_nameid = self.item_nameid_index.get(game.app_id, item_hash_name)
+        if item_nameid is None:
+            item_nameid = self.fetch_price_history(item_hash_name, game, get_id=True, columns=True).item_nameid
+            if not item_nameid:
+                raise ApiException(f'There is no item_nameid on the listing page of {item_hash_name}')
+        return item_nameid
+
+    @login_required
+    def fetch_item_orders_histogram_by_name(self, item_hash_name: str, game: GameOptions,
+                                            currency: str = Currency.USD) -> dict:
+        item_nameid = self.get_item_nameid(item_hash_name, game)
+        return self.fetch_item_orders_histogram(item_nameid, get_listing_url(item_hash_name, game), currency)
+
     """
     async def fetch_item_orders_histogram_async(self, item_nameid_list: list, item_market_url_list: list, currency: str = Currency.USD):
         tasks = []
@@ -272,65 +198,54 @@ class SteamMarket:
         return self.fetch_item_orders_histogram_async(item_nameid_list, item_market_url_list, currency)
 
     @login_required
-    def get_my_market_listings(self) -> dict:
+    def get_my_market_listings(self, max_concurrency: int = 1) -> dict:
+        """With `max_concurrency` above 1 the remaining pages of large accounts are fetched concurrently"""
         response = self._session.safe_get("%s/market" % SteamUrl.COMMUNITY_URL, expect_json=False)
         if response.status_code != 200:
             raise ApiException("There was a problem getting the listings. http code: %s" % response.status_code)
-        assets_descriptions = json.loads(text_between(response.text, 'var g_rgAssets = ', ';\n'))
-        listing_id_to_assets_address = get_listing_id_to_assets_address_from_html(response.text)
-        listings = get_market_listings_from_html(response.text)
-        listings = merge_items_with_descriptions_from_listing(
-            listings, listing_id_to_assets_address, assets_descriptions
-        )
+        listings = get_listings_from_market_page(response.text)
 
         if '<span id="tabContentsMyActiveMarketListings_end">' in response.text:
-            n_showing = int(text_between(response.text, '<span id="tabContentsMyActiveMarketListings_end">', '</span>'))
-            n_total = int(
-                text_between(response.text, '<span id="tabContentsMyActiveMarketListings_total">', '</span>').replace(
-                    ',', ''
-                )
-            )
+            n_showing, n_total = get_listings_count_from_market_page(response.text)
 
             if n_showing < n_total < 1000:
                 url = f'{SteamUrl.COMMUNITY_URL}/market/mylistings/render/?query=&start={n_showing}&count={-1}'
                 response = self._session.safe_get(url, expect_json=True)
                 if response.status_code != HTTPStatus.OK:
                     raise ApiException(f'There was a problem getting the listings. HTTP code: {response.status_code}')
-                jresp = response.json()
-                listing_id_to_assets_address = get_listing_id_to_assets_address_from_html(jresp.get('hovers'))
-                listings_2 = get_market_sell_listings_from_api(jresp.get('results_html'))
-                listings_2 = merge_items_with_descriptions_from_listing(
-                    listings_2, listing_id_to_assets_address, jresp.get('assets')
+                listings = merge_listings_page(listings, response.json())
+            elif max_concurrency > 1:
+                pages = self._async_session.run(
+                    fetch_listing_pages(self._async_session, get_listing_page_urls(n_showing, n_total), max_concurrency)
                 )
-                listings['sell_listings'] = {**listings['sell_listings'], **listings_2['sell_listings']}
+                for page in pages:
+                    listings = merge_listings_page(listings, page)
             else:
-                for i in range(0, n_total, 100):
-                    url = f'{SteamUrl.COMMUNITY_URL}/market/mylistings/?query=&start={n_showing + i}&count={100}'
+                for url in get_listing_page_urls(n_showing, n_total):
                     response = self._session.safe_get(url, expect_json=True)
                     if response.status_code != HTTPStatus.OK:
                         raise ApiException(
                             f'There was a problem getting the listings. HTTP code: {response.status_code}'
                         )
-                    jresp = response.json()
-                    listing_id_to_assets_address = get_listing_id_to_assets_address_from_html(jresp.get('hovers'))
-                    listings_2 = get_market_sell_listings_from_api(jresp.get('results_html'))
-                    listings_2 = merge_items_with_descriptions_from_listing(
-                        listings_2, listing_id_to_assets_address, jresp.get('assets')
-                    )
-                    listings['sell_listings'] = {**listings['sell_listings'], **listings_2['sell_listings']}
+                    listings = merge_listings_page(listings, response.json())
 
         return listings
 
+    @login_required
+    def get_my_market_listings_page(self, start: int = 0, count: int = 100) -> dict:
+        """Fetch one page of active sell listings, newest first, along with the `total_count` of active listings"""
+        url = f'{SteamUrl.COMMUNITY_URL}/market/mylistings/render/?query=&start={start}&count={count}'
+        response = self._session.safe_get(url, expect_json=True)
+        if response.status_code != HTTPStatus.OK:
+            raise ApiException(f'There was a problem getting the listings. HTTP code: {response.status_code}')
+        page = response.json()
+        listings = merge_listings_page({'sell_listings': {}}, page)
+        listings['total_count'] = int(page.get('total_count', 0))
+        return listings
+
     @login_required
     def create_sell_order(self, assetid: str, game: GameOptions, money_to_receive: str) -> dict:
-        data = {
-            'assetid': assetid,
-            'sessionid': self._session_id,
-            'contextid': game.context_id,
-            'appid': game.app_id,
-            'amount': 1,
-            'price': money_to_receive,
-        }
+        data = get_sell_order_data(self._session_id, assetid, game, money_to_receive)
         headers = {'Referer': f'{SteamUrl.COMMUNITY_URL}/profiles/{self._steam_guard["steamid"]}/inventory'}
         response = self._session.safe_post(f'{SteamUrl.COMMUNITY_URL}/market/sellitem/', expect_json=True, data=data,
                                            headers=headers).json()
@@ -343,6 +258,30 @@ class SteamMarket:
             return r
         return response
 
+    @login_required
+    def create_sell_orders(self, orders: Iterable[Tuple[str, str]], game: GameOptions,
+                           max_concurrency: int = 4) -> dict:
+        """List many items, `orders` are (asset id, money to receive) pairs. Returns the response of each asset id.
+
+        Items are listed with at most `max_concurrency` requests in flight and the mobile confirmations of all
+        listings are confirmed together afterwards, their result is the `confirmed` field of the response, False
+        with an `error` if confirming failed. Items that could not be listed get `success` False and an `error` or
+        Steam's `message`.
+        """
+        orders = {str(assetid): money_to_receive for assetid, money_to_receive in orders}
+        results = self._async_session.run(post_sell_orders(
+            self._async_session, self._session_id, self._steam_guard['steamid'], orders, game, max_concurrency))
+        needs_confirmation = [assetid for assetid, response in results.items()
+                              if response.get('needs_mobile_confirmation')]
+        if needs_confirmation:
+            try:
+                confirmed = self.confirmation_executor.confirm_sell_listings(needs_confirmation)
+            except CONFIRMATION_ERRORS as error:
+                add_confirmation_results(results, needs_confirmation, error=error)
+            else:
+                add_confirmation_results(results, needs_confirmation, confirmed)
+        return results
+
     @login_required
     def create_buy_order(
         self,
@@ -484,35 +423,7 @@ class SteamMarket:
         if response.json()["total_count"] == 0:
             raise ApiException("Problem while obtaining latest trade hist: zero size ", response.text)
 
-        prices = []
-        soup = bs4.BeautifulSoup(response.json()["results_html"], "html.parser")
-        all_rows = soup.find_all("div", class_="market_listing_row market_recent_listing_row")
-        for item in all_rows:
-            if item.find("div", class_="market_listing_whoactedwith_name_block") is not None:
-                purchase_sum = float(item.find("span", class_="market_listing_price").getText().replace("\t", "").
-                                     replace("\n", "").replace("\r", "").replace(",", ".").replace(" ", "")[:-1])
-                purchase_string_raw = item.find("div", class_="market_listing_listed_date_combined").getText(). \
-                    replace("\t", "").replace("\n", "").replace("\r", "")
-                purchase_string = purchase_string_raw[purchase_string_raw.find(":") + 2:]
-                if "-" in item.find("div", class_="market_listing_left_cell market_listing_gainorloss").getText():
-                    prices.append({"action": "sell", "price": purchase_sum, "date_string": purchase_string})
-                elif "+" in item.find("div", class_="market_listing_left_cell market_listing_gainorloss").getText():
-                    prices.append({"action": "buy", "price": purchase_sum, "date_string": purchase_string})
-
-        json_data = response.json()["assets"]
-        items = {}
-        for appid, itemslist in json_data.items():
-            for contextid, item in itemslist.items():
-                index = 0
-                for k, v in item.items():
-                    if (v["status"] != 2) & (v["status"] != 8):
-                        items[k] = v
-                        items[k]["action"] = prices[index]["action"]
-                        items[k]["price"] = prices[index]["price"]
-                        items[k]["date_string"] = prices[index]["date_string"]
-                        index += 1
-
-        return items
+        return get_trade_history_from_response(response.json())
 
     @login_required
     def search(self, request_start, game: GameOptions, request_size=100):
@@ -536,7 +447,149 @@ class SteamMarket:
         return response.json()["results"]
 
     def _confirm_sell_listing(self, asset_id: str) -> dict:
-        con_executor = ConfirmationExecutor(
-            self._steam_guard['identity_secret'], self._steam_guard['steamid'], self._session
-        )
-        return con_executor.confirm_sell_listing(asset_id)
+        return self.confirmation_executor.confirm_sell_listing(asset_id)
+
+
+def get_trade_history_from_response(response_json: dict, backend: HtmlBackend = None) -> dict:
+    backend = backend or get_html_backend()
+    prices = []
+    document = backend.parse(response_json["results_html"])
+    all_rows = backend.select(document, 'div[class="market_listing_row market_recent_listing_row"]')
+    for item in all_rows:
+        if backend.select(item, 'div.market_listing_whoactedwith_name_block'):
+            purchase_sum = float(backend.text(backend.select(item, 'span.market_listing_price')[0]).replace("\t", "").
+                                 replace("\n", "").replace("\r", "").replace(",", ".").replace(" ", "")[:-1])
+            purchase_string_raw = backend.text(backend.select(item, 'div.market_listing_listed_date_combined')[0]). \
+                replace("\t", "").replace("\n", "").replace("\r", "")
+            purchase_string = purchase_string_raw[purchase_string_raw.find(":") + 2:]
+            gain_or_loss = backend.text(
+                backend.select(item, 'div[class="market_listing_left_cell market_listing_gainorloss"]')[0]
+            )
+            if "-" in gain_or_loss:
+                prices.append({"action": "sell", "price": purchase_sum, "date_string": purchase_string})
+            elif "+" in gain_or_loss:
+                prices.append({"action": "buy", "price": purchase_sum, "date_string": purchase_string})
+
+    json_data = response_json["assets"]
+    items = {}
+    for appid, itemslist in json_data.items():
+        for contextid, item in itemslist.items():
+            index = 0
+            for k, v in item.items():
+                if (v["status"] != 2) & (v["status"] != 8):
+                    items[k] = v
+                    items[k]["action"] = prices[index]["action"]
+                    items[k]["price"] = prices[index]["price"]
+                    items[k]["date_string"] = prices[index]["date_string"]
+                    index += 1
+
+    return items
+
+
+def get_listings_from_market_page(html: str) -> dict:
+    assets_descriptions = json.loads(text_between(html, 'var g_rgAssets = ', ';\n'))
+    listing_id_to_assets_address = get_listing_id_to_assets_address_from_html(html)
+    listings = get_market_listings_from_html(html)
+    return merge_items_with_descriptions_from_listing(listings, listing_id_to_assets_address, assets_descriptions)
+
+
+def get_listings_count_from_market_page(html: str) -> tuple:
+    n_showing = int(text_between(html, '<span id="tabContentsMyActiveMarketListings_end">', '</span>'))
+    n_total = int(
+        text_between(html, '<span id="tabContentsMyActiveMarketListings_total">', '</span>').replace(',', '')
+    )
+    return n_showing, n_total
+
+
+def merge_listings_page(listings: dict, page: dict) -> dict:
+    listing_id_to_assets_address = get_listing_id_to_assets_address_from_html(page.get('hovers'))
+    page_listings = get_market_sell_listings_from_api(page.get('results_html'))
+    page_listings = merge_items_with_descriptions_from_listing(
+        page_listings, listing_id_to_assets_address, page.get('assets')
+    )
+    listings['sell_listings'].update(page_listings['sell_listings'])
+    return listings
+
+
+def get_listing_page_urls(n_showing: int, n_total: int, page_size: int = 100) -> list:
+    return [f'{SteamUrl.COMMUNITY_URL}/market/mylistings/?query=&start={start}&count={page_size}'
+            for start in range(n_showing, n_total, page_size)]
+
+
+async def fetch_listing_pages(async_session: AsyncSession, urls: list, max_concurrency: int) -> list:
+    """Fetch my listings pages with at most `max_concurrency` requests in flight, results keep the order of `urls`"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(url: str) -> dict:
+        async with semaphore:
+            page = await async_session.async_get(url, use_proxy=False)
+        if status := async_session.get_failure_status(page):
+            raise ApiException(f'There was a problem getting the listings. HTTP code: {status}')
+        return page
+
+    return await asyncio.gather(*map(fetch, urls))
+
+
+def get_sell_order_data(session_id: str, assetid: str, game: GameOptions, money_to_receive: str) -> dict:
+    return {
+        'assetid': assetid,
+        'sessionid': session_id,
+        'contextid': game.context_id,
+        'appid': game.app_id,
+        'amount': 1,
+        'price': money_to_receive,
+    }
+
+
+async def post_sell_orders(async_session: AsyncSession, session_id: str, steam_id: str, orders: dict,
+                           game: GameOptions, max_concurrency: int) -> dict:
+    """List `orders`, asset id -> money to receive, with at most `max_concurrency` requests in flight"""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    headers = {'Referer': f'{SteamUrl.COMMUNITY_URL}/profiles/{steam_id}/inventory'}
+
+    async def sell(assetid: str, money_to_receive: str) -> dict:
+        async with semaphore:
+            # Not retried, a request that timed out may still have listed the item
+            response = await async_session.async_post(
+                f'{SteamUrl.COMMUNITY_URL}/market/sellitem/', use_proxy=False, validate_success=False, retries=1,
+                data=get_sell_order_data(session_id, assetid, game, money_to_receive), headers=headers,
+            )
+        status = async_session.get_failure_status(response)
+        if status or not isinstance(response, dict):
+            failure = {'success': False, 'error': f'Listing failed, HTTP status {status}'}
+            if isinstance(response, dict) and response.get('message'):
+                failure['message'] = response['message']
+            return failure
+        return response
+
+    responses = await asyncio.gather(*(sell(assetid, money) for assetid, money in orders.items()))
+    return dict(zip(orders, responses))
+
+
+def get_listing_url(item_hash_name: str, game: GameOptions) -> str:
+    return f'{SteamUrl.COMMUNITY_URL}/market/listings/{game.app_id}/{urllib.parse.quote(item_hash_name)}'
+
+
+def parse_listing_url(item_market_url: str) -> Tuple[GameOptions, str]:
+    """Game and market_hash_name of a `/market/listings/<appid>/<name>` url, listing urls carry no context id"""
+    path = urllib.parse.urlparse(item_market_url).path
+    _, separator, listing = path.partition('/market/listings/')
+    app_id, _, item_hash_name = listing.partition('/')
+    if not separator or not app_id.isdigit() or not item_hash_name:
+        raise ApiException(f'{item_market_url} is not a market listing url')
+    return GameOptions(app_id, None), urllib.parse.unquote(item_hash_name.rstrip('/'))
+
+
+def remember_item_nameid(index: ItemNameIdIndex, game: GameOptions, item_market_url: str, item_nameid: int) -> None:
+    if item_nameid and index.get(game.app_id, item_market_url) is None:
+        index.add(game.app_id, item_market_url, item_nameid)
+
+
+def get_price_history_from_html(html: str, get_id: bool = False, columns: bool = False) -> tuple:
+    """Price history of a listing page as `[date, price, volume]` rows, or with `columns` as a `PriceHistory`"""
+    page = parse_listing_page(html)
+    if not columns:
+        page = page._replace(prices=list(page.prices))
+    if get_id:
+        return page
+    return page.prices, page.not_usable_in_crafting
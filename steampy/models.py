@@ -1,5 +1,7 @@
-from enum import IntEnum
+from enum import Enum, IntEnum
+from types import MappingProxyType
 from collections import namedtuple
+from collections.abc import Mapping
 
 
 class GameOptions:
@@ -32,6 +34,65 @@ class Asset:
         }
 
 
+def frozen_copy(value):
+    """Read-only copy of decoded JSON, dicts become `MappingProxyType` and lists tuples at every level"""
+    if isinstance(value, MappingProxyType):
+        return value
+    if isinstance(value, dict):
+        return MappingProxyType({key: frozen_copy(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(frozen_copy(item) for item in value)
+    return value
+
+
+def mutable_copy(value):
+    """Plain dicts and lists again from `frozen_copy`, at every level"""
+    if isinstance(value, Mapping):
+        return {key: mutable_copy(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [mutable_copy(item) for item in value]
+    return value
+
+
+class InventoryItem(Mapping):
+    """Merged inventory or offer item pointing at a shared description instead of a copy of it.
+
+    Reads like the dict `merge_items` builds: description fields plus `id`, `contextid` and `amount`, with nested
+    values like `tags` read-only as well. `to_dict` returns the plain dict.
+    """
+
+    __slots__ = ('asset_id', 'context_id', 'amount', 'description')
+
+    def __init__(self, asset_id: str, context_id: str, amount: str, description: Mapping) -> None:
+        self.asset_id = asset_id
+        self.context_id = context_id
+        self.amount = amount
+        self.description = description
+
+    def __getitem__(self, key: str):
+        if key == 'id':
+            return self.asset_id
+        elif key == 'contextid':
+            return self.context_id
+        elif key == 'amount':
+            return self.amount
+        return self.description[key]
+
+    def __iter__(self):
+        yield from (key for key in self.description if key not in ('contextid', 'id', 'amount'))
+        yield from ('contextid', 'id', 'amount')
+
+    def __len__(self) -> int:
+        return len(self.description) + sum(key not in self.description for key in ('contextid', 'id', 'amount'))
+
+    def __repr__(self) -> str:
+        return f'InventoryItem({self.asset_id!r}, {self.context_id!r}, {self.amount!r}, ' \
+               f'{self.description.get("market_hash_name")!r})'
+
+    def to_dict(self) -> dict:
+        return mutable_copy(self)
+
+
 class Currency(IntEnum):
     USD = 1
     GBP = 2
@@ -96,6 +157,51 @@ class TradeOfferState(IntEnum):
     StateInEscrow = 11
 
 
+class InventoryStatus(Enum):
+    OK = 'ok'
+    PRIVATE = 'private'  # 403, the profile or inventory is private
+    UNAVAILABLE = 'unavailable'  # Steam refused without a reason, e.g. banned or nonexistent accounts
+    RATE_LIMITED = 'rate_limited'  # 429 after retries on all proxies
+    TIMEOUT = 'timeout'
+    ERROR = 'error'
+
+
+# `items` holds everything fetched before the failure when `status` is not OK
+InventoryResult = namedtuple('InventoryResult', ['steam_id', 'game', 'status', 'items'])
+
+
+class ListingEventType(Enum):
+    ADDED = 'added'  # the listing became active
+    REMOVED = 'removed'  # sold or cancelled
+    NEEDS_CONFIRMATION = 'needs_confirmation'
+
+
+ListingEvent = namedtuple('ListingEvent', ['type', 'listing_id', 'listing'])
+
+
+class TradeOfferEventType(Enum):
+    NEW = 'new'  # an offer seen for the first time
+    CHANGED = 'changed'  # any other update, including offers becoming declined, canceled or expired
+    ACCEPTED = 'accepted'
+
+
+TradeOfferEvent = namedtuple('TradeOfferEvent', ['type', 'trade_offer_id', 'offer'])
+
+# An offer for `send_offers`, addressed either by `partner_steam_id` or by the partner's `trade_offer_url`
+OfferRequest = namedtuple('OfferRequest', ['items_from_me', 'items_from_them', 'partner_steam_id', 'message',
+                                           'trade_offer_url'], defaults=(None, '', None))
+
+
+class OfferStatus(Enum):
+    SENT = 'sent'  # the offer needed no mobile confirmation
+    CONFIRMED = 'confirmed'
+    UNCONFIRMED = 'unconfirmed'  # sent, but the mobile confirmation was not found or failed
+    FAILED = 'failed'  # Steam did not create the offer
+
+
+OfferOutcome = namedtuple('OfferOutcome', ['request', 'trade_offer_id', 'status', 'response'])
+
+
 class SteamUrl:
     API_URL = 'https://api.steampowered.com'
     COMMUNITY_URL = 'https://steamcommunity.com'
@@ -0,0 +1,87 @@
+import json
+import datetime
+from array import array
+from collections import namedtuple
+from collections.abc import Sequence
+
+
+MONTHS = {month: number for number, month in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), start=1
+)}
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+PriceHistoryPage = namedtuple('PriceHistoryPage', ['prices', 'not_usable_in_crafting', 'item_nameid'])
+
+
+class PriceHistory(Sequence):
+    """Price history points stored column by column.
+
+    `timestamps` are UTC epoch seconds, `prices` the median sale prices and `volumes` the number of items sold. Indexing
+    and iterating give `[date, price, volume]` rows shaped like Steam's `line1`, as the market methods used to return.
+    """
+
+    __slots__ = ('timestamps', 'prices', 'volumes')
+
+    def __init__(self, timestamps: array = None, prices: array = None, volumes: array = None) -> None:
+        self.timestamps = timestamps if timestamps is not None else array('q')
+        self.prices = prices if prices is not None else array('d')
+        self.volumes = volumes if volumes is not None else array('q')
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PriceHistory(self.timestamps[index], self.prices[index], self.volumes[index])
+        date = datetime.datetime.fromtimestamp(self.timestamps[index], datetime.timezone.utc)
+        return [date.strftime('%b %d %Y %H: +0'), self.prices[index], str(self.volumes[index])]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PriceHistory):
+            return (self.timestamps, self.prices, self.volumes) == (other.timestamps, other.prices, other.volumes)
+        elif isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'PriceHistory({len(self)} points)'
+
+
+def parse_line1(line1: str) -> PriceHistory:
+    """Parse the `line1` javascript array of a listing page, `[["Jul 02 2014 01: +0",0.5,"12"], ...]`"""
+    history = PriceHistory()
+    month_starts = {}
+    timestamps, prices, volumes = history.timestamps, history.prices, history.volumes
+    for date, price, volume in json.loads(line1):
+        month = date[7:11] + date[:3]
+        month_start = month_starts.get(month)
+        if month_start is None:
+            ordinal = datetime.date(int(date[7:11]), MONTHS[date[:3]], 1).toordinal()
+            month_start = month_starts[month] = (ordinal - EPOCH_ORDINAL - 1) * 86400
+        timestamps.append(month_start + int(date[4:6]) * 86400 + int(date[12:14]) * 3600)
+        prices.append(price)
+        volumes.append(int(volume))
+    return history
+
+
+def parse_listing_page(html: str) -> PriceHistoryPage:
+    """Extract the price history, the crafting flag and the item_nameid of a market listing page.
+
+    Each marker is located with a single `str.find` and only the `line1` array itself is parsed.
+    """
+    prices = PriceHistory()
+    start = html.find('var line1=')
+    if start != -1:
+        start += len('var line1=')
+        prices = parse_line1(html[start:html.index('];', start) + 1])
+
+    item_nameid = 0
+    start = html.find('Market_LoadOrderSpread( ')
+    if start != -1:
+        start += len('Market_LoadOrderSpread( ')
+        item_nameid = int(html[start:html.index(' )', start)])
+
+    return PriceHistoryPage(prices, html.find('( Not Usable in Crafting )') != -1, item_nameid)
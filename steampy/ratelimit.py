@@ -0,0 +1,125 @@
+import time
+import asyncio
+import threading
+from collections import namedtuple
+from typing import Optional
+
+
+class EndpointFamily:
+    PRICE_OVERVIEW = 'priceoverview'
+    MARKET_LISTINGS = 'market_listings'
+    ITEM_ORDERS_HISTOGRAM = 'itemordershistogram'
+    INVENTORY = 'inventory'
+    ECON_SERVICE = 'econ_service'
+    TRADE_OFFER_SEND = 'tradeoffer_send'
+
+
+# Order matters, the first matching url fragment wins
+ENDPOINT_FAMILY_URL_FRAGMENTS = (
+    ('/market/priceoverview', EndpointFamily.PRICE_OVERVIEW),
+    ('/market/itemordershistogram', EndpointFamily.ITEM_ORDERS_HISTOGRAM),
+    ('/market/listings/', EndpointFamily.MARKET_LISTINGS),
+    ('/inventory/', EndpointFamily.INVENTORY),
+    ('/IEconService/', EndpointFamily.ECON_SERVICE),
+    ('/tradeoffer/new/send', EndpointFamily.TRADE_OFFER_SEND),
+)
+
+# `requests` per `period` seconds, of which up to `burst` may be sent back to back
+RateLimit = namedtuple('RateLimit', ['requests', 'period', 'burst'])
+
+# Steam does not publish its limits, these are conservative estimates of what an account gets through without 429s:
+# 20 price overviews and market listing pages, 30 order histograms, 10 inventory pages and 30 trade offer sends per
+# minute, and the documented 100000 Web API calls per day
+DEFAULT_LIMITS = {
+    EndpointFamily.PRICE_OVERVIEW: RateLimit(20, 60, 2),
+    EndpointFamily.MARKET_LISTINGS: RateLimit(20, 60, 2),
+    EndpointFamily.ITEM_ORDERS_HISTOGRAM: RateLimit(30, 60, 3),
+    EndpointFamily.INVENTORY: RateLimit(10, 60, 1),
+    EndpointFamily.ECON_SERVICE: RateLimit(100000, 86400, 10),
+    EndpointFamily.TRADE_OFFER_SEND: RateLimit(30, 60, 5),
+}
+
+
+def get_endpoint_family(url: str) -> Optional[str]:
+    for fragment, family in ENDPOINT_FAMILY_URL_FRAGMENTS:
+        if fragment in url:
+            return family
+    return None
+
+
+class TokenBucket:
+    """Token bucket that never lets more than `limit.requests` through in any `limit.period` window.
+
+    Tokens refill at `(requests - burst) / period` per second and the bucket holds at most `burst` of them, so a full
+    burst plus one period of refill adds up to exactly `requests`. Reservations may drive the balance negative, which
+    is how concurrent callers get queued behind each other instead of all waking up at the same moment.
+    """
+
+    def __init__(self, limit: RateLimit, clock=time.monotonic) -> None:
+        self.limit = limit
+        self.capacity = max(limit.burst, 1)
+        self.rate = max(limit.requests - limit.burst, 1) / limit.period
+        self._clock = clock
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take one token and return the number of seconds to wait before it may be used"""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def drain(self) -> None:
+        """Push the next free token a full period away, used after Steam answered with 429"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - self.rate * self.limit.period
+
+
+class RateLimiter:
+    """Schedules requests per endpoint family and proxy so they stay under Steam's limits.
+
+    Urls that do not belong to any known family are not limited. One instance is meant to be shared by `SafeSession`
+    and `AsyncSession` of a client, so sync and async calls draw from the same buckets. Clients only use one when it
+    is passed as their `rate_limiter`, `limits` override `DEFAULT_LIMITS` per family.
+    """
+
+    def __init__(self, limits: dict = None, clock=time.monotonic) -> None:
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def get_bucket(self, url: str, proxy: str = None) -> Optional[TokenBucket]:
+        family = get_endpoint_family(url)
+        if family is None or family not in self.limits:
+            return None
+        key = (family, proxy)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.setdefault(key, TokenBucket(self.limits[family], self._clock))
+        return bucket
+
+    def reserve(self, url: str, proxy: str = None) -> float:
+        bucket = self.get_bucket(url, proxy)
+        return bucket.reserve() if bucket is not None else 0.0
+
+    def wait(self, url: str, proxy: str = None) -> None:
+        if delay := self.reserve(url, proxy):
+            time.sleep(delay)
+
+    async def wait_async(self, url: str, proxy: str = None) -> None:
+        if delay := self.reserve(url, proxy):
+            await asyncio.sleep(delay)
+
+    def penalize(self, url: str, proxy: str = None) -> None:
+        if (bucket := self.get_bucket(url, proxy)) is not None:
+            bucket.drain()
@@ -0,0 +1,184 @@
+import time
+import asyncio
+import logging
+import threading
+from typing import Callable, List, Optional
+
+from steampy.models import TradeOfferEvent, TradeOfferEventType, TradeOfferState
+
+# GetTradeOffersSummary counters, GetTradeOffers is only requested when one of them changes
+SUMMARY_COUNTERS = (
+    'pending_received_count', 'new_received_count', 'updated_received_count', 'escrow_received_count',
+    'pending_sent_count', 'newly_accepted_sent_count', 'updated_sent_count', 'escrow_sent_count',
+)
+
+
+class TradeOfferWatcher:
+    """Reports new, changed and accepted trade offers of a `SteamClient` on every `poll`.
+
+    Polls ask GetTradeOffers for the active offers plus those updated since the newest `time_updated` seen so far,
+    so offers leaving the active state are still seen once, and descriptions come from the description cache.
+    Events go to the `on_new`, `on_changed` and `on_accepted` callbacks, which take the merged offer.
+
+    With `use_summary` a poll first reads the cheap GetTradeOffersSummary counters, relative to the newest update
+    seen, and only requests the offers when they changed or `full_poll_interval` seconds passed since the last time.
+    With `max_poll_interval` the interval grows `backoff` times after every poll without events up to that maximum,
+    and drops back to `poll_interval` on the first event.
+
+    The first cutoff is taken from the local clock, `clock_skew` seconds earlier, as Steam compares it with
+    `time_updated` from its own clock. Offers finished by then are not reported, later cutoffs follow `time_updated`.
+    """
+
+    def __init__(self, client, poll_interval: float = 10, on_new: Callable = None, on_changed: Callable = None,
+                 on_accepted: Callable = None, use_summary: bool = False, max_poll_interval: float = None,
+                 backoff: float = 2, full_poll_interval: float = 600, clock_skew: float = 300,
+                 clock=time.time) -> None:
+        self.client = client
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self.use_summary = use_summary
+        self.full_poll_interval = full_poll_interval
+        self.clock_skew = clock_skew
+        self.interval = poll_interval
+        self.offers = {}
+        self.last_seen = None
+        self.summary_requests = 0
+        self.offer_requests = 0
+        self._callbacks = {
+            TradeOfferEventType.NEW: on_new,
+            TradeOfferEventType.CHANGED: on_changed,
+            TradeOfferEventType.ACCEPTED: on_accepted,
+        }
+        self._clock = clock
+        # Offers that left the active state at `last_seen` are returned again by the next poll
+        self._finished = {}
+        self._summary = None
+        self._last_full_poll = None
+
+    def poll(self) -> List[TradeOfferEvent]:
+        summary = None
+        if self.use_summary:
+            summary = self._summary_counters(self.client.get_trade_offers_summary(**self._summary_params()))
+        events = []
+        if self._needs_offers(summary):
+            events = self._update(self._fetch_offers(self.client.get_trade_offers(**self._request_params())))
+            self._polled(summary)
+        for event in events:
+            self._dispatch(event)
+        self._adapt_interval(events)
+        return events
+
+    def run(self, stop: threading.Event = None) -> None:
+        """Poll every `interval` seconds until `stop` is set"""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logging.exception('Polling trade offers failed')
+            stop.wait(self.interval)
+
+    def _start(self) -> None:
+        if self.last_seen is None:
+            self.last_seen = int(self._clock() - self.clock_skew)
+
+    def _summary_params(self) -> dict:
+        self._start()
+        self.summary_requests += 1
+        return {'time_last_visit': self.last_seen}
+
+    def _request_params(self) -> dict:
+        self._start()
+        self.offer_requests += 1
+        return {'merge': True, 'use_description_cache': True, 'historical_cutoff': self.last_seen}
+
+    @staticmethod
+    def _summary_counters(response: dict) -> tuple:
+        summary = response.get('response', {})
+        return tuple(summary.get(counter, 0) for counter in SUMMARY_COUNTERS)
+
+    def _needs_offers(self, summary: Optional[tuple]) -> bool:
+        return (summary is None or summary != self._summary or self._last_full_poll is None
+                or self._clock() - self._last_full_poll >= self.full_poll_interval)
+
+    def _polled(self, summary: Optional[tuple]) -> None:
+        # Stored only once the offers were read, a failed request leaves the change to be seen by the next poll
+        self._summary = summary
+        self._last_full_poll = self._clock()
+
+    def _adapt_interval(self, events: List[TradeOfferEvent]) -> None:
+        if events or self.max_poll_interval is None:
+            self.interval = self.poll_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_poll_interval)
+
+    @staticmethod
+    def _fetch_offers(response: dict) -> list:
+        response = response['response']
+        return response.get('trade_offers_received', []) + response.get('trade_offers_sent', [])
+
+    def _update(self, offers: list) -> List[TradeOfferEvent]:
+        # Offers finished before the first poll are not reported, they are only remembered as seen
+        first_poll = self._last_full_poll is None
+        events = []
+        for offer in offers:
+            trade_offer_id, time_updated = offer['tradeofferid'], offer['time_updated']
+            previous = self.offers.get(trade_offer_id)
+            if self._finished.get(trade_offer_id) == time_updated or (
+                    previous is not None and previous['time_updated'] == time_updated
+                    and previous['trade_offer_state'] == offer['trade_offer_state']):
+                continue
+            if offer['trade_offer_state'] == TradeOfferState.Accepted:
+                event_type = TradeOfferEventType.ACCEPTED
+            elif previous is None and offer['trade_offer_state'] == TradeOfferState.Active:
+                event_type = TradeOfferEventType.NEW
+            else:
+                event_type = TradeOfferEventType.CHANGED
+            if not first_poll or offer['trade_offer_state'] == TradeOfferState.Active:
+                events.append(TradeOfferEvent(event_type, trade_offer_id, offer))
+
+            if offer['trade_offer_state'] == TradeOfferState.Active:
+                self.offers[trade_offer_id] = offer
+            else:
+                self.offers.pop(trade_offer_id, None)
+                self._finished[trade_offer_id] = time_updated
+            self.last_seen = max(self.last_seen, time_updated)
+        self._finished = {trade_offer_id: time_updated for trade_offer_id, time_updated in self._finished.items()
+                          if time_updated >= self.last_seen}
+        return events
+
+    def _dispatch(self, event: TradeOfferEvent) -> Optional[object]:
+        callback = self._callbacks[event.type]
+        return callback(event.offer) if callback is not None else None
+
+
+class AsyncTradeOfferWatcher(TradeOfferWatcher):
+    """`TradeOfferWatcher` for an `AsyncSteamClient`, callbacks may be plain functions or coroutine functions"""
+
+    async def poll(self) -> List[TradeOfferEvent]:
+        summary = None
+        if self.use_summary:
+            summary = self._summary_counters(await self.client.get_trade_offers_summary(**self._summary_params()))
+        events = []
+        if self._needs_offers(summary):
+            events = self._update(self._fetch_offers(await self.client.get_trade_offers(**self._request_params())))
+            self._polled(summary)
+        for event in events:
+            result = self._dispatch(event)
+            if asyncio.iscoroutine(result):
+                await result
+        self._adapt_interval(events)
+        return events
+
+    async def run(self, stop: asyncio.Event = None) -> None:
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                await self.poll()
+            except Exception:
+                logging.exception('Polling trade offers failed')
+            try:
+                await asyncio.wait_for(stop.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
@@ -1,14 +1,15 @@
 import os
 import re
-import copy
 import math
 import struct
 import json
 import random
 import datetime
 import time
+import heapq
+import threading
 import http.client
-from typing import List
+from typing import Iterable, List, Mapping, Optional
 from decimal import Decimal
 from urllib.parse import urlparse, parse_qs
 
@@ -16,20 +17,72 @@ import requests
 import aiohttp
 import logging
 import asyncio
-from itertools import cycle
+from collections import deque, OrderedDict
 from tenacity import retry, stop_after_attempt, retry_if_result, retry_if_exception_type, wait_fixed
-from bs4 import BeautifulSoup, Tag
+from requests.adapters import HTTPAdapter
 from requests.structures import CaseInsensitiveDict
 
-from steampy.models import GameOptions
+from steampy.models import GameOptions, InventoryItem, frozen_copy, mutable_copy
 from steampy.exceptions import ProxyConnectionError, LoginRequired
+from steampy.html_backend import HtmlBackend, get_html_backend
+from steampy.ratelimit import RateLimiter
+
+
+class ProxyPool:
+    """Round-robin pool of proxies with a min-heap of cooldown expiries.
+
+    Available proxies rotate through a deque, banned ones wait in a heap ordered by the time their cooldown ends and are
+    moved back to the deque once it passed. A ban does not search the deque: the stale entry is dropped when it reaches
+    the front, so acquiring, banning and releasing a proxy cost O(log n) at most.
+    """
+
+    def __init__(self, proxies: List[str], ban_time: dict) -> None:
+        self.ban_time = ban_time
+        self._proxies = set(proxies)
+        self._ready = deque(proxies)
+        self._in_ready = set(proxies)
+        self._cooldowns = []
+
+    def __contains__(self, proxy: str) -> bool:
+        return proxy in self._proxies
+
+    def __len__(self) -> int:
+        return len(self._proxies)
+
+    def is_available(self, proxy: str, now: float) -> bool:
+        return self.ban_time[proxy] <= now
+
+    def _release_expired(self, now: float) -> None:
+        while self._cooldowns and self._cooldowns[0][0] <= now:
+            expiry, proxy = heapq.heappop(self._cooldowns)
+            # Skip entries of bans that were extended later, and proxies whose old entry is still queued
+            if self.ban_time[proxy] == expiry and proxy not in self._in_ready:
+                self._ready.append(proxy)
+                self._in_ready.add(proxy)
+
+    def acquire(self, now: float) -> Optional[str]:
+        """Return the next available proxy, or the one closest to the end of its cooldown if all are banned"""
+        self._release_expired(now)
+        while self._ready:
+            proxy = self._ready.popleft()
+            if not self.is_available(proxy, now):
+                self._in_ready.discard(proxy)
+                continue
+            self._ready.append(proxy)
+            return proxy
+        return self._cooldowns[0][1] if self._cooldowns else None
+
+    def ban(self, proxy: str, until: float) -> None:
+        self.ban_time[proxy] = until
+        heapq.heappush(self._cooldowns, (until, proxy))
 
 
 class ProxyCarousel:
-    def __init__(self, json_filename, max_usage=15, cooldown_after_429=3600):
-        self.proxy_list = []
+    def __init__(self, json_filename, max_usage=15, cooldown_after_429=3600, proxy_list: List[str] = None,
+                 sync_proxy_part=0.99):
+        self.proxy_list = list(proxy_list or [])
         self.json_file = json_filename
-        if os.path.exists(self.json_file):
+        if proxy_list is None and json_filename and os.path.exists(self.json_file):
             f = open(self.json_file, "r")
             self.proxy_data = json.loads(f.read())
             response = requests.get(self.proxy_data["Url"], headers=self.proxy_data["Headers"])
@@ -41,47 +94,43 @@ class ProxyCarousel:
                     #                                  item['proxy_address'] + ':' + str(item['port'])})
                     self.proxy_list.append("http://" + item['username'] + ':' + item['password'] + '@' +
                                                      item['proxy_address'] + ':' + str(item['port']))
-        else:
+        elif proxy_list is None:
             print("No json with proxy setup")
-        self.sync_proxy_part = 0.99
+        self.sync_proxy_part = sync_proxy_part
         self.proxy_list_async = self.proxy_list[int(len(self.proxy_list) * self.sync_proxy_part): ]
-        self.proxy_list_async_shuffled = self.proxy_list_async.copy()
-        random.shuffle(self.proxy_list_async_shuffled)
         self.proxy_list_sync = self.proxy_list[: int(len(self.proxy_list) * self.sync_proxy_part)]
+        proxy_list_async_shuffled = self.proxy_list_async.copy()
+        random.shuffle(proxy_list_async_shuffled)
         self.max_usage = max_usage
         self.cooldown_after_429 = cooldown_after_429
-        self.proxy_cycle = cycle(self.proxy_list_sync)
         self.proxy_usage_count = {proxy: 0 for proxy in self.proxy_list}
         self.ban_proxy_time = {proxy: 0 for proxy in self.proxy_list}
-        self.current_proxy = next(self.proxy_cycle)
+        self._sync_pool = ProxyPool(self.proxy_list_sync, self.ban_proxy_time)
+        self._async_pool = ProxyPool(proxy_list_async_shuffled, self.ban_proxy_time)
+        self.current_proxy = self._sync_pool.acquire(time.time())
+
+    def ban_proxy(self, proxy: str, cooldown: float = None) -> None:
+        cooldown = self.cooldown_after_429 if cooldown is None else cooldown
+        self.proxy_usage_count[proxy] = 0
+        pool = self._async_pool if proxy in self._async_pool else self._sync_pool
+        pool.ban(proxy, time.time() + cooldown)
 
     def get_next_proxy(self, is_forced=False):
-        # FIXME: we can get looped
-        refresh_proxy_count = len(self.proxy_list_sync)
-        while refresh_proxy_count > 0:
-            print(refresh_proxy_count)
-            # Get the next proxy in the cycle
+        now = time.time()
+        if is_forced and self.current_proxy is not None:
+            self.ban_proxy(self.current_proxy)
+
+        # Stick to the current proxy until it gets banned or reaches its usage limit
+        if self.current_proxy is not None and self._sync_pool.is_available(self.current_proxy, now):
             next_proxy = self.current_proxy
-            if is_forced:
-                self.proxy_usage_count[next_proxy] = 0
-                self.ban_proxy_time[next_proxy] = datetime.datetime.now().timestamp() + self.cooldown_after_429
-                next_proxy = next(self.proxy_cycle)
-
-            # Check if the proxy can be used based on the usage count and cooldown time
-
-            if (self.ban_proxy_time[next_proxy] - datetime.datetime.now().timestamp() < 0) and \
-                    (self.proxy_usage_count[next_proxy] < self.max_usage):
-                self.proxy_usage_count[next_proxy] += 1
-                if self.proxy_usage_count[next_proxy] >= self.max_usage:
-                    self.ban_proxy_time[next_proxy] = datetime.datetime.now().timestamp() + self.cooldown_after_429
-                    self.proxy_usage_count[next_proxy] = 0
-                return next_proxy
-            else:
-                # If the proxy has reached its usage limit, try the next one
-                print(f"Proxy {next_proxy} reached usage limit. Trying the next one.")
-                is_forced = True
-                refresh_proxy_count -= 1
-        print("Looped")
+        else:
+            next_proxy = self._sync_pool.acquire(now)
+        if next_proxy is None:
+            return None
+
+        self.proxy_usage_count[next_proxy] += 1
+        if self.proxy_usage_count[next_proxy] >= self.max_usage:
+            self.ban_proxy(next_proxy)
         return next_proxy
 
     def get_current_proxy(self):
@@ -96,29 +145,12 @@ class ProxyCarousel:
     def get_random_async_proxy(self):
         """
         Return a proxy that is not currently banned or in cooldown.
-        Reshuffle the list if needed and avoid banned proxies.
+        Async proxies are shuffled once and then rotated, skipping banned ones.
         """
-        result = ""
-        current_time = time.time()
-
-        # Filter out proxies that are banned (cooldown not expired)
-        available_proxies = [
-            proxy for proxy in self.proxy_list_async_shuffled
-            if self.ban_proxy_time.get(proxy, 0) <= current_time  # Use get() to avoid KeyError
-        ]
-
-        # If the available list is empty, refresh the shuffled list
-        if len(available_proxies) == 0:
-            # Reset the shuffled list with proxies that are not banned
-            self.proxy_list_async_shuffled = [
-                proxy for proxy in self.proxy_list_async if self.ban_proxy_time.get(proxy, 0) <= current_time
-            ]
-            if len(self.proxy_list_async_shuffled) == 0:
-                raise Exception("No available proxies; all are banned or in cooldown.")
-            random.shuffle(self.proxy_list_async_shuffled)
-
-        # Pop a proxy from the shuffled list
-        result = self.proxy_list_async_shuffled.pop()
+        now = time.time()
+        result = self._async_pool.acquire(now)
+        if result is None or not self._async_pool.is_available(result, now):
+            raise Exception("No available proxies; all are banned or in cooldown.")
 
         # Increment the usage count for the selected proxy
         self.proxy_usage_count[result] += 1
@@ -126,10 +158,76 @@ class ProxyCarousel:
         return result
 
 
+class ProxyPoolAdapter(HTTPAdapter):
+    """HTTPAdapter keeping a bounded LRU of per-proxy keep-alive connection pools.
+
+    requests creates a ProxyManager for every proxy it sees and never drops it. Here the managers of the
+    `max_proxy_pools` most recently used proxies are kept warm, the rest and those idle for longer than
+    `pool_idle_timeout` seconds are closed. Hits and misses count how often a request found a warm pool.
+    """
+
+    def __init__(self, max_proxy_pools: int = 64, pool_idle_timeout: float = 300, **kwargs) -> None:
+        self.max_proxy_pools = max_proxy_pools
+        self.pool_idle_timeout = pool_idle_timeout
+        self.pool_hits = 0
+        self.pool_misses = 0
+        self.pool_evictions = 0
+        self._pool_last_used = {}
+        self._pool_lock = threading.Lock()
+        super().__init__(**kwargs)
+        self.proxy_manager = OrderedDict()
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.proxy_manager = OrderedDict()
+        self._pool_last_used = {}
+        self._pool_lock = threading.Lock()
+
+    def _evict(self, proxy: str) -> None:
+        self.proxy_manager.pop(proxy).clear()
+        del self._pool_last_used[proxy]
+        self.pool_evictions += 1
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        with self._pool_lock:
+            now = time.monotonic()
+            while self.proxy_manager:
+                oldest = next(iter(self.proxy_manager))
+                if now - self._pool_last_used[oldest] <= self.pool_idle_timeout:
+                    break
+                self._evict(oldest)
+
+            if proxy in self.proxy_manager:
+                self.pool_hits += 1
+                self.proxy_manager.move_to_end(proxy)
+            else:
+                self.pool_misses += 1
+            manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+            self._pool_last_used[proxy] = now
+
+            while len(self.proxy_manager) > self.max_proxy_pools:
+                self._evict(next(iter(self.proxy_manager)))
+            return manager
+
+    def pool_stats(self) -> dict:
+        return {
+            'hits': self.pool_hits,
+            'misses': self.pool_misses,
+            'evictions': self.pool_evictions,
+            'pools': len(self.proxy_manager),
+        }
+
+
 class SafeSession(requests.Session):
-    def __init__(self, proxy_carousel, *args, **kwargs):
+    def __init__(self, proxy_carousel, *args, rate_limiter: RateLimiter = None, max_proxy_pools: int = 64,
+                 pool_maxsize: int = 10, pool_idle_timeout: float = 300, **kwargs):
         super().__init__(*args, **kwargs)
         self.proxy_carousel = proxy_carousel
+        self.rate_limiter = rate_limiter
+        self.proxy_pool_adapter = ProxyPoolAdapter(max_proxy_pools=max_proxy_pools,
+                                                   pool_idle_timeout=pool_idle_timeout, pool_maxsize=pool_maxsize)
+        self.mount('https://', self.proxy_pool_adapter)
+        self.mount('http://', self.proxy_pool_adapter)
         self.ban_time = 0
         self.cooldown_427 = 1800
 
@@ -177,6 +275,7 @@ class SafeSession(requests.Session):
                                            http.client.RemoteDisconnected)))
            )
     def _safe_get_post(self, url, expect_json=True, is_get=True, use_proxy=False, retry_429=False, **kwargs):
+        proxy = None
         try:
             if self.ban_time - datetime.datetime.now().timestamp() > 0:
                 retry_429 = True
@@ -184,6 +283,8 @@ class SafeSession(requests.Session):
                 print(self.proxy_carousel.get_current_proxy())
                 proxy = self.proxy_carousel.get_current_proxy()
                 kwargs['proxies'] = {'http': proxy, 'https': proxy}
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait(url, proxy)
 
             response = self.get(url, **kwargs) if is_get else self.post(url, **kwargs)
             response.raise_for_status()  # Raises HTTPError for bad responses
@@ -203,6 +304,8 @@ class SafeSession(requests.Session):
         except requests.exceptions.RequestException as e:
             # Handle exceptions (e.g., ConnectionError, Timeout, HTTPError)
             if e.response is not None and e.response.status_code == 429:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.penalize(url, proxy)
                 if not use_proxy:
                     print("Too many requests")
                     self.ban_time = datetime.datetime.now().timestamp() + self.cooldown_427
@@ -219,6 +322,10 @@ class SafeSession(requests.Session):
                 print(f"Error during GET request: {e}")
             raise  # Reraise the exception to trigger the retry
 
+    def pool_stats(self) -> dict:
+        """Connection pool counters of the proxy adapter, to check how often rotating proxies reuse warm pools"""
+        return self.proxy_pool_adapter.pool_stats()
+
     def safe_post(self, url, expect_json=True, use_proxy=False, **kwargs):
         return self._safe_get_post(url, expect_json=expect_json, is_get=False, use_proxy=use_proxy, **kwargs)
 
@@ -227,27 +334,59 @@ class SafeSession(requests.Session):
 
 
 class AsyncSession():
+    """Pooled aiohttp client shared by coroutines of any number of event loops.
+
+    One `aiohttp.ClientSession` and semaphore are kept per event loop. Use the session as an async context manager,
+    run coroutines through `AsyncSession.run` or call `close_aiohttp_session` before the loop ends, so the
+    connector and its sockets are released together with the loop.
+    """
+
     def __init__(self, timeout: float = 10, retries: int = 3, default_headers=None, proxy_carousel=None,
-                 max_concurrency=100, *args, **kwargs):
+                 max_concurrency=100, cookies=None, rate_limiter: RateLimiter = None, connector_limit: int = 100,
+                 connector_limit_per_host: int = 0, dns_cache_ttl: int = 300, keepalive_timeout: float = 30,
+                 *args, **kwargs):
         self.proxy_carousel = proxy_carousel
+        self.rate_limiter = rate_limiter
         self.timeout_ = aiohttp.ClientTimeout(total=timeout)
         self.retries = retries
         self.backoff_factor = 0.5
         self.default_headers = default_headers or {}
-        #self.semaphore = asyncio.Semaphore(max_concurrency)
-        kwargs['timeout'] = self.timeout_
-        self._session = None
+        # Cookie jar shared with SafeSession, so both sessions act on the same login state
+        self.cookies = cookies if cookies is not None else requests.cookies.RequestsCookieJar()
+        self.connector_limit = connector_limit
+        self.connector_limit_per_host = connector_limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
         self.max_concurrency = max_concurrency
         self._session_pool = {}
         self._semaphore_pool = {}
-        # super().__init__(headers=self.default_headers, *args, **kwargs)
+
+    async def __aenter__(self):
+        await self._get_session_and_semaphore()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close_aiohttp_session()
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=self.connector_limit, limit_per_host=self.connector_limit_per_host,
+                                         ttl_dns_cache=self.dns_cache_ttl, keepalive_timeout=self.keepalive_timeout)
+        return aiohttp.ClientSession(timeout=self.timeout_, connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+
+    def _drop_closed_loops(self) -> None:
+        for loop in [loop for loop in self._session_pool if loop.is_closed()]:
+            logging.warning("Event loop closed before its aiohttp session, use AsyncSession.run or "
+                            "close_aiohttp_session to release its connections")
+            del self._session_pool[loop]
+            self._semaphore_pool.pop(loop, None)
 
     async def _get_session_and_semaphore(self):
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
 
         # Get or create the session for the current event loop
         if loop not in self._session_pool:
-            self._session_pool[loop] = aiohttp.ClientSession(timeout=self.timeout_)
+            self._drop_closed_loops()
+            self._session_pool[loop] = self._create_session()
 
         # Get or create the semaphore for the current event loop
         if loop not in self._semaphore_pool:
@@ -257,78 +396,173 @@ class AsyncSession():
 
     async def close_aiohttp_session(self):
         """
-        Asynchronous method to close aiohttp.ClientSession.
+        Asynchronous method to close aiohttp.ClientSession of the running event loop.
         """
-        if self._session is not None:
-            print("Closing aiohttp.ClientSession...")
-            await self._session.close()
-            self._session = None
+        loop = asyncio.get_running_loop()
+        self._semaphore_pool.pop(loop, None)
+        session = self._session_pool.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
 
     def close(self):
         """
-        Synchronous method to close aiohttp.ClientSession using asyncio.
+        Synchronous method to close aiohttp.ClientSession of every event loop that is still open.
         """
-        asyncio.run(self.close_aiohttp_session())
+        self._drop_closed_loops()
+        for loop, session in list(self._session_pool.items()):
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+            else:
+                loop.run_until_complete(session.close())
+        self._session_pool.clear()
+        self._semaphore_pool.clear()
 
-    async def _async_get_post(self, url, expect_json=True, method="GET", proxy="", **kwargs):
-        session, semaphore = await self._get_session_and_semaphore()
+    def run(self, coroutine):
+        """
+        Run coroutine in a new event loop like asyncio.run and close the aiohttp.ClientSession it used.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            coroutine.close()
+            raise RuntimeError('AsyncSession.run cannot be called from a running event loop, await the coroutine '
+                               'or use the async client instead')
+        async def run_and_close():
+            try:
+                return await coroutine
+            finally:
+                await self.close_aiohttp_session()
+
+        return asyncio.run(run_and_close())
+
+    def _cookies_for_url(self, url: str) -> dict:
+        host = urlparse(url).hostname or ''
+        cookies = {}
+        for cookie in self.cookies:
+            domain = cookie.domain.lstrip('.')
+            if not domain or host == domain or host.endswith('.' + domain):
+                cookies[cookie.name] = cookie.value
+        return cookies
+
+    def _store_response_cookies(self, url: str, response: aiohttp.ClientResponse) -> None:
+        host = urlparse(url).hostname or ''
+        for name, morsel in response.cookies.items():
+            self.cookies.set(name, morsel.value, domain=morsel['domain'] or host, path=morsel['path'] or '/')
 
-        async with semaphore:  # Use thread-specific semaphore
-            proxy = self.proxy_carousel.get_random_async_proxy()
-            attempt = 0
-            while attempt < self.retries:
-                try:
-                    async with session.request(method, url, proxy=proxy, **kwargs) as response:
-                        response.raise_for_status()  # Raise an exception for HTTP errors
-
-                        # Validate response content type and check for JSON if expected
-                        content_type = response.headers.get('Content-Type', '')
-                        if 'json' in content_type:
-                            json_data = await response.json()
-                            if not json_data:  # Ensure JSON is not empty
-                                logging.warning("Received empty JSON response")
-                                raise ValueError("Received empty JSON response")
-                            if 'success' in json_data and json_data['success'] != 1:
-                                logging.warning("JSON has success field but wasn't 1")
-                                raise ValueError("JSON has success field but wasn't 1")
-                            return json_data
-                        else:
-                            text_data = await response.text()
-                            if not text_data:  # Ensure text response is not empty
-                                raise ValueError("Received empty text response")
-                            return text_data
-
-                except aiohttp.ClientResponseError as e:
-                    if e.status == 429:
-                        logging.warning("Too many requests, changing proxy.")
-                        proxy = self.proxy_carousel.get_random_async_proxy()
-                    elif e.status == 403:
-                        logging.error(f"Access forbidden for {url}. Status code: {e.status}")
-                        return e  # If forbidden, return the exception
+    @staticmethod
+    def _normalize_params(params: dict) -> dict:
+        # aiohttp accepts only str, int and float query values, unlike requests which also takes bools and bytes
+        return {key: int(value) if isinstance(value, bool) else value.decode() if isinstance(value, bytes) else value
+                for key, value in params.items() if value is not None}
+
+    async def _async_get_post(self, url, expect_json=True, method="GET", proxy="", use_proxy=True,
+                              validate_success=True, retries=None, **kwargs):
+        """`retries` overrides the session's number of attempts, pass 1 for requests that must not be repeated"""
+        retries = self.retries if retries is None else retries
+        session, semaphore = await self._get_session_and_semaphore()
+        headers = {**self.default_headers, **(kwargs.pop('headers', None) or {})}
+        if kwargs.get('params'):
+            kwargs['params'] = self._normalize_params(kwargs['params'])
+
+        proxy = self.proxy_carousel.get_random_async_proxy() if use_proxy else None
+        attempt = 0
+        last_status = None
+        last_message = None
+        while attempt < retries:
+            # Wait on the token bucket before taking a slot of the event loop's semaphore
+            if self.rate_limiter is not None:
+                await self.rate_limiter.wait_async(url, proxy)
+            try:
+                async with semaphore, session.request(method, url, proxy=proxy, headers=headers,
+                                                      cookies=self._cookies_for_url(url), **kwargs) as response:
+                    self._store_response_cookies(url, response)
+                    if response.status >= 400:
+                        last_message = await self._get_error_message(response)
+                    response.raise_for_status()  # Raise an exception for HTTP errors
+
+                    # Validate response content type and check for JSON if expected
+                    content_type = response.headers.get('Content-Type', '')
+                    if 'json' in content_type:
+                        json_data = await response.json()
+                        if not json_data:  # Ensure JSON is not empty
+                            logging.warning("Received empty JSON response")
+                            raise ValueError("Received empty JSON response")
+                        if validate_success and 'success' in json_data and json_data['success'] != 1:
+                            logging.warning("JSON has success field but wasn't 1")
+                            raise ValueError("JSON has success field but wasn't 1")
+                        return json_data
                     else:
-                        logging.error(f"HTTP error during {method} request: {e.status}")
+                        text_data = await response.text()
+                        if not text_data:  # Ensure text response is not empty
+                            raise ValueError("Received empty text response")
+                        return text_data
+
+            except aiohttp.ClientResponseError as e:
+                last_status = e.status
+                if e.status == 429:
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.penalize(url, proxy)
+                    logging.warning("Too many requests, changing proxy.")
+                    if use_proxy:
+                        proxy = self.proxy_carousel.get_random_async_proxy()
+                elif e.status == 403:
+                    logging.error(f"Access forbidden for {url}. Status code: {e.status}")
+                    return e  # If forbidden, return the exception
+                else:
+                    logging.error(f"HTTP error during {method} request: {e.status}")
 
-                except aiohttp.ClientError as e:
-                    logging.warning(f"Network or client error during {method} request: {str(e)}")
+            except aiohttp.ClientError as e:
+                logging.warning(f"Network or client error during {method} request: {str(e)}")
+                if use_proxy:
                     proxy = self.proxy_carousel.get_random_async_proxy()
+                if attempt + 1 < retries:
                     await asyncio.sleep(self.backoff_factor * (2 ** attempt))  # Retry with exponential backoff
 
-                except ValueError as e:
-                    logging.error(f"Data validation error: {str(e)}")
+            except ValueError as e:
+                logging.error(f"Data validation error: {str(e)}")
 
-                attempt += 1
+            attempt += 1
 
-            # Final fallback after retries are exhausted
-            if expect_json:
-                return {"status_code": 404, "error": "Request failed after retries"}
-            else:
-                return "Request failed after retries"
+        # Final fallback after retries are exhausted
+        if expect_json:
+            failure = {"status_code": last_status or 404, "error": "Request failed after retries"}
+            if last_message:
+                failure["message"] = last_message
+            return failure
+        else:
+            return "Request failed after retries"
+
+    @staticmethod
+    async def _get_error_message(response: aiohttp.ClientResponse) -> Optional[str]:
+        # Steam explains some failures in a JSON body, like the sell order it refused to create
+        if 'json' not in response.headers.get('Content-Type', ''):
+            return None
+        try:
+            body = json.loads(await response.text())
+        except (ValueError, aiohttp.ClientError):
+            return None
+        return body.get('message') if isinstance(body, dict) else None
+
+    @staticmethod
+    def get_failure_status(response) -> int:
+        """Return the HTTP status of a failed request result, or 0 if the request succeeded"""
+        if isinstance(response, aiohttp.ClientResponseError):
+            return response.status
+        if isinstance(response, dict) and 'error' in response and 'status_code' in response:
+            return response['status_code']
+        if response == "Request failed after retries":
+            return 404
+        return 0
 
-    async def async_post(self, url, expect_json=True, proxy="", **kwargs):
-        return await self._async_get_post(url, expect_json=expect_json, method="POST", proxy=proxy, **kwargs)
+    async def async_post(self, url, expect_json=True, proxy="", use_proxy=True, **kwargs):
+        return await self._async_get_post(url, expect_json=expect_json, method="POST", proxy=proxy,
+                                          use_proxy=use_proxy, **kwargs)
 
-    async def async_get(self, url, expect_json=True, proxy="", **kwargs):
-        return await self._async_get_post(url, expect_json=expect_json, method="GET", proxy=proxy, **kwargs)
+    async def async_get(self, url, expect_json=True, proxy="", use_proxy=True, **kwargs):
+        return await self._async_get_post(url, expect_json=expect_json, method="GET", proxy=proxy,
+                                          use_proxy=use_proxy, **kwargs)
 
 
 def login_required(func):
@@ -424,16 +658,107 @@ def calculate_net_price(price_gross: Decimal, publisher_fee: Decimal, steam_fee:
     return estimated_net_price / 100
 
 
-def merge_items_with_descriptions_from_inventory(inventory_response: dict, game: GameOptions) -> dict:
+class DescriptionCache:
+    """Process-wide LRU of item descriptions keyed by appid and `get_description_key`.
+
+    Descriptions are stored read-only down to their nested `tags`, `descriptions` and `actions`, so every response
+    describing the same item resolves to one shared object and the duplicates it brought along can be freed. A
+    description that differs from the cached one replaces it.
+    """
+
+    def __init__(self, maxsize: int = 50000) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._descriptions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._descriptions)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._descriptions
+
+    @staticmethod
+    def _key(appid, description_key: str) -> tuple:
+        return '' if appid is None else str(appid), description_key
+
+    def _get(self, key: tuple) -> Optional[Mapping]:
+        description = self._descriptions.get(key)
+        if description is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._descriptions.move_to_end(key)
+        return description
+
+    def get(self, appid, description_key: str) -> Optional[Mapping]:
+        with self._lock:
+            return self._get(self._key(appid, description_key))
+
+    def add(self, description: dict, appid=None) -> Mapping:
+        """Cache `description`, `appid` is used when the description does not name its app"""
+        key = self._key(description.get('appid', appid), get_description_key(description))
+        description = frozen_copy(description)
+        with self._lock:
+            cached = self._descriptions.get(key)
+            if cached is None or cached != description:
+                cached = self._descriptions[key] = description
+            self._descriptions.move_to_end(key)
+            while len(self._descriptions) > self.maxsize:
+                self._descriptions.popitem(last=False)
+            return cached
+
+    def update(self, descriptions: Iterable[dict], appid=None) -> dict:
+        """Cache `descriptions` and map their `get_description_key` to the shared description"""
+        return {get_description_key(description): self.add(description, appid) for description in descriptions}
+
+    def descriptions_for(self, items: Iterable[dict]) -> Optional[dict]:
+        """Map the `get_description_key` of every item to its cached description, None if any of them is missing"""
+        descriptions = {}
+        with self._lock:
+            for item in items:
+                description_key = get_description_key(item)
+                description = self._get(self._key(item.get('appid'), description_key))
+                if description is None:
+                    return None
+                descriptions[description_key] = description
+        return descriptions
+
+    def clear(self) -> None:
+        with self._lock:
+            self._descriptions.clear()
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._descriptions)}
+
+
+description_cache = DescriptionCache()
+
+
+def get_offers_items(offers_response: dict) -> List[dict]:
+    offers = offers_response['response'].get('trade_offers_received', []) + \
+             offers_response['response'].get('trade_offers_sent', [])
+    return [item for offer in offers for item in offer.get('items_to_give', []) + offer.get('items_to_receive', [])]
+
+
+def merge_items_with_descriptions_from_inventory(inventory_response: dict, game: GameOptions,
+                                                  item_views: bool = False) -> dict:
     inventory = inventory_response.get('assets', [])
     if not inventory:
         return {}
-    descriptions = {get_description_key(description): description for description in inventory_response['descriptions']}
-    return merge_items(inventory, descriptions, context_id = game.context_id)
-
-
-def merge_items_with_descriptions_from_offers(offers_response: dict) -> dict:
-    descriptions = {get_description_key(offer): offer for offer in offers_response['response'].get('descriptions', [])}
+    descriptions = description_cache.update(inventory_response['descriptions'], game.app_id)
+    return merge_items(inventory, descriptions, item_views, context_id = game.context_id)
+
+
+def merge_items_with_descriptions_from_offers(offers_response: dict, descriptions: dict = None) -> dict:
+    """Merge offered items with the response's descriptions, or with `descriptions` from `description_cache`"""
+    if descriptions is None and 'descriptions' in offers_response['response']:
+        descriptions = description_cache.update(offers_response['response']['descriptions'])
+    elif descriptions is None:
+        descriptions = description_cache.descriptions_for(get_offers_items(offers_response))
+        if descriptions is None:
+            raise ValueError('Offers have no descriptions and some of their items are not in the description cache')
     received_offers = offers_response['response'].get('trade_offers_received', [])
     sent_offers = offers_response['response'].get('trade_offers_sent', [])
     offers_response['response']['trade_offers_received'] = list(
@@ -454,21 +779,34 @@ def merge_items_with_descriptions_from_offer(offer: dict, descriptions: dict) ->
 
 
 def merge_items_with_descriptions_from_listing(listings: dict, ids_to_assets_address: dict, descriptions: dict) -> dict:
+    # Listings share a few app contexts, resolve each one once instead of per listing
+    contexts = {}
     for listing_id, listing in listings.get('sell_listings').items():
-        asset_address = ids_to_assets_address[listing_id]
-        description = descriptions[asset_address[0]][asset_address[1]][asset_address[2]]
-        listing['description'] = description
+        appid, contextid, assetid = ids_to_assets_address[listing_id]
+        assets = contexts.get((appid, contextid))
+        if assets is None:
+            assets = contexts[appid, contextid] = descriptions[appid][contextid]
+        listing['description'] = assets[assetid]
     return listings
 
 
-def merge_items(items: List[dict], descriptions: dict, **kwargs) -> dict:
+def merge_items(items: List[dict], descriptions: dict, item_views: bool = False, **kwargs) -> dict:
+    """Merge items with their descriptions into dicts, or with `item_views` into read-only `InventoryItem` views.
+
+    Every dict holds its own copy of the description, nested lists included, so it can be changed without touching the
+    shared cached one. That costs a copy per item on top of the cache, `item_views` avoid it for large inventories.
+    """
     merged_items = {}
 
     for item in items:
         description_key = get_description_key(item)
-        description = copy.copy(descriptions[description_key])
         item_id = item.get('id') or item['assetid']
-        description['contextid'] = item.get('contextid') or kwargs['context_id']
+        context_id = item.get('contextid') or kwargs['context_id']
+        if item_views:
+            merged_items[item_id] = InventoryItem(item_id, context_id, item['amount'], descriptions[description_key])
+            continue
+        description = mutable_copy(descriptions[description_key])
+        description['contextid'] = context_id
         description['id'] = item_id
         description['amount'] = item['amount']
         merged_items[item_id] = description
@@ -476,37 +814,45 @@ def merge_items(items: List[dict], descriptions: dict, **kwargs) -> dict:
     return merged_items
 
 
-def get_market_listings_from_html(html: str) -> dict:
-    document = BeautifulSoup(html, 'html.parser')
-    nodes = document.select('div[id=myListings]')[0].findAll('div', {'class': 'market_home_listing_table'})
+def get_market_listings_from_html(html: str, backend: HtmlBackend = None) -> dict:
+    backend = backend or get_html_backend()
+    document = backend.parse(html)
+    nodes = backend.select(backend.select(document, 'div[id=myListings]')[0], 'div.market_home_listing_table')
     sell_listings_dict = {}
     buy_orders_dict = {}
 
     for node in nodes:
-        if 'My sell listings' in node.text:
-            sell_listings_dict = get_sell_listings_from_node(node)
-        elif 'My listings awaiting confirmation' in node.text:
-            sell_listings_awaiting_conf = get_sell_listings_from_node(node)
+        text = backend.text(node)
+        if 'My sell listings' in text:
+            sell_listings_dict = get_sell_listings_from_node(node, backend)
+        elif 'My listings awaiting confirmation' in text:
+            sell_listings_awaiting_conf = get_sell_listings_from_node(node, backend)
             for listing in sell_listings_awaiting_conf.values():
                 listing['need_confirmation'] = True
             sell_listings_dict.update(sell_listings_awaiting_conf)
-        elif 'My buy orders' in node.text:
-            buy_orders_dict = get_buy_orders_from_node(node)
+        elif 'My buy orders' in text:
+            buy_orders_dict = get_buy_orders_from_node(node, backend)
 
     return {'buy_orders': buy_orders_dict, 'sell_listings': sell_listings_dict}
 
 
-def get_sell_listings_from_node(node: Tag) -> dict:
-    sell_listings_raw = node.findAll('div', {'id': re.compile('mylisting_\d+')})
+LISTING_ID_RE = re.compile(r'mylisting_\d+')
+BUY_ORDER_ID_RE = re.compile(r'mybuyorder_\d+')
+
+
+def get_sell_listings_from_node(node, backend: HtmlBackend = None) -> dict:
+    backend = backend or get_html_backend()
+    sell_listings_raw = [listing for listing in backend.select(node, 'div[id^=mylisting_]')
+                         if LISTING_ID_RE.search(backend.attr(listing, 'id'))]
     sell_listings_dict = {}
 
     for listing_raw in sell_listings_raw:
-        spans = listing_raw.select('span[title]')
+        spans = backend.select(listing_raw, 'span[title]')
         listing = {
-            'listing_id': listing_raw.attrs['id'].replace('mylisting_', ''),
-            'buyer_pay': spans[0].text.strip(),
-            'you_receive': spans[1].text.strip()[1:-1],
-            'created_on': listing_raw.findAll('div', {'class': 'market_listing_listed_date'})[0].text.strip(),
+            'listing_id': backend.attr(listing_raw, 'id').replace('mylisting_', ''),
+            'buyer_pay': backend.text(spans[0]).strip(),
+            'you_receive': backend.text(spans[1]).strip()[1:-1],
+            'created_on': backend.text(backend.select(listing_raw, 'div.market_listing_listed_date')[0]).strip(),
             'need_confirmation': False,
         }
         sell_listings_dict[listing['listing_id']] = listing
@@ -514,38 +860,45 @@ def get_sell_listings_from_node(node: Tag) -> dict:
     return sell_listings_dict
 
 
-def get_market_sell_listings_from_api(html: str) -> dict:
-    document = BeautifulSoup(html, 'html.parser')
-    sell_listings_dict = get_sell_listings_from_node(document)
+def get_market_sell_listings_from_api(html: str, backend: HtmlBackend = None) -> dict:
+    backend = backend or get_html_backend()
+    sell_listings_dict = get_sell_listings_from_node(backend.parse(html), backend)
     return {'sell_listings': sell_listings_dict}
 
 
-def get_buy_orders_from_node(node: Tag) -> dict:
-    buy_orders_raw = node.findAll('div', {'id': re.compile('mybuyorder_\\d+')})
+def get_buy_orders_from_node(node, backend: HtmlBackend = None) -> dict:
+    backend = backend or get_html_backend()
+    buy_orders_raw = [order for order in backend.select(node, 'div[id^=mybuyorder_]')
+                      if BUY_ORDER_ID_RE.search(backend.attr(order, 'id'))]
     buy_orders_dict = {}
 
     for order in buy_orders_raw:
-        qnt_price_raw = order.select('span[class=market_listing_price]')[0].text.split('@')
+        qnt_price_raw = backend.text(backend.select(order, 'span[class=market_listing_price]')[0]).split('@')
         order = {
-            'order_id': order.attrs['id'].replace('mybuyorder_', ''),
+            'order_id': backend.attr(order, 'id').replace('mybuyorder_', ''),
             'quantity': int(qnt_price_raw[0].strip()),
             'price': qnt_price_raw[1].strip(),
-            'item_name': order.a.text,
-            'game_name': order.select('span[class=market_listing_game_name]')[0].text,
+            'item_name': backend.text(backend.select(order, 'a')[0]),
+            'game_name': backend.text(backend.select(order, 'span[class=market_listing_game_name]')[0]),
         }
         buy_orders_dict[order['order_id']] = order
 
     return buy_orders_dict
 
 
-def get_listing_id_to_assets_address_from_html(html: str) -> dict:
-    listing_id_to_assets_address = {}
-    regex = "CreateItemHoverFromContainer\( [\w]+, 'mylisting_([\d]+)_[\w]+', ([\d]+), '([\d]+)', '([\d]+)', [\d]+ \);"
+LISTING_HOVER_CALL = 'CreateItemHoverFromContainer( '
+LISTING_HOVER_RE = re.compile(
+    r"CreateItemHoverFromContainer\( \w+, 'mylisting_(\d+)_\w+', (\d+), '(\d+)', '(\d+)', \d+ \);"
+)
 
-    for match in re.findall(regex, html):
-        listing_id_to_assets_address[match[0]] = [str(match[1]), match[2], match[3]]
 
-    return listing_id_to_assets_address
+def get_listing_id_to_assets_address_from_html(html: str) -> dict:
+    # The hovers are in a script at the end of /market pages, skip the listing rows with a plain substring search
+    start = html.find(LISTING_HOVER_CALL) if html else -1
+    if start == -1:
+        return {}
+    return {listing_id: [appid, contextid, assetid]
+            for listing_id, appid, contextid, assetid in LISTING_HOVER_RE.findall(html, start)}
 
 
 def get_description_key(item: dict) -> str:
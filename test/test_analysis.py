@@ -0,0 +1,47 @@
+import unittest
+from unittest import TestCase
+
+from steampy import analysis
+from steampy.price_history import parse_line1
+
+
+@unittest.skipIf(analysis.np is None, 'Requires numpy')
+class TestAnalysis(TestCase):
+    def setUp(self):
+        self.histories = [
+            parse_line1('[["Jul 02 2014 01: +0",1.0,"1"],["Jul 02 2014 02: +0",2.0,"3"],["Jul 02 2014 03: +0",4.0,"0"]]'),
+            parse_line1('[]'),
+            parse_line1('[["Jul 02 2014 01: +0",10.0,"2"],["Jul 03 2014 01: +0",20.0,"2"]]'),
+        ]
+
+    def test_price_history_arrays_share_parser_memory(self):
+        timestamps, prices, volumes = analysis.price_history_to_arrays(self.histories[0])
+        self.assertEqual(timestamps.tolist(), [1404262800, 1404266400, 1404270000])
+        self.assertEqual(prices.tolist(), [1.0, 2.0, 4.0])
+        self.assertEqual(volumes.dtype, analysis.np.int64)
+        self.histories[0].prices[0] = 1.5
+        self.assertEqual(prices[0], 1.5)
+
+    def test_vwap(self):
+        result = analysis.vwap(self.histories)
+        self.assertEqual(result[0], 1.75)
+        self.assertTrue(analysis.np.isnan(result[1]))
+        self.assertEqual(result[2], 15.0)
+        self.assertEqual(analysis.vwap(self.histories, since=1404300000)[2], 20.0)
+
+    def test_rolling_median(self):
+        prices = analysis.np.array([1.0, 5.0, 2.0, 8.0, 3.0])
+        self.assertEqual(analysis.rolling_median(prices, 3).tolist(), [2.0, 5.0, 3.0])
+        self.assertEqual([len(medians) for medians in analysis.rolling_medians(self.histories, 2)], [2, 0, 1])
+
+    def test_order_book_spread(self):
+        histogram = {
+            'buy_order_graph': [[1.5, 10, '10 buy orders at $1.50 or higher'], [1.4, 25, '25 buy orders']],
+            'sell_order_graph': [[1.7, 3, '3 sell orders at $1.70 or lower'], [1.8, 9, '9 sell orders']],
+        }
+        book = analysis.parse_order_book(histogram)
+        self.assertEqual(book.buy_quantities.tolist(), [10, 25])
+        self.assertEqual(book.sell_prices.tolist(), [1.7, 1.8])
+        spreads = analysis.spreads([book, analysis.parse_order_book({'buy_order_graph': []})])
+        self.assertAlmostEqual(spreads[0], 0.2)
+        self.assertTrue(analysis.np.isnan(spreads[1]))
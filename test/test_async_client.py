@@ -0,0 +1,389 @@
+import asyncio
+from unittest import TestCase
+
+import aiohttp
+
+from steampy.async_client import AsyncSteamClient
+from steampy.client import SteamClient
+from steampy.exceptions import ApiException, ConfirmationExpected, TooManyRequests
+from steampy.models import Asset, GameOptions, InventoryStatus, OfferRequest, OfferStatus
+from steampy.utils import description_cache
+
+
+class TestAsyncSteamClient(TestCase):
+    def setUp(self):
+        self.client = AsyncSteamClient('key')
+        self.client.was_login_executed = True
+        self.client._session.cookies.set('sessionid', 'abc')
+        self.posted = []
+        self.response = None
+
+        async def async_post(url, use_proxy=True, data=None, **kwargs):
+            self.posted.append((url, data))
+            return self.response
+
+        self.client._async_session.async_post = async_post
+
+    def _make_offer(self) -> dict:
+        return asyncio.run(self.client.make_offer([Asset('1', GameOptions.CS)], [], '76561197960265729', 'hi'))
+
+    def test_from_client_shares_sessions_and_login(self):
+        client = SteamClient('key', ua_header={})
+        client._session.cookies.set('sessionid', 'abc')
+        client.steam_guard = {'steamid': '76561197960265729', 'identity_secret': ''}
+        client.was_login_executed = True
+        async_client = AsyncSteamClient.from_client(client)
+        self.assertIs(async_client._session, client._session)
+        self.assertIs(async_client._async_session, client._async_session)
+        self.assertIs(async_client.market.item_nameid_index, client.market.item_nameid_index)
+        self.assertIs(async_client.market._async_session, client._async_session)
+        self.assertEqual((async_client.market._session_id, async_client.market._steam_guard),
+                         ('abc', client.steam_guard))
+        self.assertTrue(async_client.market.was_login_executed)
+
+    def test_make_offer_is_confirmed(self):
+        class Executor:
+            async def send_trade_allow_request(self, trade_offer_id):
+                return {'success': True, 'confirmed_tradeofferid': trade_offer_id}
+
+        self.client.market._confirmation_executor = Executor()
+        self.response = {'tradeofferid': '5', 'needs_mobile_confirmation': True}
+        self.assertEqual(self._make_offer(), {'tradeofferid': '5', 'needs_mobile_confirmation': True,
+                                              'success': True, 'confirmed_tradeofferid': '5'})
+        url, data = self.posted[0]
+        self.assertEqual((url, data['sessionid'], data['partner']),
+                         ('https://steamcommunity.com/tradeoffer/new/send', 'abc', '76561197960265729'))
+
+    def test_make_offer_failures_raise(self):
+        for response in ('<html>Sorry, some kind of error has occurred</html>',
+                         {'status_code': 500, 'error': 'Request failed after retries'}):
+            with self.subTest(response=response):
+                self.response = response
+                with self.assertRaises(ApiException):
+                    self._make_offer()
+
+
+class TestFetchInventories(TestCase):
+    def setUp(self):
+        self.client = AsyncSteamClient('')
+        self.client.was_login_executed = True
+
+    def _fake_async_get(self, responses, delays=None):
+        async def async_get(url, use_proxy=True, params=None, **kwargs):
+            steam_id = url.split('/')[4]
+            await asyncio.sleep((delays or {}).get(steam_id, 0))
+            return responses[steam_id]
+
+        self.client._async_session.async_get = async_get
+
+    def _fetch_all(self, steam_ids, **kwargs):
+        async def fetch():
+            inventories = [(steam_id, GameOptions.CS) for steam_id in steam_ids]
+            return [result async for result in self.client.fetch_inventories(inventories, **kwargs)]
+
+        return asyncio.run(fetch())
+
+    def test_statuses_are_distinguished(self):
+        page = {'assets': [], 'descriptions': [], 'more_items': 0}
+        self._fake_async_get({
+            '1': page,
+            '2': {'status_code': 403, 'error': ''},
+            '3': {'status_code': 429, 'error': ''},
+            '4': {'status_code': 500, 'error': ''},
+        })
+        results = {result.steam_id: result.status for result in self._fetch_all(['1', '2', '3', '4'])}
+        self.assertEqual(results, {'1': InventoryStatus.OK, '2': InventoryStatus.PRIVATE,
+                                   '3': InventoryStatus.RATE_LIMITED, '4': InventoryStatus.UNAVAILABLE})
+
+    def test_results_are_yielded_as_they_complete(self):
+        page = {'assets': [], 'descriptions': [], 'more_items': 0}
+        self._fake_async_get({'1': page, '2': page}, delays={'1': 0.05})
+        results = self._fetch_all(['1', '2'])
+        self.assertEqual([result.steam_id for result in results], ['2', '1'])
+
+    def test_timeout_keeps_fetched_pages(self):
+        first_page = {'assets': [{'assetid': '10', 'classid': '1', 'instanceid': '0', 'amount': '1'}],
+                      'descriptions': [{'classid': '1', 'instanceid': '0'}], 'more_items': 1, 'last_assetid': '10'}
+
+        async def async_get(url, use_proxy=True, params=None, **kwargs):
+            if 'start_assetid' in params:
+                await asyncio.sleep(1)
+            return first_page
+
+        self.client._async_session.async_get = async_get
+        result, = self._fetch_all(['1'], timeout=0.05)
+        self.assertEqual(result.status, InventoryStatus.TIMEOUT)
+        self.assertEqual(list(result.items), ['10'])
+
+
+    def test_raw_pages_are_kept_by_page_number(self):
+        pages = {None: {'assets': [], 'descriptions': [], 'more_items': 1, 'last_assetid': '10'},
+                 '10': {'assets': [], 'descriptions': [], 'more_items': 0}}
+
+        async def async_get(url, use_proxy=True, params=None, **kwargs):
+            return pages[params.get('start_assetid')]
+
+        self.client._async_session.async_get = async_get
+        result, = self._fetch_all(['1'], merge=False)
+        self.assertEqual(result.status, InventoryStatus.OK)
+        self.assertEqual(result.items, {0: pages[None], 1: pages['10']})
+
+    def test_network_errors_are_reported_and_bugs_raised(self):
+        async def network_error(url, use_proxy=True, params=None, **kwargs):
+            raise aiohttp.ClientConnectionError()
+
+        self.client._async_session.async_get = network_error
+        self.assertEqual(self._fetch_all(['1'])[0].status, InventoryStatus.ERROR)
+
+        async def bug(url, use_proxy=True, params=None, **kwargs):
+            raise KeyError('assets')
+
+        self.client._async_session.async_get = bug
+        with self.assertRaises(KeyError):
+            self._fetch_all(['1'])
+
+
+class TestIterInventory(TestCase):
+    def setUp(self):
+        self.client = AsyncSteamClient('')
+        self.client.was_login_executed = True
+        self.requests = []
+
+    def tearDown(self):
+        description_cache.clear()
+
+    def _iter(self, pages: dict, **kwargs) -> list:
+        async def async_get(url, use_proxy=True, params=None, **kw):
+            self.requests.append(params.get('start_assetid'))
+            return pages[params.get('start_assetid')]
+
+        self.client._async_session.async_get = async_get
+
+        async def iterate():
+            return [page async for page in self.client.iter_inventory('76561197960265729', GameOptions.CS, **kwargs)]
+
+        return asyncio.run(iterate())
+
+    def test_follows_last_assetid_until_the_final_page(self):
+        description = {'appid': 730, 'classid': '7', 'instanceid': '0', 'market_hash_name': 'AK-47'}
+        pages = {
+            None: {'success': 1, 'more_items': 1, 'last_assetid': '1', 'descriptions': [description],
+                   'assets': [{'assetid': '1', 'classid': '7', 'instanceid': '0', 'amount': '1'}]},
+            '1': {'success': 1, 'descriptions': [description],
+                  'assets': [{'assetid': '2', 'classid': '7', 'instanceid': '0', 'amount': '1'}]},
+        }
+        merged = self._iter(pages)
+        self.assertEqual([list(page) for page in merged], [['1'], ['2']])
+        self.assertEqual(self.requests, [None, '1'])
+        self.assertEqual(self._iter(pages, merge=False), [pages[None], pages['1']])
+
+    def test_empty_inventory(self):
+        self.assertEqual(self._iter({None: {'success': 1, 'total_inventory_count': 0}}), [{}])
+
+    def test_failed_page_raises(self):
+        with self.assertRaises(TooManyRequests):
+            self._iter({None: {'status_code': 429, 'error': 'Request failed after retries'}})
+
+
+class FakeConfirmationExecutor:
+    def __init__(self) -> None:
+        self.batches = []
+
+    async def confirm_trade_offers(self, trade_offer_ids):
+        self.batches.append(list(trade_offer_ids))
+        return {trade_offer_id: True for trade_offer_id in trade_offer_ids}
+
+
+class TestAcceptTradeOffers(TestCase):
+    def setUp(self):
+        self.client = AsyncSteamClient('key')
+        self.client.was_login_executed = True
+        self.client._session.cookies.set('sessionid', 'abc')
+        self.executor = FakeConfirmationExecutor()
+        self.client.market._confirmation_executor = self.executor
+        self.received = [
+            {'tradeofferid': '1', 'trade_offer_state': 2, 'accountid_other': 1},
+            {'tradeofferid': '2', 'trade_offer_state': 2, 'accountid_other': 2},
+            {'tradeofferid': '3', 'trade_offer_state': 2, 'accountid_other': 3},
+        ]
+        self.requests = []
+        self.in_flight = self.max_in_flight = 0
+
+        async def async_get(url, use_proxy=True, params=None, **kwargs):
+            self.requests.append(url.split('/')[-2])
+            if url.endswith('/GetTradeOffers/v1'):
+                return {'response': {'trade_offers_received': self.received}}
+            if '/tradeoffer/' in url:
+                return f"var g_ulTradePartnerSteamID = '{76561197960265728 + int(url.split('/')[-1])}';"
+            return {'response': {'offer': {'tradeofferid': params['tradeofferid'], 'trade_offer_state': 3}}}
+
+        async def async_post(url, use_proxy=True, data=None, **kwargs):
+            self.requests.append('accept')
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            self.assertEqual((data['sessionid'], data['partner']),
+                             ('abc', str(76561197960265728 + int(data['tradeofferid']))))
+            if data['tradeofferid'] == '3':
+                return {'tradeid': '30'}
+            return {'needs_mobile_confirmation': True}
+
+        self.client._async_session.async_get = async_get
+        self.client._async_session.async_post = async_post
+
+    def test_accepts_concurrently_and_confirms_in_one_batch(self):
+        results = asyncio.run(self.client.accept_trade_offers(['1', '2', '3', '4'], max_concurrency=2))
+        self.assertEqual(results['1'], {'needs_mobile_confirmation': True, 'confirmed': True})
+        self.assertEqual(results['3'], {'tradeid': '30'})
+        self.assertEqual(results['4'], {'success': False, 'error': 'Invalid trade offer state: Accepted (3)'})
+        self.assertEqual(list(results), ['1', '2', '3', '4'])
+        self.assertEqual(self.executor.batches, [['1', '2']])
+        self.assertEqual(self.max_in_flight, 2)
+        # One offer list, one lookup of the offer missing from it and no trade offer page scraping
+        self.assertEqual(sorted(self.requests), ['GetTradeOffer', 'GetTradeOffers'] + ['accept'] * 3)
+
+    def test_partner_is_scraped_when_missing(self):
+        self.received.append({'tradeofferid': '5', 'trade_offer_state': 2})
+        results = asyncio.run(self.client.accept_trade_offers(['5']))
+        self.assertEqual(results['5'], {'needs_mobile_confirmation': True, 'confirmed': True})
+        self.assertIn('tradeoffer', self.requests)
+
+    def test_failed_confirmation_keeps_the_report(self):
+        async def confirm_trade_offers(trade_offer_ids):
+            raise ConfirmationExpected
+
+        self.executor.confirm_trade_offers = confirm_trade_offers
+        results = asyncio.run(self.client.accept_trade_offers(['1', '3']))
+        self.assertEqual(results['1'], {'needs_mobile_confirmation': True, 'confirmed': False,
+                                        'error': 'Confirmation failed: ConfirmationExpected()'})
+        self.assertEqual(results['3'], {'tradeid': '30'})
+
+
+class TestSendOffers(TestCase):
+    def setUp(self):
+        self.executor = FakeConfirmationExecutor()
+        self.sent = []
+        self.delays = {}
+        self.retries = set()
+
+    def _client(self, client):
+        client.was_login_executed = True
+        client._session.cookies.set('sessionid', 'abc')
+
+        async def async_post(url, use_proxy=True, data=None, headers=None, **kwargs):
+            self.sent.append((data['partner'], data['trade_offer_create_params'], headers['Referer']))
+            self.retries.add(kwargs.get('retries'))
+            await asyncio.sleep(self.delays.get(data['tradeoffermessage'], 0))
+            if data['tradeoffermessage'] == 'fail':
+                return {'status_code': 500, 'error': 'Request failed after retries'}
+            if data['tradeoffermessage'] == 'direct':
+                return {'tradeofferid': '100'}
+            return {'tradeofferid': data['tradeoffermessage'], 'needs_mobile_confirmation': True}
+
+        client._async_session.async_post = async_post
+        return client
+
+    @staticmethod
+    def _offer(message: str, **kwargs) -> OfferRequest:
+        kwargs.setdefault('partner_steam_id', '76561197960265729')
+        return OfferRequest([Asset('1', GameOptions.CS)], [], message=message, **kwargs)
+
+    def _send(self, offers, **kwargs):
+        client = self._client(AsyncSteamClient('key'))
+        client.market._confirmation_executor = self.executor
+
+        async def send():
+            return [outcome async for outcome in client.send_offers(offers, **kwargs)]
+
+        return asyncio.run(send())
+
+    def test_outcomes_and_batched_confirmations(self):
+        self.delays = {'1': 0.02}
+        offers = [self._offer('1'), self._offer('fail'), self._offer('direct'), self._offer('2'), self._offer('3')]
+        outcomes = self._send(offers, max_concurrency=2, confirmation_batch_size=2)
+        by_message = {outcome.request.message: outcome for outcome in outcomes}
+        self.assertEqual(by_message['fail'].status, OfferStatus.FAILED)
+        self.assertIsNone(by_message['fail'].trade_offer_id)
+        self.assertEqual((by_message['direct'].status, by_message['direct'].trade_offer_id), (OfferStatus.SENT, '100'))
+        self.assertEqual({by_message[message].status for message in '123'}, {OfferStatus.CONFIRMED})
+        # Failures are reported without waiting for the slow offer, confirmations go out two at a time
+        self.assertEqual(outcomes[0].request.message, 'fail')
+        self.assertEqual(sorted(map(len, self.executor.batches)), [1, 2])
+        self.assertEqual(sorted(sum(self.executor.batches, [])), ['1', '2', '3'])
+        # A send that timed out may have created the offer, it is never repeated
+        self.assertEqual(self.retries, {1})
+
+    def test_unconfirmed_offers(self):
+        async def confirm_trade_offers(trade_offer_ids):
+            return {trade_offer_id: trade_offer_id == '1' for trade_offer_id in trade_offer_ids}
+
+        self.executor.confirm_trade_offers = confirm_trade_offers
+        outcomes = self._send([self._offer('1'), self._offer('2')])
+        self.assertEqual({outcome.trade_offer_id: outcome.status for outcome in outcomes},
+                         {'1': OfferStatus.CONFIRMED, '2': OfferStatus.UNCONFIRMED})
+
+    def test_trade_offer_url(self):
+        url = 'https://steamcommunity.com/tradeoffer/new/?partner=5&token=abc'
+        self._send([self._offer('direct', partner_steam_id=None, trade_offer_url=url)])
+        self.assertEqual(self.sent, [('76561197960265733', '{"trade_offer_access_token": "abc"}',
+                                      'https://steamcommunity.com/tradeoffer/new/')])
+
+    def test_offer_without_partner_fails_alone(self):
+        outcomes = self._send([self._offer('direct'), self._offer('nobody', partner_steam_id=None)])
+        self.assertEqual([(outcome.request.message, outcome.status) for outcome in outcomes],
+                         [('nobody', OfferStatus.FAILED), ('direct', OfferStatus.SENT)])
+        self.assertEqual(len(self.sent), 1)
+
+    def test_sync_client_refuses_a_running_loop(self):
+        client = self._client(SteamClient('key', ua_header={}))
+
+        async def send():
+            return list(client.send_offers([self._offer('direct')]))
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(send())
+        self.assertEqual(self.sent, [])
+
+    def test_sync_client_confirms_per_batch(self):
+        client = self._client(SteamClient('key', ua_header={}))
+        batches = []
+        client.market._confirmation_executor = type('Executor', (), {'confirm_trade_offers': lambda _, ids: (
+            batches.append(list(ids)) or {trade_offer_id: True for trade_offer_id in ids})})()
+        offers = [self._offer(message) for message in ('1', '2', 'direct', '3')]
+        outcomes = list(client.send_offers(offers, confirmation_batch_size=2))
+        self.assertEqual([outcome.status for outcome in outcomes],
+                         [OfferStatus.CONFIRMED, OfferStatus.CONFIRMED, OfferStatus.SENT, OfferStatus.CONFIRMED])
+        self.assertEqual(batches, [['1', '2'], ['3']])
+
+
+class TestTradeOffersDescriptionCache(TestCase):
+    def setUp(self):
+        description_cache.clear()
+        self.client = AsyncSteamClient('key')
+        self.calls = []
+        item = {'appid': 730, 'contextid': '2', 'assetid': '1', 'classid': '7', 'instanceid': '0', 'amount': '1'}
+        description = {'appid': 730, 'classid': '7', 'instanceid': '0', 'market_hash_name': 'AK-47 | Redline'}
+
+        async def api_call(method, interface, api_method, version, params=None):
+            self.calls.append(params['get_descriptions'])
+            offer = {'tradeofferid': '1', 'trade_offer_state': 2, 'items_to_receive': [item]}
+            response = {'trade_offers_received': [offer]}
+            if params['get_descriptions']:
+                response['descriptions'] = [description]
+            return {'response': response}
+
+        self.client.api_call = api_call
+
+    def tearDown(self):
+        description_cache.clear()
+
+    def _received_item(self) -> dict:
+        offers = asyncio.run(self.client.get_trade_offers(use_description_cache=True))
+        return offers['response']['trade_offers_received'][0]['items_to_receive']['1']
+
+    def test_descriptions_are_requested_only_on_a_cache_miss(self):
+        self.assertEqual(self._received_item()['market_hash_name'], 'AK-47 | Redline')
+        self.assertEqual(self.calls, [0, 1])
+        self.assertEqual(self._received_item()['market_hash_name'], 'AK-47 | Redline')
+        self.assertEqual(self.calls, [0, 1, 0])
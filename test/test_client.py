@@ -4,9 +4,9 @@ from unittest import TestCase
 import unittest
 
 from steampy.client import SteamClient
-from steampy.exceptions import LoginRequired
+from steampy.exceptions import InventoryFetchError, LoginRequired
 from steampy.models import GameOptions, Asset
-from steampy.utils import account_id_to_steam_id, load_credentials
+from steampy.utils import account_id_to_steam_id, description_cache, load_credentials
 
 @unittest.skip('Requires secrets/Steamguard.txt')
 class TestSteamClient(TestCase):
@@ -76,6 +76,14 @@ class TestSteamClient(TestCase):
         inventory = client.get_partner_inventory(partner_id, game)
         self.assertIsNotNone(inventory)
 
+    def test_iter_inventory(self):
+        client = SteamClient(self.credentials.api_key)
+        client.login(self.credentials.login, self.credentials.password, self.steam_guard_file)
+        steam_id = client.steam_guard['steamid']
+        pages = list(client.iter_inventory(steam_id, GameOptions.CS, count=100))
+        inventory = client.get_my_inventory(GameOptions.CS)
+        self.assertEqual(sum(len(page) for page in pages), len(inventory))
+
     def test_get_trade_offers_summary(self):
         client = SteamClient(self.credentials.api_key)
         summary = client.get_trade_offers_summary()
@@ -169,3 +177,59 @@ class TestSteamClient(TestCase):
             self.assertIsInstance(wallet_balance, Decimal)
             wallet_balance = client.get_wallet_balance(convert_to_decimal=False)
             self.assertIsInstance(wallet_balance, str)
+
+
+class FakeInventoryResponse:
+    def __init__(self, data: dict, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class TestIterInventory(TestCase):
+    pages = {
+        None: {'success': 1, 'more_items': 1, 'last_assetid': '1',
+               'assets': [{'assetid': '1', 'classid': '7', 'instanceid': '0', 'amount': '1'}],
+               'descriptions': [{'appid': 730, 'classid': '7', 'instanceid': '0', 'market_hash_name': 'AK-47'}]},
+        '1': {'success': 1,
+              'assets': [{'assetid': '2', 'classid': '7', 'instanceid': '0', 'amount': '1'}],
+              'descriptions': [{'appid': 730, 'classid': '7', 'instanceid': '0', 'market_hash_name': 'AK-47'}]},
+    }
+
+    def tearDown(self):
+        description_cache.clear()
+
+    def _client(self, pages: dict, status_code: int = 200) -> SteamClient:
+        client = SteamClient('key', ua_header={})
+        client.was_login_executed = True
+        self.requests = []
+
+        def safe_get(url, expect_json=True, use_proxy=False, params=None, **kwargs):
+            self.requests.append((params['count'], params.get('start_assetid')))
+            return FakeInventoryResponse(pages[params.get('start_assetid')], status_code)
+
+        client._session.safe_get = safe_get
+        return client
+
+    def test_follows_last_assetid_until_the_final_page(self):
+        pages = list(self._client(self.pages).iter_inventory('76561197960265729', GameOptions.CS, count=1))
+        self.assertEqual([list(page) for page in pages], [['1'], ['2']])
+        self.assertEqual(pages[1]['2']['market_hash_name'], 'AK-47')
+        self.assertEqual(self.requests, [(1, None), (1, '1')])
+
+    def test_raw_pages(self):
+        pages = list(self._client(self.pages).iter_inventory('76561197960265729', GameOptions.CS, merge=False))
+        self.assertEqual(pages, [self.pages[None], self.pages['1']])
+
+    def test_empty_inventory(self):
+        pages = list(self._client({None: {'success': 1, 'total_inventory_count': 0}}).iter_inventory(
+            '76561197960265729', GameOptions.CS))
+        self.assertEqual(pages, [{}])
+
+    def test_failed_page_raises(self):
+        client = self._client({None: None}, status_code=403)
+        with self.assertRaises(InventoryFetchError) as raised:
+            list(client.iter_inventory('76561197960265729', GameOptions.CS))
+        self.assertEqual(raised.exception.status, 403)
@@ -0,0 +1,243 @@
+import os
+import json
+import asyncio
+from unittest import TestCase, mock
+
+from aiohttp import web
+
+from steampy.confirmation import AsyncConfirmationExecutor, ConfirmationExecutor, ConfirmationType, select_confirmations
+from steampy.exceptions import ConfirmationExpected
+from steampy.utils import AsyncSession
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+IDENTITY_SECRET = 'itsmyidentitysecretbase64encodedpadding='
+
+CONFIRMATIONS = [
+    {'type': 2, 'id': '101', 'nonce': 'n101', 'creator_id': '6842071129'},
+    {'type': 3, 'id': '102', 'nonce': 'n102', 'creator_id': '4213506120918410917'},
+    {'type': 2, 'id': '103', 'nonce': 'n103', 'creator_id': 6842071130},
+    {'type': 3, 'id': '104', 'nonce': 'n104', 'creator_id': '4213506120918410918'},
+]
+
+
+def details_page(asset_id: str) -> dict:
+    with open(os.path.join(FIXTURES, 'confirmation_sell_listing.html'), encoding='utf-8') as f:
+        return {'success': True, 'html': f.read().replace('"id":"30546587652"', f'"id":"{asset_id}"')}
+
+
+DETAILS = {'102': details_page('1001'), '104': details_page('1002')}
+
+
+class FakeResponse:
+    def __init__(self, data) -> None:
+        self.status_code = 200
+        self.text = json.dumps(data)
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class FakeSession:
+    def __init__(self, success: bool = True) -> None:
+        self.success = success
+        self.requests = []
+        self.confirmed = []
+
+    def safe_get(self, url, expect_json=True, **kwargs):
+        self.requests.append(url)
+        if url.endswith('/getlist'):
+            return FakeResponse({'success': True, 'conf': CONFIRMATIONS})
+        if url.endswith('/ajaxop'):
+            self.confirmed.append(kwargs['params']['cid'])
+            return FakeResponse({'success': self.success})
+        return FakeResponse(DETAILS[url.rsplit('/', 1)[1]])
+
+    def safe_post(self, url, expect_json=True, data=None, **kwargs):
+        self.requests.append(url)
+        self.posted = data
+        return FakeResponse({'success': self.success})
+
+
+class FakeAsyncSession(FakeSession):
+    async def async_get(self, url, expect_json=True, use_proxy=True, **kwargs):
+        await asyncio.sleep(0)
+        response = self.safe_get(url, **kwargs)
+        return response.json() if expect_json else response.text
+
+    async def async_post(self, url, expect_json=True, use_proxy=True, data=None, **kwargs):
+        return self.safe_post(url, data=data).json()
+
+
+class TestConfirmationExecutor(TestCase):
+    def setUp(self):
+        self.session = FakeSession()
+        self.executor = ConfirmationExecutor(IDENTITY_SECRET, '76561197960287930', self.session)
+
+    def test_confirmations_from_getlist(self):
+        confirmations = self.executor.get_confirmations()
+        self.assertEqual([confirmation.type for confirmation in confirmations], [2, 3, 2, 3])
+        self.assertEqual(confirmations[2].creator_id, '6842071130')
+        self.assertEqual(list(select_confirmations(confirmations, ConfirmationType.TRADE, ['6842071130'])),
+                         ['6842071130'])
+
+    def test_confirm_trade_offers_in_one_request(self):
+        report = self.executor.confirm_trade_offers(['6842071129', 6842071130, '1'])
+        self.assertEqual(report, {'6842071129': True, '6842071130': True, '1': False})
+        self.assertEqual([url.rsplit('/', 1)[1] for url in self.session.requests], ['getlist', 'multiajaxop'])
+        self.assertEqual([value for key, value in self.session.posted if key == 'cid[]'], ['101', '103'])
+        self.assertEqual([value for key, value in self.session.posted if key == 'ck[]'], ['n101', 'n103'])
+        self.assertIn(('op', 'allow'), self.session.posted)
+
+    def test_failed_multiajaxop_confirms_nothing(self):
+        self.session.success = False
+        self.assertEqual(self.executor.confirm_trade_offers(['6842071129']), {'6842071129': False})
+
+    def test_confirm_sell_listings_by_asset_id(self):
+        report = self.executor.confirm_sell_listings(['1001', '1003'])
+        self.assertEqual(report, {'1001': True, '1003': False})
+        self.assertEqual([url.rsplit('/', 1)[1] for url in self.session.requests],
+                         ['getlist', '102', '104', 'multiajaxop'])
+
+    def test_confirm_all_sell_listings_skips_details(self):
+        report = self.executor.confirm_sell_listings()
+        self.assertEqual(report, {'4213506120918410917': True, '4213506120918410918': True})
+        self.assertEqual([url.rsplit('/', 1)[1] for url in self.session.requests], ['getlist', 'multiajaxop'])
+
+    def test_send_trade_allow_request_matches_creator_id(self):
+        self.assertEqual(self.executor.send_trade_allow_request('6842071130'), {'success': True})
+        self.assertEqual(self.session.confirmed, ['103'])
+        with self.assertRaises(ConfirmationExpected):
+            self.executor.send_trade_allow_request('1')
+        self.assertEqual([url.rsplit('/', 1)[1] for url in self.session.requests], ['getlist', 'ajaxop', 'getlist'])
+
+    def test_confirm_sell_listing_stops_at_match(self):
+        self.executor.confirm_sell_listing('1001')
+        self.assertEqual(self.session.confirmed, ['102'])
+        self.assertEqual([url.rsplit('/', 1)[1] for url in self.session.requests], ['getlist', '102', 'ajaxop'])
+
+
+class TestConfirmationCache(TestCase):
+    def setUp(self):
+        self.now = 0
+        self.session = FakeSession()
+        self.executor = ConfirmationExecutor(IDENTITY_SECRET, '76561197960287930', self.session, cache_ttl=10,
+                                             clock=lambda: self.now)
+
+    def getlist_requests(self) -> int:
+        return sum(url.endswith('/getlist') for url in self.session.requests)
+
+    def test_burst_shares_one_list_fetch(self):
+        self.executor.send_trade_allow_request('6842071129')
+        self.executor.send_trade_allow_request('6842071130')
+        self.executor.confirm_trade_offers(['6842071129'])
+        self.assertEqual(self.getlist_requests(), 1)
+        self.assertEqual(self.session.confirmed, ['101', '103'])
+
+    def test_accepted_confirmations_leave_the_index(self):
+        self.executor.confirm_trade_offers(['6842071129'])
+        self.assertNotIn('6842071129', self.executor._confirmation_list.by_creator_id)
+        self.assertEqual([confirmation.data_confid for confirmation in self.executor.get_confirmations()],
+                         ['102', '103', '104'])
+
+    def test_miss_refetches_a_list_older_than_the_request(self):
+        self.executor.get_confirmations()
+        self.now = 1
+        with self.assertRaises(ConfirmationExpected):
+            self.executor.send_trade_allow_request('1')
+        self.assertEqual(self.getlist_requests(), 2)
+
+    def test_list_expires_after_ttl(self):
+        self.executor.get_confirmations()
+        self.now = 10
+        self.executor.get_confirmations()
+        self.assertEqual(self.getlist_requests(), 2)
+
+    def test_failed_confirmation_invalidates_the_list(self):
+        self.session.success = False
+        self.executor.confirm_trade_offers(['6842071129'])
+        self.assertIsNone(self.executor._confirmation_list)
+
+    def test_sell_listing_assets_are_read_once(self):
+        self.executor.confirm_sell_listing('1002')
+        self.executor.confirm_sell_listings(['1001'])
+        self.assertEqual([url.rsplit('/', 1)[1] for url in self.session.requests],
+                         ['getlist', '102', '104', 'ajaxop', 'multiajaxop'])
+
+    def test_unparsable_details_page_is_not_remembered(self):
+        with mock.patch.dict(DETAILS, {'102': {'success': True, 'html': '<html></html>'}}):
+            self.assertEqual(self.executor.confirm_sell_listings(['1001']), {'1001': False})
+        self.assertNotIn('102', self.executor._sell_listing_asset_ids)
+        self.now = 10
+        self.assertEqual(self.executor.confirm_sell_listings(['1001']), {'1001': True})
+
+
+class TestAsyncConfirmationExecutor(TestCase):
+    def setUp(self):
+        self.session = FakeAsyncSession()
+        self.executor = AsyncConfirmationExecutor(IDENTITY_SECRET, '76561197960287930', self.session)
+
+    def test_confirm_trade_offers(self):
+        report = asyncio.run(self.executor.confirm_trade_offers(['6842071129', '1']))
+        self.assertEqual(report, {'6842071129': True, '1': False})
+        self.assertEqual([value for key, value in self.session.posted if key == 'cid[]'], ['101'])
+
+    def test_confirm_sell_listings(self):
+        report = asyncio.run(self.executor.confirm_sell_listings(['1002']))
+        self.assertEqual(report, {'1002': True})
+        self.assertEqual([value for key, value in self.session.posted if key == 'cid[]'], ['104'])
+
+    def test_concurrent_requests_share_one_list_fetch(self):
+        async def confirm_burst():
+            return await asyncio.gather(self.executor.send_trade_allow_request('6842071129'),
+                                        self.executor.send_trade_allow_request('6842071130'))
+
+        self.assertEqual(asyncio.run(confirm_burst()), [{'success': True}, {'success': True}])
+        self.assertEqual(sum(url.endswith('/getlist') for url in self.session.requests), 1)
+
+
+class TestAsyncConfirmationOverHttp(TestCase):
+    """Requests go through a real `AsyncSession` to a local server, so the query strings are built by aiohttp"""
+
+    def test_confirm_trade_offers(self):
+        queries = []
+
+        async def getlist(request):
+            queries.append(dict(request.query))
+            return web.json_response({'success': True, 'conf': CONFIRMATIONS})
+
+        async def multiajaxop(request):
+            queries.append(dict(await request.post()))
+            return web.json_response({'success': True})
+
+        async def ajaxop(request):
+            queries.append(dict(request.query))
+            return web.json_response({'success': True})
+
+        async def confirm():
+            app = web.Application()
+            app.add_routes([web.get('/mobileconf/getlist', getlist), web.post('/mobileconf/multiajaxop', multiajaxop),
+                            web.get('/mobileconf/ajaxop', ajaxop)])
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+            try:
+                async with AsyncSession() as session:
+                    executor = AsyncConfirmationExecutor(IDENTITY_SECRET, '76561197960287930', session)
+                    executor.CONF_URL = f'http://127.0.0.1:{port}/mobileconf'
+                    confirmed = await executor.confirm_trade_offers(['6842071129'])
+                    executor.invalidate()
+                    allowed = await executor.send_trade_allow_request('6842071130')
+                return confirmed, allowed
+            finally:
+                await runner.cleanup()
+
+        confirmed, allowed = asyncio.run(confirm())
+        self.assertEqual(confirmed, {'6842071129': True})
+        self.assertEqual(allowed, {'success': True})
+        for query in queries:
+            self.assertIsInstance(query['k'], str)
+            self.assertNotIn("b'", query['k'])
+        self.assertEqual((queries[-1]['op'], queries[-1]['cid'], queries[-1]['ck']), ('allow', '103', 'n103'))
@@ -0,0 +1,38 @@
+import random
+import unittest
+from decimal import Decimal
+from unittest import TestCase
+
+from steampy import fees
+from steampy.utils import calculate_gross_price, calculate_net_price
+
+PUBLISHER_FEES = (Decimal('0.10'), Decimal('0.05'), Decimal('0'), Decimal('0.15'))
+
+
+def scalar_cents(calculate, prices: list, publisher_fee: Decimal) -> list:
+    return [int(calculate(Decimal(price) / 100, publisher_fee) * 100) for price in prices]
+
+
+@unittest.skipIf(fees.np is None, 'Requires numpy')
+class TestFees(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Every price up to $200 and a sample of larger ones, all must match the scalar functions exactly
+        cls.prices = list(range(0, 20001)) + random.Random(0).sample(range(20001, 10_000_000), 5000)
+
+    def test_gross_prices_match_scalar(self):
+        for publisher_fee in PUBLISHER_FEES:
+            self.assertEqual(fees.calculate_gross_prices(self.prices, publisher_fee).tolist(),
+                             scalar_cents(calculate_gross_price, self.prices, publisher_fee))
+
+    def test_net_prices_match_scalar(self):
+        for publisher_fee in PUBLISHER_FEES:
+            self.assertEqual(fees.calculate_net_prices(self.prices, publisher_fee).tolist(),
+                             scalar_cents(calculate_net_price, self.prices, publisher_fee))
+
+    def test_fee_table(self):
+        table = fees.FeeTable(Decimal('0.10'), max_price=1000)
+        prices = [0, 3, 115, 1000, 1001, 250000]
+        self.assertEqual(table.net_prices(prices).tolist(), scalar_cents(calculate_net_price, prices, Decimal('0.10')))
+        self.assertEqual(table.gross_prices(prices).tolist(),
+                         scalar_cents(calculate_gross_price, prices, Decimal('0.10')))
@@ -1,5 +1,5 @@
 from base64 import b64encode
-from unittest import TestCase
+from unittest import TestCase, mock
 
 from steampy import guard
 from steampy.confirmation import Tag
@@ -35,3 +35,37 @@ class TestGuard(TestCase):
         for key in expected_keys:
             self.assertIn(key, guard_data)
             self.assertIsInstance(guard_data[key], str)
+
+    def test_confirmation_key_default_timestamp_is_current(self):
+        with mock.patch('steampy.guard.time', return_value=1470838334):
+            confirmation_key = guard.generate_confirmation_key(self.identity_secret, Tag.CONF.value)
+        self.assertEqual(confirmation_key, b'pWqjnkcwqni+t/n+5xXaEa0SGeA=')
+
+
+class TestSteamGuardSigner(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.shared_secret = b64encode('1234567890abcdefghij'.encode('utf-8'))
+        cls.identity_secret = b64encode('abcdefghijklmnoprstu'.encode('utf-8'))
+        cls.signer = guard.SteamGuardSigner(cls.identity_secret, '12341234123412345', cls.shared_secret)
+
+    def test_matches_module_functions(self):
+        self.assertEqual(self.signer.confirmation_key(Tag.CONF.value, 1470838334), b'pWqjnkcwqni+t/n+5xXaEa0SGeA=')
+        self.assertEqual(self.signer.one_time_code(1469184207), 'P2QJN')
+        self.assertEqual(self.signer.device_id, 'android:677cf5aa-3300-7807-d1e2-c408142742e2')
+
+    def test_confirmation_keys(self):
+        requests = [(tag, 1470838334 + i) for i, tag in enumerate(('conf', 'allow', 'details123', 'cancel'))]
+        self.assertEqual(self.signer.confirmation_keys(requests),
+                         [guard.generate_confirmation_key(self.identity_secret, tag, timestamp)
+                          for tag, timestamp in requests])
+
+    def test_confirmation_params(self):
+        params = self.signer.confirmation_params('allow', 1470838334)
+        self.assertEqual(params['k'], guard.generate_confirmation_key(self.identity_secret, 'allow', 1470838334))
+        self.assertEqual((params['p'], params['a'], params['t'], params['m'], params['tag']),
+                         (self.signer.device_id, '12341234123412345', 1470838334, 'android', 'allow'))
+
+    def test_one_time_code_needs_shared_secret(self):
+        with self.assertRaises(ValueError):
+            guard.SteamGuardSigner(self.identity_secret, '12341234123412345').one_time_code()
@@ -0,0 +1,77 @@
+import os
+import json
+from unittest import TestCase
+
+from steampy import html_backend
+from steampy.confirmation import ConfirmationExecutor
+from steampy.market import get_trade_history_from_response
+from steampy.utils import get_market_listings_from_html, get_market_sell_listings_from_api
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+class TestHtmlBackends(TestCase):
+    def setUp(self):
+        self.backends = [html_backend.BACKENDS[name]() for name in html_backend.get_available_backends()]
+
+    def tearDown(self):
+        html_backend._backend = None
+
+    def test_market_listings(self):
+        html = read_fixture('market_page.html')
+        for backend in self.backends:
+            with self.subTest(backend=backend.name):
+                listings = get_market_listings_from_html(html, backend)
+                self.assertEqual(listings['sell_listings']['4213506120918422208'], {
+                    'listing_id': '4213506120918422208', 'buyer_pay': '$1,204.58', 'you_receive': '$1,047.47',
+                    'created_on': '12 Oct', 'need_confirmation': False,
+                })
+                self.assertTrue(listings['sell_listings']['4213506120918430031']['need_confirmation'])
+                self.assertEqual(listings['buy_orders']['6719203999'], {
+                    'order_id': '6719203999', 'quantity': 1, 'price': '$2.05',
+                    'item_name': 'Inscribed & Crimson Witness', 'game_name': 'Dota 2',
+                })
+
+    def test_sell_listings_fragment(self):
+        html = read_fixture('market_page.html')
+        start = html.index('<div class="market_listing_row')
+        fragment = html[start:html.index('<div class="my_listing_section', start)]
+        expected = get_market_sell_listings_from_api(fragment, html_backend.BeautifulSoupBackend())
+        self.assertEqual(len(expected['sell_listings']), 2)
+        for backend in self.backends:
+            with self.subTest(backend=backend.name):
+                self.assertEqual(get_market_sell_listings_from_api(fragment, backend), expected)
+
+    def test_trade_history(self):
+        page = json.loads(read_fixture('trade_history_page.json'))
+        for backend in self.backends:
+            with self.subTest(backend=backend.name):
+                history = get_trade_history_from_response(json.loads(json.dumps(page)), backend)
+                self.assertEqual([(item['action'], item['price'], item['date_string']) for item in history.values()],
+                                 [('sell', 12.65, '14 Oct'), ('buy', 0.41, '13 Oct')])
+
+    def test_confirmation_details(self):
+        for name in html_backend.get_available_backends():
+            with self.subTest(backend=name):
+                html_backend.set_html_backend(name)
+                self.assertEqual(ConfirmationExecutor._get_confirmation_trade_offer_id(
+                    read_fixture('confirmation_trade_offer.html')), '6842071129')
+                self.assertEqual(ConfirmationExecutor._get_confirmation_sell_listing_id(
+                    read_fixture('confirmation_sell_listing.html')), '30546587652')
+
+    def test_unavailable_backend(self):
+        with self.assertRaises(ValueError):
+            html_backend.set_html_backend('html5lib')
+
+    def test_incomplete_backend_cannot_be_created(self):
+        class ParseOnlyBackend(html_backend.HtmlBackend):
+            def parse(self, html: str):
+                return html
+
+        with self.assertRaises(TypeError):
+            ParseOnlyBackend()
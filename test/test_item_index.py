@@ -0,0 +1,81 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from steampy.item_index import ItemNameIdIndex
+from steampy.exceptions import ApiException
+from steampy.market import SteamMarket, get_listing_url, parse_listing_url
+from steampy.models import GameOptions
+
+
+class FakeResponse:
+    status_code = 200
+    text = '<script>Market_LoadOrderSpread( 176096390 );</script>'
+
+    @staticmethod
+    def json():
+        return {'success': 1}
+
+
+class FakeSession:
+    def __init__(self):
+        self.urls = []
+
+    def safe_get(self, url, **kwargs):
+        self.urls.append(url)
+        return FakeResponse()
+
+
+class TestItemNameIdIndex(TestCase):
+    def test_index_persists_on_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'item_nameids.sqlite3')
+            index = ItemNameIdIndex(path)
+            index.update([('730', 'AK-47 | Redline (Field-Tested)', 176096390), (730, 'AWP | Asiimov (Field-Tested)', 1)])
+            index.close()
+
+            index = ItemNameIdIndex(path)
+            self.assertEqual(len(index), 2)
+            self.assertEqual(index.get(730, 'AK-47 | Redline (Field-Tested)'), 176096390)
+            self.assertIn(('730', 'AWP | Asiimov (Field-Tested)'), index)
+            self.assertIsNone(index.get('570', 'AK-47 | Redline (Field-Tested)'))
+            index.close()
+
+    def test_market_scrapes_item_nameid_once(self):
+        session = FakeSession()
+        market = SteamMarket(session, None)
+        market.was_login_executed = True
+
+        for _ in range(2):
+            self.assertEqual(market.get_item_nameid('AK-47 | Redline (Field-Tested)', GameOptions.CS), 176096390)
+        self.assertEqual(len(session.urls), 1)
+        self.assertEqual(list(market.item_nameid_index.items()), [('730', 'AK-47 | Redline (Field-Tested)', 176096390)])
+
+    def test_quoted_and_plain_names_share_an_entry(self):
+        session = FakeSession()
+        market = SteamMarket(session, None)
+        market.was_login_executed = True
+
+        market.fetch_price_history('AK-47%20%7C%20Redline%20%28Field-Tested%29', GameOptions.CS)
+        self.assertEqual(market.get_item_nameid('AK-47 | Redline (Field-Tested)', GameOptions.CS), 176096390)
+        self.assertEqual(market.item_nameid_index.get(730, 'AK-47%20%7C%20Redline%20%28Field-Tested%29'), 176096390)
+        self.assertEqual(len(session.urls), 1)
+        self.assertEqual(len(market.item_nameid_index), 1)
+
+    def test_histogram_resolves_item_nameid_through_the_index(self):
+        session = FakeSession()
+        market = SteamMarket(session, None)
+        market.was_login_executed = True
+        url = get_listing_url('AK-47 | Redline (Field-Tested)', GameOptions.CS)
+
+        for _ in range(2):
+            self.assertEqual(market.fetch_item_orders_histogram(None, url), {'success': 1})
+        self.assertEqual([url.rsplit('/', 1)[-1] for url in session.urls],
+                         ['AK-47 | Redline (Field-Tested)', 'itemordershistogram', 'itemordershistogram'])
+        self.assertEqual(market.item_nameid_index.get(730, 'AK-47 | Redline (Field-Tested)'), 176096390)
+
+    def test_parse_listing_url(self):
+        game, name = parse_listing_url(get_listing_url('AK-47 | Redline (Field-Tested)', GameOptions.CS))
+        self.assertEqual((game.app_id, name), ('730', 'AK-47 | Redline (Field-Tested)'))
+        with self.assertRaises(ApiException):
+            parse_listing_url('https://steamcommunity.com/market/')
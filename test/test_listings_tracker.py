@@ -0,0 +1,118 @@
+from unittest import TestCase
+
+from steampy.listings_tracker import MarketListingsTracker
+from steampy.models import ListingEventType
+
+
+def listing(listing_id: str, need_confirmation: bool = False) -> dict:
+    return {'listing_id': listing_id, 'buyer_pay': '$1.15', 'you_receive': '$1.00', 'created_on': '1 Jan',
+            'need_confirmation': need_confirmation}
+
+
+class FakeMarket:
+    """Serves active listings newest first, like /market/mylistings/render"""
+
+    def __init__(self, active_ids: list, pending_ids: list = ()) -> None:
+        self.active_ids = list(active_ids)
+        self.pending_ids = list(pending_ids)
+        self.fetched_listings = 0
+
+    def get_my_market_listings(self) -> dict:
+        self.fetched_listings += len(self.active_ids) + len(self.pending_ids)
+        sell_listings = {listing_id: listing(listing_id) for listing_id in self.active_ids}
+        sell_listings.update({listing_id: listing(listing_id, True) for listing_id in self.pending_ids})
+        return {'buy_orders': {}, 'sell_listings': sell_listings}
+
+    def get_my_market_listings_page(self, start: int, count: int) -> dict:
+        page_ids = self.active_ids[start:start + count]
+        self.fetched_listings += len(page_ids)
+        return {'sell_listings': {listing_id: listing(listing_id) for listing_id in page_ids},
+                'total_count': len(self.active_ids)}
+
+
+def event_ids(events: list, event_type: ListingEventType) -> list:
+    return [event.listing_id for event in events if event.type == event_type]
+
+
+class TestMarketListingsTracker(TestCase):
+    def setUp(self):
+        self.market = FakeMarket([str(i) for i in range(1000, 0, -1)])
+        self.tracker = MarketListingsTracker(self.market, page_size=100)
+        events = self.tracker.poll()
+        self.assertEqual(len(event_ids(events, ListingEventType.ADDED)), 1000)
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.market.fetched_listings = 0
+        self.tracker.requests = 0
+
+    def add_pending_listing(self, listing_id: str):
+        self.market.pending_ids = [listing_id]
+        events = self.tracker.full_sync()
+        self.assertEqual(event_ids(events, ListingEventType.NEEDS_CONFIRMATION), [listing_id])
+        self.market.pending_ids = []
+        self.reset_counters()
+
+    def assert_in_sync(self):
+        active = [listing_id for listing_id, value in self.tracker.sell_listings.items() if not value['need_confirmation']]
+        self.assertEqual(active, self.market.active_ids)
+
+    def test_unchanged_poll_reads_one_page(self):
+        self.assertEqual(self.tracker.poll(), [])
+        self.assertEqual(self.tracker.requests, 1)
+        self.assert_in_sync()
+
+    def test_new_and_confirmed_listings_are_added(self):
+        self.add_pending_listing('p1')
+        self.market.active_ids[:0] = ['1002', 'p1', '1001']
+        events = self.tracker.poll()
+        self.assertEqual(event_ids(events, ListingEventType.ADDED), ['1002', 'p1', '1001'])
+        self.assertEqual(self.tracker.requests, 1)
+        self.assert_in_sync()
+
+    def test_removed_listing_only_refetches_pages_below_it(self):
+        self.market.active_ids.remove('150')
+        self.market.active_ids[:0] = ['1001']
+        events = self.tracker.poll()
+        self.assertEqual(event_ids(events, ListingEventType.ADDED), ['1001'])
+        self.assertEqual(event_ids(events, ListingEventType.REMOVED), ['150'])
+        self.assertLess(self.market.fetched_listings, 400)
+        self.assert_in_sync()
+
+    def test_listings_added_below_the_top_trigger_full_sync(self):
+        self.market.active_ids.insert(500, '2000')
+        events = self.tracker.poll()
+        self.assertEqual(event_ids(events, ListingEventType.ADDED), ['2000'])
+        self.assert_in_sync()
+
+    def test_all_known_listings_replaced(self):
+        market = FakeMarket(['A'])
+        tracker = MarketListingsTracker(market, page_size=100)
+        tracker.poll()
+        market.active_ids = ['C', 'B']
+        events = tracker.poll()
+        self.assertEqual(event_ids(events, ListingEventType.ADDED), ['C', 'B'])
+        self.assertEqual(event_ids(events, ListingEventType.REMOVED), ['A'])
+        self.assertEqual(list(tracker.sell_listings), ['C', 'B'])
+
+    def test_all_known_listings_replaced_over_several_pages(self):
+        self.market.active_ids = [f'n{i}' for i in range(150)]
+        events = self.tracker.poll()
+        self.assertEqual(len(event_ids(events, ListingEventType.ADDED)), 150)
+        self.assertEqual(len(event_ids(events, ListingEventType.REMOVED)), 1000)
+        self.assert_in_sync()
+
+    def test_listing_confirmed_below_the_top_and_a_removal(self):
+        self.add_pending_listing('p1')
+        self.market.active_ids.remove('150')
+        self.market.active_ids.insert(500, 'p1')
+        events = self.tracker.poll()
+        self.assertEqual(event_ids(events, ListingEventType.ADDED), ['p1'])
+        self.assertEqual(event_ids(events, ListingEventType.REMOVED), ['150'])
+        self.assert_in_sync()
+
+    def test_pending_listing_still_awaiting_confirmation(self):
+        self.add_pending_listing('p1')
+        self.market.pending_ids = ['p1']
+        self.assertEqual(self.tracker.poll(), [])
+        self.assertIn('p1', self.tracker.sell_listings)
@@ -1,11 +1,14 @@
 import os
+import asyncio
 from unittest import TestCase
 import unittest
 
 from steampy.client import SteamClient
-from steampy.exceptions import TooManyRequests
+from steampy.exceptions import ApiException, ConfirmationExpected, LoginRequired, TooManyRequests
+from steampy.async_market import AsyncSteamMarket
+from steampy.market import SteamMarket, fetch_listing_pages, get_listing_page_urls, get_listing_url
 from steampy.models import GameOptions, Currency
-from steampy.utils import load_credentials
+from steampy.utils import load_credentials, AsyncSession, SafeSession, ProxyCarousel
 
 @unittest.skip('Requires secrets/Steamguard.txt')
 class TestMarket(TestCase):
@@ -83,3 +86,194 @@ class TestMarket(TestCase):
         self.assertIsNotNone(buy_order_id)
         response = client.market.cancel_buy_order(buy_order_id)
         self.assertTrue(response['success'])
+
+
+class FakeAsyncSession:
+    def __init__(self, delays: dict, failing_url: str = None) -> None:
+        self.delays = delays
+        self.failing_url = failing_url
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def async_get(self, url, use_proxy=True, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delays.get(url, 0))
+        self.in_flight -= 1
+        return {'status_code': 500, 'error': ''} if url == self.failing_url else {'url': url}
+
+    @staticmethod
+    def get_failure_status(response) -> int:
+        return response.get('status_code', 0)
+
+
+class TestFetchListingPages(TestCase):
+    def test_pages_are_fetched_concurrently_in_order(self):
+        urls = get_listing_page_urls(100, 1050)
+        self.assertEqual(len(urls), 10)
+        session = FakeAsyncSession({urls[0]: 0.03, urls[1]: 0.02})
+        pages = asyncio.run(fetch_listing_pages(session, urls, max_concurrency=4))
+        self.assertEqual([page['url'] for page in pages], urls)
+        self.assertEqual(session.max_in_flight, 4)
+
+    def test_failed_page_raises(self):
+        urls = get_listing_page_urls(100, 400)
+        with self.assertRaises(ApiException):
+            asyncio.run(fetch_listing_pages(FakeAsyncSession({}, failing_url=urls[1]), urls, max_concurrency=2))
+
+
+class FakeSellListingExecutor:
+    def __init__(self, confirmed: dict) -> None:
+        self.confirmed = confirmed
+        self.batches = []
+
+    def confirm_sell_listings(self, asset_ids):
+        self.batches.append(list(asset_ids))
+        return {asset_id: self.confirmed.get(asset_id, False) for asset_id in asset_ids}
+
+
+class TestCreateSellOrders(TestCase):
+    def setUp(self):
+        self.session = AsyncSession()
+        self.listed = []
+        self.retries = set()
+        self.in_flight = self.max_in_flight = 0
+
+        async def async_post(url, use_proxy=True, data=None, headers=None, **kwargs):
+            self.retries.add(kwargs.get('retries'))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            self.listed.append((data['assetid'], data['price'], data['sessionid'], headers['Referer']))
+            if data['assetid'] == '3':
+                return {'status_code': 502, 'error': 'Request failed after retries',
+                        'message': 'You already have a listing for this item pending confirmation.'}
+            if data['assetid'] == '4':
+                return {'success': True, 'requires_confirmation': 0}
+            return {'success': True, 'requires_confirmation': 1, 'needs_mobile_confirmation': True}
+
+        self.session.async_post = async_post
+        self.orders = [('1', '100'), ('2', '200'), (3, '300'), ('4', '400')]
+        self.executor = FakeSellListingExecutor({'1': True})
+
+    def _log_in(self, market) -> None:
+        market._set_login_executed({'steamid': '7656', 'identity_secret': ''}, 'abc')
+        market._confirmation_executor = self.executor
+
+    def _check_results(self, results: dict) -> None:
+        self.assertEqual(list(results), ['1', '2', '3', '4'])
+        self.assertEqual(results['1'], {'success': True, 'requires_confirmation': 1, 'needs_mobile_confirmation': True,
+                                        'confirmed': True})
+        self.assertFalse(results['2']['confirmed'])
+        self.assertEqual(results['3'], {'success': False, 'error': 'Listing failed, HTTP status 502',
+                                        'message': 'You already have a listing for this item pending confirmation.'})
+        self.assertNotIn('confirmed', results['4'])
+        # All confirmations are done in one pass after every item was listed
+        self.assertEqual(self.executor.batches, [['1', '2']])
+        self.assertEqual(sorted(self.listed)[0], ('1', '100', 'abc', 'https://steamcommunity.com/profiles/7656/inventory'))
+        self.assertEqual(self.max_in_flight, 2)
+        # A listing request that timed out may have listed the item, it is never repeated
+        self.assertEqual(self.retries, {1})
+
+    def test_async_market(self):
+        market = AsyncSteamMarket(self.session)
+        self._log_in(market)
+
+        async def confirm_sell_listings(asset_ids):
+            return FakeSellListingExecutor.confirm_sell_listings(self.executor, asset_ids)
+
+        self.executor.confirm_sell_listings = confirm_sell_listings
+        self._check_results(asyncio.run(market.create_sell_orders(self.orders, GameOptions.CS, max_concurrency=2)))
+
+    def test_failed_confirmation_keeps_the_report(self):
+        market = SteamMarket(SafeSession(ProxyCarousel(None)), self.session)
+        self._log_in(market)
+
+        def confirm_sell_listings(asset_ids):
+            raise ConfirmationExpected
+
+        self.executor.confirm_sell_listings = confirm_sell_listings
+        results = market.create_sell_orders(self.orders, GameOptions.CS, max_concurrency=2)
+        self.assertEqual(results['1']['error'], 'Confirmation failed: ConfirmationExpected()')
+        self.assertEqual((results['1']['confirmed'], results['2']['confirmed']), (False, False))
+        self.assertEqual(results['4'], {'success': True, 'requires_confirmation': 0})
+
+    def test_sync_market(self):
+        market = SteamMarket(SafeSession(ProxyCarousel(None)), self.session)
+        self._log_in(market)
+        self._check_results(market.create_sell_orders(self.orders, GameOptions.CS, max_concurrency=2))
+
+
+class TestAsyncSteamMarket(TestCase):
+    listing_page = """<script>
+    var line1=[["Jul 02 2014 01: +0",0.5,"12"],["Dec 31 2023 23: +0",1.25,"3"]];
+    Market_LoadOrderSpread( 176096390 );</script>"""
+
+    def setUp(self):
+        self.session = AsyncSession()
+        self.requests = []
+        self.responses = {}
+
+        async def request(url, use_proxy=True, **kwargs):
+            path = url.split('steamcommunity.com')[-1]
+            self.requests.append(path)
+            return next(response for prefix, response in self.responses.items() if path.startswith(prefix))
+
+        self.session.async_get = self.session.async_post = request
+        self.market = AsyncSteamMarket(self.session)
+        self.market._set_login_executed({'steamid': '7656', 'identity_secret': ''}, 'abc')
+
+    def test_fetch_price_rate_limited(self):
+        self.responses['/market/priceoverview/'] = {'status_code': 429, 'error': 'Request failed after retries'}
+        with self.assertRaises(TooManyRequests):
+            asyncio.run(self.market.fetch_price('AK-47 | Redline (Field-Tested)', GameOptions.CS))
+
+    def test_item_nameid_is_scraped_once(self):
+        self.responses['/market/listings/730/'] = self.listing_page
+        prices, _ = asyncio.run(self.market.fetch_price_history('AK-47 | Redline (Field-Tested)', GameOptions.CS))
+        self.assertEqual(prices, [['Jul 02 2014 01: +0', 0.5, '12'], ['Dec 31 2023 23: +0', 1.25, '3']])
+        for _ in range(2):
+            self.assertEqual(asyncio.run(self.market.get_item_nameid('AK-47 | Redline (Field-Tested)',
+                                                                     GameOptions.CS)), 176096390)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_histogram_resolves_item_nameid_from_the_listing_url(self):
+        self.responses['/market/listings/730/'] = self.listing_page
+        self.responses['/market/itemordershistogram'] = {'success': 1}
+        url = get_listing_url('AK-47 | Redline (Field-Tested)', GameOptions.CS)
+        for _ in range(2):
+            self.assertEqual(asyncio.run(self.market.fetch_item_orders_histogram(None, url)), {'success': 1})
+        self.assertEqual(self.requests, ['/market/listings/730/AK-47 | Redline (Field-Tested)',
+                                         '/market/itemordershistogram', '/market/itemordershistogram'])
+
+    def test_missing_item_nameid_raises(self):
+        self.responses['/market/listings/730/'] = {'status_code': 404, 'error': 'Request failed after retries'}
+        with self.assertRaises(ApiException):
+            asyncio.run(self.market.get_item_nameid('Unknown', GameOptions.CS))
+
+    def test_create_sell_order_is_confirmed(self):
+        self.responses['/market/sellitem/'] = {'success': True, 'needs_mobile_confirmation': True}
+        confirmed = []
+
+        class Executor:
+            async def confirm_sell_listing(self, asset_id):
+                confirmed.append(asset_id)
+                return {'success': True}
+
+        self.market._confirmation_executor = Executor()
+        response = asyncio.run(self.market.create_sell_order('10', GameOptions.CS, '100'))
+        self.assertEqual((response, confirmed), ({'success': True}, ['10']))
+
+    def test_buy_item_failures_raise(self):
+        for response in ({'wallet_info': {'success': 2}}, {'message': 'Listing sold'},
+                         {'status_code': 502, 'error': 'Request failed after retries'}):
+            with self.subTest(response=response):
+                self.responses['/market/buylisting/'] = response
+                with self.assertRaises(ApiException):
+                    asyncio.run(self.market.buy_item('AK-47 | Redline (Field-Tested)', '1', 110, 10, GameOptions.CS))
+
+    def test_logged_out_market_refuses_requests(self):
+        with self.assertRaises(LoginRequired):
+            AsyncSteamMarket(self.session).cancel_sell_order('1')
+        self.assertEqual(self.requests, [])
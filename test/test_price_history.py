@@ -0,0 +1,45 @@
+from unittest import TestCase
+
+from steampy.market import get_price_history_from_html
+from steampy.price_history import PriceHistory, parse_line1, parse_listing_page
+
+LISTING_PAGE = '''<html><script>
+    var line1=[["Jul 02 2014 01: +0",0.5,"12"],["Dec 31 2023 23: +0",1.25,"3"]];
+    var g_timePriceHistoryEarliest = new Date();
+</script>
+<div class="descriptor">( Not Usable in Crafting )</div>
+<script>Market_LoadOrderSpread( 176096390 );</script></html>'''
+
+
+class TestPriceHistory(TestCase):
+    def test_parse_line1_into_columns(self):
+        history = parse_line1('[["Jul 02 2014 01: +0",0.5,"12"],["Dec 31 2023 23: +0",1.25,"3"]]')
+        self.assertEqual(list(history.timestamps), [1404262800, 1704063600])
+        self.assertEqual(list(history.prices), [0.5, 1.25])
+        self.assertEqual(list(history.volumes), [12, 3])
+
+    def test_rows_match_line1(self):
+        history = parse_line1('[["Jul 02 2014 01: +0",0.5,"12"],["Dec 31 2023 23: +0",1.25,"3"]]')
+        self.assertEqual(list(history), [['Jul 02 2014 01: +0', 0.5, '12'], ['Dec 31 2023 23: +0', 1.25, '3']])
+        self.assertEqual(list(history[1:]), [['Dec 31 2023 23: +0', 1.25, '3']])
+
+    def test_parse_listing_page(self):
+        prices, not_usable_in_crafting, item_nameid = parse_listing_page(LISTING_PAGE)
+        self.assertEqual(len(prices), 2)
+        self.assertTrue(not_usable_in_crafting)
+        self.assertEqual(item_nameid, 176096390)
+
+    def test_page_without_history(self):
+        self.assertEqual(parse_listing_page('<html></html>'), ([], False, 0))
+        prices, not_usable_in_crafting = get_price_history_from_html('<html></html>')
+        self.assertFalse(prices)
+        self.assertFalse(not_usable_in_crafting)
+
+    def test_rows_by_default_columns_on_request(self):
+        prices, not_usable_in_crafting, item_nameid = get_price_history_from_html(LISTING_PAGE, get_id=True)
+        self.assertIs(type(prices), list)
+        self.assertEqual(prices, [['Jul 02 2014 01: +0', 0.5, '12'], ['Dec 31 2023 23: +0', 1.25, '3']])
+        self.assertEqual(item_nameid, 176096390)
+        prices, _ = get_price_history_from_html(LISTING_PAGE, columns=True)
+        self.assertIsInstance(prices, PriceHistory)
+        self.assertEqual(list(prices.volumes), [12, 3])
@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+from steampy.async_client import AsyncSteamClient
+from steampy.client import SteamClient
+from steampy.ratelimit import EndpointFamily, RateLimit, RateLimiter, TokenBucket, get_endpoint_family
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimit(TestCase):
+    def test_get_endpoint_family(self):
+        self.assertEqual(get_endpoint_family('https://steamcommunity.com/market/priceoverview/'),
+                         EndpointFamily.PRICE_OVERVIEW)
+        self.assertEqual(get_endpoint_family('https://steamcommunity.com/market/listings/730/AK-47'),
+                         EndpointFamily.MARKET_LISTINGS)
+        self.assertEqual(get_endpoint_family('https://steamcommunity.com/market/itemordershistogram'),
+                         EndpointFamily.ITEM_ORDERS_HISTOGRAM)
+        self.assertEqual(get_endpoint_family('https://steamcommunity.com/inventory/7656/730/2'),
+                         EndpointFamily.INVENTORY)
+        self.assertEqual(get_endpoint_family('https://api.steampowered.com/IEconService/GetTradeOffers/v1'),
+                         EndpointFamily.ECON_SERVICE)
+        self.assertEqual(get_endpoint_family('https://steamcommunity.com/tradeoffer/new/send'),
+                         EndpointFamily.TRADE_OFFER_SEND)
+        self.assertIsNone(get_endpoint_family('https://steamcommunity.com/market'))
+
+    def test_token_bucket_never_exceeds_limit_in_window(self):
+        clock = FakeClock()
+        bucket = TokenBucket(RateLimit(20, 60, 2), clock)
+        send_times = []
+        for _ in range(100):
+            delay = bucket.reserve()
+            send_times.append(clock.now + delay)
+        for i, start in enumerate(send_times):
+            in_window = [t for t in send_times[i:] if t < start + 60]
+            self.assertLessEqual(len(in_window), 20)
+        self.assertAlmostEqual(send_times[19], 60.0)
+
+    def test_token_bucket_drain(self):
+        clock = FakeClock()
+        bucket = TokenBucket(RateLimit(20, 60, 2), clock)
+        bucket.drain()
+        self.assertGreaterEqual(bucket.reserve(), 60)
+
+    def test_rate_limiter_keys_by_proxy(self):
+        clock = FakeClock()
+        limiter = RateLimiter({EndpointFamily.PRICE_OVERVIEW: RateLimit(2, 60, 1)}, clock)
+        url = 'https://steamcommunity.com/market/priceoverview/'
+        self.assertEqual(limiter.reserve(url), 0)
+        self.assertGreater(limiter.reserve(url), 0)
+        self.assertEqual(limiter.reserve(url, 'http://proxy:1'), 0)
+        self.assertEqual(limiter.reserve('https://steamcommunity.com/market'), 0)
+
+    def test_clients_limit_requests_only_when_given_a_limiter(self):
+        client = SteamClient('key', ua_header={})
+        self.assertIsNone(client._session.rate_limiter)
+        self.assertIsNone(client._async_session.rate_limiter)
+        limiter = RateLimiter()
+        for client in (SteamClient('key', ua_header={}, rate_limiter=limiter),
+                       AsyncSteamClient('key', rate_limiter=limiter)):
+            self.assertIs(client._session.rate_limiter, limiter)
+            self.assertIs(client._async_session.rate_limiter, limiter)
@@ -0,0 +1,166 @@
+import asyncio
+from unittest import TestCase
+
+from steampy.models import TradeOfferEventType, TradeOfferState
+from steampy.trade_offer_watcher import AsyncTradeOfferWatcher, TradeOfferWatcher
+
+
+def make_offer(trade_offer_id: str, state: TradeOfferState, time_updated: int, is_our_offer: bool = False) -> dict:
+    return {'tradeofferid': trade_offer_id, 'trade_offer_state': state, 'time_updated': time_updated,
+            'is_our_offer': is_our_offer}
+
+
+class FakeClient:
+    """Answers GetTradeOffers like Steam: active offers plus offers updated since the cutoff"""
+
+    def __init__(self) -> None:
+        self.offers = {}
+        self.cutoffs = []
+
+    def set(self, *offers: dict) -> None:
+        self.offers.update((offer['tradeofferid'], offer) for offer in offers)
+
+    def get_trade_offers(self, merge=True, use_description_cache=False, historical_cutoff=None) -> dict:
+        self.cutoffs.append(historical_cutoff)
+        offers = [offer for offer in self.offers.values()
+                  if offer['trade_offer_state'] == TradeOfferState.Active or offer['time_updated'] >= historical_cutoff]
+        return {'response': {'trade_offers_received': [offer for offer in offers if not offer['is_our_offer']],
+                             'trade_offers_sent': [offer for offer in offers if offer['is_our_offer']]}}
+
+    def get_trade_offers_summary(self, time_last_visit=None) -> dict:
+        summary = {}
+        for offer in self.offers.values():
+            side = 'sent' if offer['is_our_offer'] else 'received'
+            active = offer['trade_offer_state'] == TradeOfferState.Active
+            counters = [f'pending_{side}_count'] if active else []
+            if offer['time_updated'] > time_last_visit:
+                counters.append(f'new_{side}_count' if active else f'updated_{side}_count')
+            for counter in counters:
+                summary[counter] = summary.get(counter, 0) + 1
+        return {'response': summary}
+
+
+class AsyncFakeClient(FakeClient):
+    async def get_trade_offers(self, **kwargs) -> dict:
+        return super().get_trade_offers(**kwargs)
+
+    async def get_trade_offers_summary(self, **kwargs) -> dict:
+        return super().get_trade_offers_summary(**kwargs)
+
+
+class TestTradeOfferWatcher(TestCase):
+    def setUp(self):
+        self.client = FakeClient()
+        self.client.set(make_offer('1', TradeOfferState.Accepted, 900), make_offer('2', TradeOfferState.Active, 950))
+        self.accepted = []
+        self.watcher = TradeOfferWatcher(self.client, on_accepted=self.accepted.append, clock=lambda: 1000)
+
+    def event_types(self, events: list) -> list:
+        return [(event.type, event.trade_offer_id) for event in events]
+
+    def test_first_poll_reports_active_offers_only(self):
+        self.assertEqual(self.event_types(self.watcher.poll()), [(TradeOfferEventType.NEW, '2')])
+        self.assertEqual(self.client.cutoffs, [700])
+        self.assertEqual(self.watcher.last_seen, 950)
+
+    def test_unchanged_offers_are_not_reported_again(self):
+        self.watcher.poll()
+        self.assertEqual(self.watcher.poll(), [])
+
+    def test_changes_since_last_seen(self):
+        self.watcher.poll()
+        self.client.set(make_offer('2', TradeOfferState.Accepted, 1010), make_offer('3', TradeOfferState.Active, 1005),
+                        make_offer('4', TradeOfferState.Active, 1010, is_our_offer=True))
+        self.assertEqual(self.event_types(self.watcher.poll()), [
+            (TradeOfferEventType.ACCEPTED, '2'), (TradeOfferEventType.NEW, '3'), (TradeOfferEventType.NEW, '4'),
+        ])
+        self.assertEqual([offer['tradeofferid'] for offer in self.accepted], ['2'])
+        self.assertEqual(self.watcher.last_seen, 1010)
+        self.assertEqual(sorted(self.watcher.offers), ['3', '4'])
+
+        # The accepted offer is still returned for the cutoff of 1010 but reported only once
+        self.client.set(make_offer('3', TradeOfferState.Declined, 1020))
+        self.assertEqual(self.event_types(self.watcher.poll()), [(TradeOfferEventType.CHANGED, '3')])
+        self.assertEqual(self.client.cutoffs, [700, 950, 1010])
+        self.assertEqual(self.watcher.poll(), [])
+
+    def test_escrow_then_accepted(self):
+        self.watcher.poll()
+        self.client.set(make_offer('2', TradeOfferState.StateInEscrow, 1010))
+        self.assertEqual(self.event_types(self.watcher.poll()), [(TradeOfferEventType.CHANGED, '2')])
+        self.client.set(make_offer('2', TradeOfferState.Accepted, 1020))
+        self.assertEqual(self.event_types(self.watcher.poll()), [(TradeOfferEventType.ACCEPTED, '2')])
+
+    def test_local_clock_ahead_of_steam(self):
+        watcher = TradeOfferWatcher(self.client, clock=lambda: 1100)
+        self.assertEqual(self.event_types(watcher.poll()), [(TradeOfferEventType.NEW, '2')])
+        # Created and accepted between polls, before the local time of the first poll
+        self.client.set(make_offer('3', TradeOfferState.Accepted, 1010))
+        self.assertEqual(self.event_types(watcher.poll()), [(TradeOfferEventType.ACCEPTED, '3')])
+        self.assertEqual(self.client.cutoffs, [800, 950])
+
+
+class TestSummaryGatedPolling(TestCase):
+    def setUp(self):
+        self.now = 1000
+        self.client = FakeClient()
+        self.client.set(make_offer('2', TradeOfferState.Active, 950))
+        self.watcher = TradeOfferWatcher(self.client, poll_interval=5, use_summary=True, max_poll_interval=40,
+                                         full_poll_interval=600, clock_skew=0, clock=lambda: self.now)
+
+    def test_offers_are_requested_only_when_counters_change(self):
+        self.assertEqual(len(self.watcher.poll()), 1)
+        for _ in range(5):
+            self.assertEqual(self.watcher.poll(), [])
+        self.assertEqual((self.watcher.summary_requests, self.watcher.offer_requests), (6, 1))
+
+        self.client.set(make_offer('2', TradeOfferState.Declined, 1010))
+        self.assertEqual([event.type for event in self.watcher.poll()], [TradeOfferEventType.CHANGED])
+        self.assertEqual(self.watcher.offer_requests, 2)
+
+    def test_full_poll_interval_forces_a_request(self):
+        self.watcher.poll()
+        self.now += 600
+        self.watcher.poll()
+        self.assertEqual(self.watcher.offer_requests, 2)
+
+    def test_interval_backs_off_when_idle(self):
+        intervals = []
+        for _ in range(6):
+            self.watcher.poll()
+            intervals.append(self.watcher.interval)
+        self.assertEqual(intervals, [5, 10, 20, 40, 40, 40])
+        self.client.set(make_offer('3', TradeOfferState.Active, 1020))
+        self.watcher.poll()
+        self.assertEqual(self.watcher.interval, 5)
+
+
+class TestAsyncTradeOfferWatcher(TestCase):
+    def test_sync_and_coroutine_callbacks(self):
+        client = AsyncFakeClient()
+        client.set(make_offer('2', TradeOfferState.Active, 950))
+        new, changed = [], []
+
+        async def on_changed(offer: dict) -> None:
+            changed.append(offer['tradeofferid'])
+
+        watcher = AsyncTradeOfferWatcher(client, on_new=new.append, on_changed=on_changed, use_summary=True,
+                                         clock=lambda: 1000)
+        asyncio.run(watcher.poll())
+        client.set(make_offer('2', TradeOfferState.Canceled, 1001))
+        asyncio.run(watcher.poll())
+        self.assertEqual(([offer['tradeofferid'] for offer in new], changed), (['2'], ['2']))
+
+    def test_run_until_stopped(self):
+        client = AsyncFakeClient()
+
+        async def run_briefly():
+            stop = asyncio.Event()
+            watcher = AsyncTradeOfferWatcher(client, poll_interval=0.01, clock=lambda: 1000)
+            task = asyncio.create_task(watcher.run(stop))
+            await asyncio.sleep(0.035)
+            stop.set()
+            await task
+
+        asyncio.run(run_briefly())
+        self.assertGreaterEqual(len(client.cutoffs), 2)
@@ -1,7 +1,15 @@
+import json
+import asyncio
 from decimal import Decimal
+from types import MappingProxyType
 from unittest import TestCase
 
+import aiohttp
+import requests
+from aiohttp import web
+
 from steampy import utils
+from steampy.models import GameOptions
 
 
 class TestUtils(TestCase):
@@ -52,3 +60,328 @@ class TestUtils(TestCase):
         self.assertEqual(utils.calculate_net_price(Decimal('0.03'), publisher_fee, steam_fee), Decimal('0.01'))
         self.assertEqual(utils.calculate_net_price(Decimal('0.12'), publisher_fee, steam_fee), Decimal('0.10'))
         self.assertEqual(utils.calculate_net_price(Decimal('115'), publisher_fee, steam_fee), Decimal('100'))
+
+    def test_async_session_cookies_for_url(self):
+        cookies = requests.cookies.RequestsCookieJar()
+        cookies.set('sessionid', 'community', domain='steamcommunity.com')
+        cookies.set('steamLoginSecure', 'store', domain='store.steampowered.com')
+        cookies.set('steamRememberLogin', 'true')
+        session = utils.AsyncSession(cookies=cookies)
+        self.assertEqual(session._cookies_for_url('https://steamcommunity.com/market'),
+                         {'sessionid': 'community', 'steamRememberLogin': 'true'})
+        self.assertEqual(session._cookies_for_url('https://api.steampowered.com/IEconService'),
+                         {'steamRememberLogin': 'true'})
+
+    def test_async_session_normalize_params(self):
+        params = {'get_descriptions': True, 'start_after_time': None, 'max_trades': 100}
+        self.assertEqual(utils.AsyncSession._normalize_params(params), {'get_descriptions': 1, 'max_trades': 100})
+
+    def test_async_session_get_failure_status(self):
+        request_info = aiohttp.RequestInfo(url=None, method='GET', headers=None)
+        forbidden = aiohttp.ClientResponseError(request_info, (), status=403)
+        self.assertEqual(utils.AsyncSession.get_failure_status(forbidden), 403)
+        self.assertEqual(utils.AsyncSession.get_failure_status({'status_code': 429, 'error': 'failed'}), 429)
+        self.assertEqual(utils.AsyncSession.get_failure_status('Request failed after retries'), 404)
+        self.assertEqual(utils.AsyncSession.get_failure_status({'success': 1}), 0)
+
+    def test_proxy_carousel_sticks_to_proxy_until_usage_limit(self):
+        carousel = utils.ProxyCarousel(None, max_usage=2, proxy_list=[f'http://proxy{i}' for i in range(100)])
+        first = carousel.get_current_proxy()
+        self.assertEqual(carousel.update_current_proxy(), first)
+        self.assertEqual(carousel.ban_proxy_time[first], 0)
+        self.assertEqual(carousel.update_current_proxy(), first)
+        self.assertGreater(carousel.ban_proxy_time[first], 0)
+        second = carousel.update_current_proxy()
+        self.assertNotEqual(second, first)
+        third = carousel.update_current_proxy(is_forced=True)
+        self.assertNotIn(third, (first, second))
+
+    def test_proxy_carousel_async_skips_banned_proxies(self):
+        carousel = utils.ProxyCarousel(None, proxy_list=[f'http://proxy{i}' for i in range(300)])
+        self.assertEqual(len(carousel.proxy_list_async), 3)
+        banned = carousel.get_random_async_proxy()
+        carousel.ban_proxy(banned)
+        proxies = {carousel.get_random_async_proxy() for _ in range(10)}
+        self.assertEqual(proxies, set(carousel.proxy_list_async) - {banned})
+        for proxy in proxies:
+            carousel.ban_proxy(proxy)
+        self.assertRaises(Exception, carousel.get_random_async_proxy)
+
+    def test_proxy_pool_releases_proxy_after_cooldown(self):
+        ban_time = {'a': 0, 'b': 0}
+        pool = utils.ProxyPool(['a', 'b'], ban_time)
+        pool.ban('a', until=10)
+        self.assertEqual([pool.acquire(now=5) for _ in range(3)], ['b', 'b', 'b'])
+        pool.ban('b', until=20)
+        self.assertEqual(pool.acquire(now=15), 'a')
+        self.assertEqual([pool.acquire(now=25) for _ in range(4)], ['a', 'b', 'a', 'b'])
+
+    def test_proxy_pool_adapter_keeps_bounded_lru_of_pools(self):
+        adapter = utils.ProxyPoolAdapter(max_proxy_pools=2)
+        for proxy in ('http://proxy1:80', 'http://proxy2:80', 'http://proxy1:80', 'http://proxy3:80'):
+            adapter.proxy_manager_for(proxy)
+        self.assertEqual(list(adapter.proxy_manager), ['http://proxy1:80', 'http://proxy3:80'])
+        self.assertEqual(adapter.pool_stats(), {'hits': 1, 'misses': 3, 'evictions': 1, 'pools': 2})
+
+    def test_proxy_pool_adapter_evicts_idle_pools(self):
+        adapter = utils.ProxyPoolAdapter(pool_idle_timeout=0)
+        adapter.proxy_manager_for('http://proxy1:80')
+        adapter._pool_last_used['http://proxy1:80'] -= 1
+        adapter.proxy_manager_for('http://proxy2:80')
+        self.assertEqual(list(adapter.proxy_manager), ['http://proxy2:80'])
+        self.assertEqual(adapter.pool_evictions, 1)
+
+    def test_async_session_run_closes_loop_session(self):
+        session = utils.AsyncSession(connector_limit=10, dns_cache_ttl=60)
+
+        async def open_session():
+            client_session, _ = await session._get_session_and_semaphore()
+            return client_session
+
+        client_session = session.run(open_session())
+        self.assertTrue(client_session.closed)
+        self.assertEqual(client_session.connector, None)
+        self.assertEqual(session._session_pool, {})
+
+    def test_async_session_context_manager_closes_session(self):
+        async def use_session():
+            async with utils.AsyncSession() as session:
+                client_session, _ = await session._get_session_and_semaphore()
+            return session, client_session
+
+        session, client_session = asyncio.run(use_session())
+        self.assertTrue(client_session.closed)
+        self.assertEqual(session._session_pool, {})
+
+    def test_async_session_request_without_retries(self):
+        requests_sent = []
+
+        class FailingClientSession:
+            def request(self, method, url, **kwargs):
+                requests_sent.append(url)
+                raise aiohttp.ServerDisconnectedError()
+
+        async def post():
+            session = utils.AsyncSession(retries=3)
+
+            async def get_session_and_semaphore():
+                return FailingClientSession(), asyncio.Semaphore(1)
+
+            session._get_session_and_semaphore = get_session_and_semaphore
+            return await session.async_post('https://steamcommunity.com/tradeoffer/new/send', use_proxy=False,
+                                            retries=1)
+
+        self.assertEqual(utils.AsyncSession.get_failure_status(asyncio.run(post())), 404)
+        self.assertEqual(len(requests_sent), 1)
+
+    def test_async_session_keeps_steam_error_message(self):
+        requests_received = []
+
+        async def sellitem(request):
+            requests_received.append(request.path)
+            return web.json_response({'success': False, 'message': 'The item specified is no longer in your inventory.'},
+                                     status=502)
+
+        async def post():
+            app = web.Application()
+            app.add_routes([web.post('/market/sellitem/', sellitem)])
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            try:
+                async with utils.AsyncSession() as session:
+                    return await session.async_post(f'http://127.0.0.1:{runner.addresses[0][1]}/market/sellitem/',
+                                                    use_proxy=False, validate_success=False, retries=1)
+            finally:
+                await runner.cleanup()
+
+        self.assertEqual(asyncio.run(post()), {'status_code': 502, 'error': 'Request failed after retries',
+                                               'message': 'The item specified is no longer in your inventory.'})
+        self.assertEqual(len(requests_received), 1)
+
+    def test_async_session_waits_for_rate_limit_outside_semaphore(self):
+        class FakeResponse:
+            status = 200
+            headers = {'Content-Type': 'application/json'}
+            cookies = {}
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def raise_for_status(self):
+                pass
+
+            async def json(self):
+                return {'success': 1}
+
+        class FakeClientSession:
+            def request(self, method, url, **kwargs):
+                return FakeResponse()
+
+        class BlockingRateLimiter:
+            def __init__(self):
+                self.released = asyncio.Event()
+
+            async def wait_async(self, url, proxy=None):
+                if url.endswith('/throttled'):
+                    await self.released.wait()
+
+        async def request_both():
+            limiter = BlockingRateLimiter()
+            session = utils.AsyncSession(max_concurrency=1, rate_limiter=limiter)
+            semaphore = asyncio.Semaphore(1)
+
+            async def get_session_and_semaphore():
+                return FakeClientSession(), semaphore
+
+            session._get_session_and_semaphore = get_session_and_semaphore
+            throttled = asyncio.create_task(session.async_get('https://steamcommunity.com/throttled', use_proxy=False))
+            await asyncio.sleep(0)
+            response = await asyncio.wait_for(
+                session.async_get('https://steamcommunity.com/free', use_proxy=False), 1)
+            limiter.released.set()
+            return response, await throttled
+
+        self.assertEqual(asyncio.run(request_both()), ({'success': 1}, {'success': 1}))
+
+
+class TestDescriptionCache(TestCase):
+    def tearDown(self):
+        utils.description_cache.clear()
+
+    @staticmethod
+    def _description(classid, name='AK-47 | Redline'):
+        return {'appid': 730, 'classid': classid, 'instanceid': '0', 'market_hash_name': name, 'tags': []}
+
+    def test_inventories_share_descriptions(self):
+        cache = utils.DescriptionCache()
+        response = {'assets': [{'appid': 730, 'assetid': '1', 'classid': '7', 'instanceid': '0', 'amount': '1'}],
+                    'descriptions': [self._description('7')]}
+        cache.update(response['descriptions'])
+        shared = cache.update([self._description('7')])['7_0']
+        self.assertIs(shared, cache.get(730, '7_0'))
+        self.assertEqual(len(cache), 1)
+        with self.assertRaises(TypeError):
+            shared['market_hash_name'] = 'changed'
+
+        item = utils.merge_items(response['assets'], {'7_0': shared}, context_id='2')['1']
+        self.assertEqual(item['market_hash_name'], 'AK-47 | Redline')
+        self.assertEqual((item['id'], item['contextid'], item['amount']), ('1', '2', '1'))
+
+    def test_merged_items_do_not_share_nested_values(self):
+        cache = utils.DescriptionCache()
+        description = {**self._description('7'), 'tags': [{'category': 'Type', 'name': 'Rifle'}]}
+        descriptions = cache.update([description])
+        self.assertIs(cache.update([dict(description, tags=[{'category': 'Type', 'name': 'Rifle'}])])['7_0'],
+                      descriptions['7_0'])
+        asset = {'appid': 730, 'assetid': '1', 'classid': '7', 'instanceid': '0', 'amount': '1'}
+
+        item = utils.merge_items([asset], descriptions, context_id='2')['1']
+        item['tags'].append({'category': 'Exterior', 'name': 'Field-Tested'})
+        item['tags'][0]['name'] = 'Pistol'
+        self.assertEqual(utils.merge_items([asset], descriptions, context_id='2')['1']['tags'],
+                         [{'category': 'Type', 'name': 'Rifle'}])
+
+        view = utils.merge_items([asset], descriptions, item_views=True, context_id='2')['1']
+        with self.assertRaises(TypeError):
+            view['tags'][0]['name'] = 'Pistol'
+        self.assertEqual(view.to_dict()['tags'], [{'category': 'Type', 'name': 'Rifle'}])
+
+    def test_changed_description_replaces_cached_one(self):
+        cache = utils.DescriptionCache()
+        cache.add(self._description('7'))
+        cache.add(self._description('7', 'AWP | Asiimov'))
+        self.assertEqual(cache.get('730', '7_0')['market_hash_name'], 'AWP | Asiimov')
+
+    def test_least_recently_used_is_evicted(self):
+        cache = utils.DescriptionCache(maxsize=2)
+        cache.update([self._description('1'), self._description('2')])
+        cache.get(730, '1_0')
+        cache.add(self._description('3'))
+        self.assertIsNone(cache.get(730, '2_0'))
+        descriptions = cache.descriptions_for([{'appid': 730, 'classid': '1', 'instanceid': '0'},
+                                               {'appid': 730, 'classid': '3', 'instanceid': '0'}])
+        self.assertEqual(sorted(descriptions), ['1_0', '3_0'])
+        self.assertIsNone(cache.descriptions_for([{'appid': 730, 'classid': '2', 'instanceid': '0'}]))
+
+    def test_description_without_appid_takes_the_given_one(self):
+        cache = utils.DescriptionCache()
+        description = {'classid': '7', 'instanceid': '0', 'market_hash_name': 'AK-47 | Redline'}
+        shared = cache.update([description], appid='730')['7_0']
+        self.assertIs(cache.get(730, '7_0'), shared)
+        response = {'assets': [{'assetid': '1', 'classid': '7', 'instanceid': '0', 'amount': '1'}],
+                    'descriptions': [description]}
+        merged = utils.merge_items_with_descriptions_from_inventory(response, GameOptions.CS)
+        self.assertEqual(merged['1']['market_hash_name'], 'AK-47 | Redline')
+
+    def test_offers_merge_from_cache_without_descriptions(self):
+        utils.description_cache.add(self._description('7'))
+        item = {'appid': 730, 'contextid': '2', 'assetid': '1', 'classid': '7', 'instanceid': '0', 'amount': '1'}
+        response = {'response': {'trade_offers_received': [{'items_to_receive': [item]}]}}
+        merged = utils.merge_items_with_descriptions_from_offers(response)
+        offer = merged['response']['trade_offers_received'][0]
+        self.assertEqual(offer['items_to_receive']['1']['market_hash_name'], 'AK-47 | Redline')
+
+    def test_offers_merge_without_cached_descriptions_raises(self):
+        item = {'appid': 730, 'contextid': '2', 'assetid': '1', 'classid': '8', 'instanceid': '0', 'amount': '1'}
+        with self.assertRaises(ValueError):
+            utils.merge_items_with_descriptions_from_offers(
+                {'response': {'trade_offers_received': [{'items_to_receive': [item]}]}})
+
+
+class TestInventoryItem(TestCase):
+    def test_reads_like_merged_dict(self):
+        description = {'appid': 730, 'classid': '7', 'instanceid': '0', 'market_hash_name': 'AK-47 | Redline'}
+        assets = [{'assetid': '1', 'classid': '7', 'instanceid': '0', 'amount': '1'},
+                  {'assetid': '2', 'classid': '7', 'instanceid': '0', 'amount': '1'}]
+        items = utils.merge_items(assets, {'7_0': description}, item_views=True, context_id='2')
+
+        self.assertIs(items['1'].description, items['2'].description)
+        self.assertEqual(len(items['1']), len(description) + 3)
+        self.assertEqual(items['1'], {**description, 'contextid': '2', 'id': '1', 'amount': '1'})
+        self.assertEqual(items['2'].get('market_hash_name'), 'AK-47 | Redline')
+        self.assertIsNone(items['2'].get('tradable'))
+        self.assertEqual(json.loads(json.dumps(items['2'].to_dict()))['id'], '2')
+        with self.assertRaises(AttributeError):
+            items['1'].owner = 'someone'
+
+    def test_merged_items_are_dicts_by_default(self):
+        description = {'appid': 730, 'classid': '7', 'instanceid': '0', 'market_hash_name': 'AK-47 | Redline'}
+        assets = [{'assetid': '1', 'classid': '7', 'instanceid': '0', 'amount': '1'}]
+        items = utils.merge_items(assets, {'7_0': MappingProxyType(description)}, context_id='2')
+
+        self.assertIs(type(items['1']), dict)
+        self.assertEqual(json.loads(json.dumps(items)), {'1': {**description, 'contextid': '2', 'id': '1', 'amount': '1'}})
+        items['1']['market_hash_name'] = 'changed'
+        self.assertEqual(description['market_hash_name'], 'AK-47 | Redline')
+
+
+class TestListingHovers(TestCase):
+    hovers = (
+        "\tCreateItemHoverFromContainer( g_rgAssets, 'mylisting_4213506120918410917_name', 730, '2', '30546587652', 0 );\n"
+        "\tCreateItemHoverFromContainer( g_rgAssets, 'mylisting_4213506120918410917_image', 730, '2', '30546587652', 0 );\n"
+        "\tCreateItemHoverFromContainer( g_rgAssets, 'history_row_1_2_name', 730, '2', '30546587653', 0 );\n"
+        "\tCreateItemHoverFromContainer( g_rgAssets, 'mylisting_5001_name', 440, '2', '99', 0 );\n"
+    )
+
+    def test_get_listing_id_to_assets_address_from_html(self):
+        self.assertEqual(utils.get_listing_id_to_assets_address_from_html(self.hovers), {
+            '4213506120918410917': ['730', '2', '30546587652'],
+            '5001': ['440', '2', '99'],
+        })
+
+    def test_missing_hovers(self):
+        self.assertEqual(utils.get_listing_id_to_assets_address_from_html(None), {})
+        self.assertEqual(utils.get_listing_id_to_assets_address_from_html('CreateItemHoverFromContainer( '), {})
+
+    def test_merge_items_with_descriptions_from_listing(self):
+        descriptions = {'730': {'2': {'30546587652': {'name': 'AK-47'}}}, '440': {'2': {'99': {'name': 'Key'}}}}
+        listings = {'sell_listings': {'4213506120918410917': {}, '5001': {}}}
+        index = utils.get_listing_id_to_assets_address_from_html(self.hovers)
+        merged = utils.merge_items_with_descriptions_from_listing(listings, index, descriptions)
+        self.assertEqual(merged['sell_listings']['5001']['description'], {'name': 'Key'})
+        self.assertEqual(merged['sell_listings']['4213506120918410917']['description'], {'name': 'AK-47'})